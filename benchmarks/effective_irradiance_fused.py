@@ -0,0 +1,107 @@
+"""
+Peak memory allocated (tracemalloc) and wall-clock time of the AOI
+dependent part of the StaticHybridSystem effective irradiance for a year of
+1-minute data: the pandas methods of the subsystems against
+:py:func:`cpvlib.kernels.static_effective_irradiance` with preallocated
+outputs.
+
+The plane of array diffuse irradiance is computed beforehand, so that only
+the AOI, IAM, spillage and ``aoi_limit`` steps are measured.
+
+    python benchmarks/effective_irradiance_fused.py --freq 1min --repeat 3
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import pvlib
+from cpvlib import cpvsystem, kernels
+
+from hybrid_parallel import MOD_PARAMS_CPV, MOD_PARAMS_FLATPLATE, get_weather
+
+
+def pandas_methods(system, weather, solar_position, poa_diffuse, out):
+    solar_zenith = solar_position['zenith']
+    solar_azimuth = solar_position['azimuth']
+    dii = pvlib.irradiance.beam_component(
+        system.static_flatplate_sys.surface_tilt,
+        system.static_flatplate_sys.surface_azimuth,
+        solar_zenith, solar_azimuth, weather['dni'])
+
+    dii_effective = system.static_cpv_sys.get_effective_irradiance(
+        solar_zenith, solar_azimuth, weather['dni'])
+    poa_flatplate_static_effective = \
+        system.static_flatplate_sys.get_effective_irradiance(
+            solar_zenith, solar_azimuth, dii=dii, gii=dii + poa_diffuse,
+            spillage=0.15)
+    return dii_effective, poa_flatplate_static_effective
+
+
+def fused(backend):
+    def func(system, weather, solar_position, poa_diffuse, out):
+        return kernels.static_effective_irradiance(
+            system, solar_position['zenith'], solar_position['azimuth'],
+            poa_diffuse, dni=weather['dni'], spillage=0.15, out=out,
+            backend=backend)
+    return func
+
+
+def measure(func, repeat, *args):
+    func(*args)  # warm up (and Numba compilation)
+
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'time [s]': min(elapsed), 'peak allocated [MB]': peak / 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--freq', default='1min')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    location = pvlib.location.Location(
+        latitude=40.4, longitude=-3.7, altitude=695, tz='Europe/Madrid')
+    weather, solar_position = get_weather(location, args.freq)
+
+    system = cpvsystem.StaticHybridSystem(
+        surface_tilt=30, surface_azimuth=180,
+        module_parameters_cpv=MOD_PARAMS_CPV,
+        module_parameters_flatplate=MOD_PARAMS_FLATPLATE)
+
+    poa_diffuse = system.static_flatplate_sys.get_irradiance(
+        solar_position['zenith'], solar_position['azimuth'], weather['dni'],
+        weather['ghi'], weather['dhi'], model='haydavies')['poa_diffuse']
+
+    n = len(weather)
+    out = np.empty(n), np.empty(n)
+
+    funcs = {'pandas methods': pandas_methods,
+             'fused numpy': fused('numpy')}
+    if kernels.HAS_NUMBA:
+        funcs['fused numba'] = fused('numba')
+
+    results = pd.DataFrame({
+        name: measure(func, args.repeat, system, weather, solar_position,
+                      poa_diffuse, out)
+        for name, func in funcs.items()}).T
+
+    print('{} samples, best of {}, outputs {:.1f} MB'.format(
+        n, args.repeat, 2 * 8 * n / 1e6))
+    print(results.round(3).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Wall-clock time of importing cpvlib in a fresh interpreter, which is paid by
+every short-lived CLI or serverless job.
+
+    python benchmarks/import_time.py --repeat 10
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+STATEMENTS = {
+    'python': 'pass',
+    'import cpvlib': 'import cpvlib',
+    'from cpvlib import cpvsystem': 'from cpvlib import cpvsystem',
+}
+
+
+def get_time(statement, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    baseline = get_time(STATEMENTS['python'], args.repeat)
+    print('median of {} runs, interpreter start up subtracted'.format(
+        args.repeat))
+    for name, statement in STATEMENTS.items():
+        if statement == 'pass':
+            continue
+        elapsed = get_time(statement, args.repeat) - baseline
+        print('{:30} {:8.1f} ms'.format(name, 1000 * elapsed))
+
+
+if __name__ == '__main__':
+    main()
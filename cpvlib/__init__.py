@@ -1,9 +1,29 @@
-from pkg_resources import get_distribution, DistributionNotFound
+import importlib
 
 try:
-    __version__ = get_distribution('cpvlib').version
-except DistributionNotFound:
-     # package is not installed
+    from importlib.metadata import version, PackageNotFoundError
+except ImportError:  # Python < 3.8
+    from importlib_metadata import version, PackageNotFoundError
+
+try:
+    __version__ = version('cpvlib')
+except PackageNotFoundError:
+    # package is not installed
     pass
 
-from cpvlib import cpvsystem
+# submodules are imported on first access (e.g. ``cpvlib.cpvsystem``), so
+# that ``import cpvlib`` does not pull in pandas and pvlib
+_SUBMODULES = ['adaptive', 'atmosphere', 'batch', 'cache', 'cpvsystem',
+               'electrical', 'gridded', 'kernels', 'lifetime', 'live',
+               'losses', 'results', 'temperature', 'tracking', 'uncertainty',
+               'validation', 'workers']
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module('cpvlib.' + name)
+    raise AttributeError("module 'cpvlib' has no attribute '{}'".format(name))
+
+
+def __dir__():
+    return sorted(list(globals()) + _SUBMODULES)
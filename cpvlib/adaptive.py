@@ -0,0 +1,222 @@
+"""
+The ``adaptive`` module runs the StaticHybridSystem model chain with an
+adaptive time resolution, for fast screening of annual yields.
+
+The cheap stages (effective irradiance, cell temperature, utilization
+factor) are evaluated on every sample. The expensive stages
+(``calcparams_pvsyst`` and ``singlediode``) are evaluated on a coarse grid
+of one every ``step`` samples, and on every sample of the intervals where
+the effective irradiance or the cell temperature depart from a linear
+variation (e.g. clouds), or where the AOI is close to the flat plate
+``aoi_limit``. The power of the other samples is linearly interpolated in
+time.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from cpvlib.batch import get_energy
+
+
+def _segment_deviation(x, anchors, starts):
+    """
+    Largest deviation of ``x`` from its linear interpolation between the
+    anchors in every segment, ignoring NaN.
+    """
+    linear = np.interp(np.arange(len(x)), anchors, x[anchors])
+    return np.fmax.reduceat(np.abs(x - linear), starts)
+
+
+def _segment_mixed_nan(x, starts, ends):
+    """True for the segments that contain both NaN and numbers."""
+    cumulative = np.concatenate([[0], np.cumsum(np.isnan(x))])
+    count = cumulative[ends + 1] - cumulative[starts]
+    return (count > 0) & (count < ends - starts + 1)
+
+
+def _expand(segments, starts, ends):
+    """Indices of every sample in the given segments."""
+    if not segments.any():
+        return np.array([], dtype=int)
+    return np.concatenate([np.arange(s, e + 1) for s, e in
+                           zip(starts[segments], ends[segments])])
+
+
+def _dc(system, results, index):
+    """p_mp of both subsystems on the given samples."""
+    dii_effective = results.dii_effective.iloc[index]
+    poa_flatplate_static_effective = results.poa_flatplate_static_effective.iloc[index]
+
+    diode_parameters_cpv, diode_parameters_flatplate = system.calcparams_pvsyst(
+        dii_effective, poa_flatplate_static_effective,
+        results.temp_cell_cpv.iloc[index],
+        results.temp_cell_flatplate.iloc[index])
+
+    dc_cpv, dc_flatplate = system.singlediode(diode_parameters_cpv,
+                                              diode_parameters_flatplate)
+
+    return np.asarray(dc_cpv['p_mp']), np.asarray(dc_flatplate['p_mp'])
+
+
+def run_adaptive(system, solar_zenith, solar_azimuth, weather,
+                 airmass_absolute, spillage=0, step=10, irradiance_tol=10.,
+                 temperature_tol=0.5, aoi_margin=2., **kwargs):
+    """
+    Runs the StaticHybridSystem model chain evaluating the single diode
+    model on an adaptive subset of the samples.
+
+    Parameters
+    ----------
+    system : StaticHybridSystem
+    solar_zenith : Series
+        Solar zenith angle.
+    solar_azimuth : Series
+        Solar azimuth angle.
+    weather : DataFrame
+        Columns are ``dni, temp_air`` and optionally ``ghi, dhi, dii, gii,
+        wind_speed``.
+    airmass_absolute : Series
+        Absolute airmass.
+    spillage : float, default 0
+        Percentage of dii allowed to pass into the flat plate subsystem.
+    step : int, default 10
+        Number of samples between two points of the coarse grid.
+    irradiance_tol : float, default 10.
+        Maximum deviation of the effective irradiances [W/m2] from their
+        linear interpolation within an interval of the coarse grid for it
+        to be interpolated.
+    temperature_tol : float, default 0.5
+        Maximum deviation of the cell temperatures [C] from their linear
+        interpolation within an interval of the coarse grid for it to be
+        interpolated.
+    aoi_margin : float, default 2.
+        Intervals with an AOI closer than ``aoi_margin`` degrees to the flat
+        plate ``aoi_limit`` are evaluated on every sample.
+    **kwargs
+        Passed to :py:meth:`StaticFlatPlateSystem.get_effective_irradiance`.
+
+    Returns
+    -------
+    power : DataFrame
+        Columns are ``p_mp_cpv`` (including the global utilization factor),
+        ``p_mp_flatplate`` and ``evaluated`` (True for the samples where the
+        single diode model was evaluated).
+    """
+    if step < 1:
+        raise ValueError('step must be a positive integer')
+
+    results = system.run_model(solar_zenith, solar_azimuth, weather,
+                               airmass_absolute=airmass_absolute,
+                               spillage=spillage, **kwargs)
+    n = len(weather)
+
+    # coarse grid: segment k spans the samples starts[k] ... ends[k]
+    anchors = np.unique(np.append(np.arange(0, n, step), n - 1))
+    starts, ends = anchors[:-1], anchors[1:]
+
+    unstable = np.zeros(len(starts), dtype=bool)
+    if len(starts):
+        for name, tol in [('dii_effective', irradiance_tol),
+                          ('poa_flatplate_static_effective', irradiance_tol),
+                          ('temp_cell_cpv', temperature_tol),
+                          ('temp_cell_flatplate', temperature_tol)]:
+            x = np.asarray(getattr(results, name), dtype=float)
+            unstable |= _segment_deviation(x, anchors, starts) > tol
+            unstable |= _segment_mixed_nan(x, starts, ends)
+
+        aoi = np.asarray(system.static_flatplate_sys.get_aoi(
+            solar_zenith, solar_azimuth), dtype=float)
+        distance = np.abs(
+            aoi - system.static_flatplate_sys.module_parameters['aoi_limit'])
+        near_limit = np.fmin(np.fmin.reduceat(distance, starts),
+                             distance[ends]) < aoi_margin
+        unstable |= near_limit
+
+    evaluated = np.zeros(n, dtype=bool)
+    evaluated[anchors] = True
+    evaluated[_expand(unstable, starts, ends)] = True
+
+    p_mp_cpv = np.full(n, np.nan)
+    p_mp_flatplate = np.full(n, np.nan)
+
+    index = np.flatnonzero(evaluated)
+    p_mp_cpv[index], p_mp_flatplate[index] = _dc(system, results, index)
+
+    # second pass: intervals whose ends are NaN and not NaN (e.g. sunrise)
+    if len(starts):
+        mixed = ((np.isnan(p_mp_cpv[starts]) != np.isnan(p_mp_cpv[ends])) |
+                 (np.isnan(p_mp_flatplate[starts]) !=
+                  np.isnan(p_mp_flatplate[ends]))) & ~unstable
+        index = _expand(mixed, starts, ends)
+        index = index[~evaluated[index]]
+        if len(index):
+            evaluated[index] = True
+            p_mp_cpv[index], p_mp_flatplate[index] = _dc(system, results,
+                                                         index)
+
+    if isinstance(weather.index, pd.DatetimeIndex):
+        x = weather.index.asi8.astype(float)
+    else:
+        x = np.arange(n, dtype=float)
+
+    index = np.flatnonzero(evaluated)
+    for p_mp in [p_mp_cpv, p_mp_flatplate]:
+        p_mp[~evaluated] = np.interp(x[~evaluated], x[index], p_mp[index])
+
+    return pd.DataFrame({
+        'p_mp_cpv': p_mp_cpv * np.asarray(results.uf_cpv),
+        'p_mp_flatplate': p_mp_flatplate,
+        'evaluated': evaluated,
+    }, index=weather.index)
+
+
+def get_energy_error(system, solar_zenith, solar_azimuth, weather,
+                     airmass_absolute, spillage=0, **kwargs):
+    """
+    Runs the adaptive and the full resolution model chains and compares
+    their energy.
+
+    Parameters
+    ----------
+    system, solar_zenith, solar_azimuth, weather, airmass_absolute, spillage
+        See :py:func:`run_adaptive`.
+    **kwargs
+        Passed to :py:func:`run_adaptive`.
+
+    Returns
+    -------
+    error : DataFrame
+        Index is ``energy_cpv, energy_flatplate, energy_total``. Columns are
+        ``adaptive`` and ``reference`` energy in Wh and ``relative_error``.
+        ``error.attrs`` holds the fraction of samples evaluated
+        (``evaluated``), the run times in s (``time_adaptive``,
+        ``time_reference``) and the ``speedup``.
+    """
+    t0 = time.perf_counter()
+    adaptive = run_adaptive(system, solar_zenith, solar_azimuth, weather,
+                            airmass_absolute, spillage=spillage, **kwargs)
+    t1 = time.perf_counter()
+
+    flatplate_kwargs = {k: v for k, v in kwargs.items() if k not in [
+        'step', 'irradiance_tol', 'temperature_tol', 'aoi_margin']}
+    results = system.run_model(solar_zenith, solar_azimuth, weather,
+                               airmass_absolute=airmass_absolute,
+                               spillage=spillage, free_intermediates=True,
+                               **flatplate_kwargs)
+    reference = pd.DataFrame({'p_mp_cpv': results.p_mp_cpv,
+                              'p_mp_flatplate': results.p_mp_flatplate})
+    t2 = time.perf_counter()
+
+    error = pd.DataFrame({
+        'adaptive': get_energy(adaptive[['p_mp_cpv', 'p_mp_flatplate']])[0],
+        'reference': get_energy(reference)[0],
+    })
+    error['relative_error'] = ((error['adaptive'] - error['reference']) /
+                               error['reference'])
+
+    error.attrs.update(evaluated=adaptive['evaluated'].mean(),
+                       time_adaptive=t1 - t0, time_reference=t2 - t1,
+                       speedup=(t2 - t1) / (t1 - t0))
+    return error
@@ -0,0 +1,71 @@
+"""
+The ``atmosphere`` module computes, once per time index, the atmospheric
+quantities shared by the transposition models and the CPV utilization
+factors::
+
+    context = get_atmospheric_context(location, solar_position=solar_position)
+    system.run_model(solar_position['zenith'], solar_position['azimuth'],
+                     weather, context=context)
+
+Every cpvlib method that needs the airmass or the extraterrestrial
+irradiance accepts ``context``, and uses it when the corresponding argument
+is not given.
+"""
+
+from collections import namedtuple
+
+import pvlib
+
+AtmosphericContext = namedtuple(
+    'AtmosphericContext',
+    ['airmass_relative', 'airmass_absolute', 'dni_extra', 'pressure'])
+
+
+def get_atmospheric_context(location, times=None, solar_position=None,
+                            pressure=None, model='kastenyoung1989'):
+    """
+    Computes the relative and absolute airmass, the extraterrestrial direct
+    normal irradiance and the pressure of a time index, as
+    :py:meth:`pvlib.location.Location.get_airmass` does.
+
+    Parameters
+    ----------
+    location : pvlib.location.Location
+    times : None or DatetimeIndex, default None
+        Only used if ``solar_position`` is not provided.
+    solar_position : None or DataFrame, default None
+        Columns are ``apparent_zenith, zenith``.
+    pressure : None, float or Series, default None
+        Air pressure in Pa, e.g. measured. If None, derived from the
+        altitude of ``location``.
+    model : str, default 'kastenyoung1989'
+        Relative airmass model, see
+        :py:func:`pvlib.atmosphere.get_relative_airmass`.
+
+    Returns
+    -------
+    context : AtmosphericContext
+        ``airmass_relative, airmass_absolute, dni_extra`` Series indexed like
+        ``solar_position`` and ``pressure``.
+    """
+    if solar_position is None:
+        solar_position = location.get_solarposition(times)
+
+    if model in pvlib.atmosphere.APPARENT_ZENITH_MODELS:
+        zenith = solar_position['apparent_zenith']
+    elif model in pvlib.atmosphere.TRUE_ZENITH_MODELS:
+        zenith = solar_position['zenith']
+    else:
+        raise ValueError(model + ' is not a valid airmass model')
+
+    if pressure is None:
+        pressure = pvlib.atmosphere.alt2pres(location.altitude)
+
+    airmass_relative = pvlib.atmosphere.get_relative_airmass(zenith, model)
+
+    return AtmosphericContext(
+        airmass_relative=airmass_relative,
+        airmass_absolute=pvlib.atmosphere.get_absolute_airmass(
+            airmass_relative, pressure),
+        dni_extra=pvlib.irradiance.get_extra_radiation(solar_position.index),
+        pressure=pressure)
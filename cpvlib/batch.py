@@ -0,0 +1,296 @@
+"""
+The ``batch`` module runs the StaticHybridSystem workflow of
+``docs/examples/StaticHybridSystem_tmy.py`` over a table of sites using
+local TMY files and a pool of worker processes.
+"""
+
+import logging
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+import pvlib
+from cpvlib import cpvsystem
+from cpvlib.atmosphere import get_atmospheric_context
+from cpvlib.cache import get_key
+
+logger = logging.getLogger(__name__)
+
+BatchProgress = namedtuple(
+    'BatchProgress', ['done', 'failed', 'total', 'elapsed', 'sites_per_minute'])
+
+TMY_COLUMNS = {
+    'pvgis': {'Gb(n)': 'dni', 'G(h)': 'ghi', 'Gd(h)': 'dhi',
+              'T2m': 'temp_air', 'WS10m': 'wind_speed'},
+    'tmy3': {'DNI': 'dni', 'GHI': 'ghi', 'DHI': 'dhi',
+             'DryBulb': 'temp_air', 'Wspd': 'wind_speed'},
+    'epw': {},
+    'csv': {},
+}
+
+
+def read_tmy(filename, fmt=None, year=2010):
+    """
+    Reads a local TMY file and returns the weather columns used by cpvlib.
+
+    Parameters
+    ----------
+    filename : str or Path
+        Path of the TMY file.
+    fmt : None or string, default None
+        File format, one of 'pvgis', 'tmy3', 'epw' or 'csv'. If None, it is
+        inferred from the file extension ('.epw' -> 'epw', '.json' ->
+        'pvgis', otherwise 'csv'). 'csv' files must have a datetime index in
+        the first column and the columns ``dni, ghi, dhi, temp_air,
+        wind_speed``.
+    year : None or int, default 2010
+        Year assigned to every timestamp, as TMY files mix years. 29
+        February is dropped if ``year`` is not a leap year.
+        If None, the original years are kept.
+
+    Returns
+    -------
+    weather : DataFrame
+        Columns are ``dni, ghi, dhi, temp_air, wind_speed``.
+    """
+    filename = Path(filename)
+
+    if fmt is None:
+        fmt = {'.epw': 'epw', '.json': 'pvgis'}.get(
+            filename.suffix.lower(), 'csv')
+
+    if fmt == 'pvgis':
+        data = pvlib.iotools.read_pvgis_tmy(str(filename))[0]
+    elif fmt == 'tmy3':
+        data = pvlib.iotools.read_tmy3(str(filename))[0]
+    elif fmt == 'epw':
+        data = pvlib.iotools.read_epw(str(filename))[0]
+    elif fmt == 'csv':
+        data = pd.read_csv(filename, index_col=0, parse_dates=True)
+    else:
+        raise ValueError(fmt + ' is not a valid TMY format')
+
+    weather = data.rename(columns=TMY_COLUMNS[fmt])[
+        ['dni', 'ghi', 'dhi', 'temp_air', 'wind_speed']]
+
+    if year is not None:
+        if not pd.Timestamp(year=year, month=1, day=1).is_leap_year:
+            index = weather.index
+            weather = weather[~((index.month == 2) & (index.day == 29))]
+        weather = weather.set_index(
+            weather.index.map(lambda t: t.replace(year=year)))
+
+    return weather
+
+
+def simulate_site(system, location, weather, spillage=0, cache=None):
+    """
+    Runs the StaticHybridSystem model chain for one site.
+
+    Parameters
+    ----------
+    system : StaticHybridSystem
+    location : pvlib.location.Location
+    weather : DataFrame
+        Columns are ``dni, ghi, dhi, temp_air, wind_speed``.
+    spillage : float, default 0
+        Percentage of dii allowed to pass into the flat plate subsystem.
+    cache : None or ResultCache, default None
+        If given, the result is read from the cache when the same system,
+        location, weather and spillage were already simulated.
+
+    Returns
+    -------
+    power : DataFrame
+        Columns are ``p_mp_cpv`` (including the global utilization factor)
+        and ``p_mp_flatplate``, in W.
+    """
+    if cache is not None:
+        key = get_key(system, weather, model='simulate_site',
+                      spillage=spillage,
+                      location=[location.latitude, location.longitude,
+                                location.altitude, str(location.tz)])
+        return cache.get_or_compute(key, simulate_site, system, location,
+                                    weather, spillage)
+
+    solar_position = location.get_solarposition(weather.index)
+
+    context = get_atmospheric_context(location,
+                                      solar_position=solar_position)
+
+    results = system.run_model(solar_position['zenith'],
+                               solar_position['azimuth'],
+                               weather,
+                               context=context,
+                               spillage=spillage,
+                               free_intermediates=True)
+
+    return pd.DataFrame({'p_mp_cpv': results.p_mp_cpv,
+                         'p_mp_flatplate': results.p_mp_flatplate})
+
+
+def get_energy(power):
+    """
+    Integrates power into annual and monthly energy.
+
+    Parameters
+    ----------
+    power : DataFrame
+        Power time series in W, as returned by :py:func:`simulate_site`.
+
+    Returns
+    -------
+    annual : Series
+        Energy per column in Wh. ``energy_total`` is the sum of all columns.
+    monthly : DataFrame
+        Energy per month (index) and column in Wh.
+    """
+    interval = power.index.to_series().diff().median()
+    hours = interval / pd.Timedelta('1h') if pd.notna(interval) else 1
+
+    energy = power.fillna(0) * hours
+    energy.columns = [c.replace('p_mp', 'energy') for c in energy.columns]
+    energy['energy_total'] = energy.sum(axis=1)
+
+    monthly = energy.groupby(energy.index.month).sum()
+    monthly.index.name = 'month'
+
+    return energy.sum(), monthly
+
+
+def _run_site(site_id, site, system_parameters, spillage, cache):
+    """Worker task: never raises so that a failing site does not stop the batch."""
+    try:
+        location = pvlib.location.Location(
+            latitude=site['latitude'], longitude=site['longitude'],
+            altitude=site.get('altitude', 0), tz=site.get('tz', 'UTC'),
+            name=str(site_id))
+
+        system = cpvsystem.StaticHybridSystem(name=str(site_id),
+                                              **system_parameters)
+
+        weather = read_tmy(site['filename'], fmt=site.get('fmt'))
+        if weather.index.tz is None:
+            weather.index = weather.index.tz_localize(location.tz)
+
+        power = simulate_site(system, location, weather, spillage=spillage,
+                              cache=cache)
+        annual, monthly = get_energy(power)
+
+        return site_id, annual, monthly, None
+
+    except Exception:
+        return site_id, None, None, traceback.format_exc()
+
+
+def _write_table(output_dir, table, site_id, df, output_format):
+    df = df.copy()
+    df.insert(0, 'site', site_id)
+
+    if output_format == 'parquet':
+        path = output_dir / table
+        path.mkdir(exist_ok=True)
+        df.to_parquet(path / '{}.parquet'.format(site_id), index=False)
+    else:
+        path = output_dir / '{}.csv'.format(table)
+        df.to_csv(path, mode='a', header=not path.exists(), index=False)
+
+
+def _log_progress(progress):
+    logger.info('%d/%d sites done (%d failed), %.1f sites/min',
+                progress.done, progress.total, progress.failed,
+                progress.sites_per_minute)
+
+
+def run_sites(sites, system_parameters, output_dir, output_format='csv',
+              n_workers=None, spillage=0, progress=None, cache=None):
+    """
+    Runs the StaticHybridSystem model chain for every site of a table in a
+    pool of worker processes, writing the results of each site as soon as
+    it finishes.
+
+    Parameters
+    ----------
+    sites : DataFrame
+        One row per site, indexed by site id. Required columns are
+        ``latitude, longitude, filename``. Optional columns are
+        ``altitude, tz`` and ``fmt`` (see :py:func:`read_tmy`).
+    system_parameters : dict
+        Keyword arguments passed to :py:class:`cpvsystem.StaticHybridSystem`.
+    output_dir : str or Path
+        Directory where ``annual``, ``monthly`` and ``status`` tables are
+        written.
+    output_format : string, default 'csv'
+        'csv' appends every site to ``annual.csv`` and ``monthly.csv``,
+        which are emptied at the start of the run.
+        'parquet' writes one file per site in the ``annual`` and ``monthly``
+        dataset directories (requires pyarrow or fastparquet).
+    n_workers : None or int, default None
+        Number of worker processes. Defaults to the number of CPUs.
+    spillage : float, default 0
+        Percentage of dii allowed to pass into the flat plate subsystem.
+    progress : None or callable, default None
+        Called with a :py:class:`BatchProgress` after every site. If None,
+        progress is logged with the ``cpvlib.batch`` logger.
+    cache : None or ResultCache, default None
+        Result cache shared by all the workers, see :py:func:`simulate_site`.
+
+    Returns
+    -------
+    status : DataFrame
+        One row per site with columns ``status`` ('ok' or 'failed') and
+        ``error``.
+    """
+    if output_format not in ('csv', 'parquet'):
+        raise ValueError(output_format + ' is not a valid output format')
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if output_format == 'csv':
+        # a rerun replaces the tables of the previous run
+        for table in ['annual', 'monthly']:
+            try:
+                (output_dir / '{}.csv'.format(table)).unlink()
+            except FileNotFoundError:
+                pass
+
+    if progress is None:
+        progress = _log_progress
+
+    status = pd.DataFrame(index=sites.index, columns=['status', 'error'])
+    total = len(sites)
+    failed = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [executor.submit(_run_site, site_id, site.dropna().to_dict(),
+                                   system_parameters, spillage, cache)
+                   for site_id, site in sites.iterrows()]
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            site_id, annual, monthly, error = future.result()
+
+            if error is None:
+                _write_table(output_dir, 'annual', site_id,
+                             annual.to_frame().T.reset_index(drop=True),
+                             output_format)
+                _write_table(output_dir, 'monthly', site_id,
+                             monthly.reset_index(), output_format)
+                status.loc[site_id] = ['ok', None]
+            else:
+                failed += 1
+                logger.warning('site %s failed:\n%s', site_id, error)
+                status.loc[site_id] = ['failed', error]
+
+            elapsed = time.perf_counter() - start
+            progress(BatchProgress(done, failed, total, elapsed,
+                                   60 * done / elapsed))
+
+    status.to_csv(output_dir / 'status.csv')
+
+    return status
@@ -0,0 +1,213 @@
+"""
+The ``cache`` module provides an opt-in disk cache of simulation results.
+
+Results are stored as Parquet files named after a content hash of the
+system parameters, the weather data, the cpvlib version and the model
+options, so rerunning an identical scenario becomes a file read.
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def _get_version():
+    import cpvlib
+    return getattr(cpvlib, '__version__', 'unknown')
+
+
+def _json_default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (pd.Series, pd.DataFrame)):
+        # time series (e.g. losses) are hashed by content, including their
+        # index, as the weather is
+        return {'class': type(obj).__name__, 'fingerprint': fingerprint(obj)}
+    if isinstance(obj, (pd.Timestamp, pd.Timedelta)):
+        return {'class': type(obj).__name__, 'value': obj.isoformat()}
+    if isinstance(obj, Path):
+        return str(obj)
+    if hasattr(obj, '__dict__'):
+        attrs = {k: v for k, v in vars(obj).items() if not callable(v)}
+        return {'class': type(obj).__name__, **attrs}
+    raise TypeError('Object of type {} cannot be hashed'.format(
+        type(obj).__name__))
+
+
+def hash_parameters(parameters):
+    """
+    Stable hash of (nested) system parameters.
+
+    Parameters
+    ----------
+    parameters : object
+        dicts, lists, scalars, numpy arrays, Series, DataFrames, Timestamps
+        or cpvlib system objects (hashed through their attributes).
+
+    Returns
+    -------
+    digest : string
+        sha256 hex digest.
+
+    Raises
+    ------
+    TypeError
+        If ``parameters`` contains an object that cannot be hashed by
+        content.
+    """
+    text = json.dumps(parameters, sort_keys=True, default=_json_default)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def fingerprint(data):
+    """
+    Stable hash of the content of a weather DataFrame or Series, including
+    its index, column names and time zone.
+
+    Parameters
+    ----------
+    data : DataFrame or Series
+
+    Returns
+    -------
+    digest : string
+        sha256 hex digest.
+    """
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    columns = data.columns if isinstance(data, pd.DataFrame) else [data.name]
+    digest.update(repr(list(columns)).encode())
+    digest.update(str(getattr(data.index, 'tz', None)).encode())
+    return digest.hexdigest()
+
+
+def get_key(system, weather, **options):
+    """
+    Builds the cache key of a simulation.
+
+    Parameters
+    ----------
+    system : CPVSystem, StaticCPVSystem, StaticFlatPlateSystem or StaticHybridSystem
+    weather : DataFrame
+        Weather data used by the simulation.
+    **options
+        Model options that affect the result (e.g. ``spillage``, location).
+
+    Returns
+    -------
+    key : string
+    """
+    return hash_parameters({'system': system,
+                            'weather': fingerprint(weather),
+                            'version': _get_version(),
+                            'options': options})
+
+
+class ResultCache():
+    """
+    Disk cache of simulation results (DataFrames) stored as Parquet files,
+    with a size cap and least recently used eviction.
+
+    Parquet support requires pyarrow or fastparquet.
+
+    Parameters
+    ----------
+    directory : str or Path
+        Cache directory. It is created if it does not exist.
+    max_size : int, default 2**30
+        Maximum total size of the cache in bytes. The least recently used
+        results are removed when it is exceeded.
+    """
+
+    def __init__(self, directory, max_size=2**30):
+        self.directory = Path(directory)
+        self.max_size = max_size
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def __repr__(self):
+        return 'ResultCache: \n  directory: {}\n  max_size: {}'.format(
+            self.directory, self.max_size)
+
+    def _path(self, key):
+        return self.directory / '{}.parquet'.format(key)
+
+    def _files(self):
+        return list(self.directory.glob('*.parquet'))
+
+    @property
+    def size(self):
+        """Total size of the cached results in bytes."""
+        return sum(f.stat().st_size for f in self._files())
+
+    def __contains__(self, key):
+        return self._path(key).exists()
+
+    def get(self, key):
+        """
+        Returns the result stored under ``key`` or None if it is not cached.
+        """
+        path = self._path(key)
+        try:
+            result = pd.read_parquet(path)
+        except FileNotFoundError:
+            return None
+
+        # the modification time is the LRU clock
+        os.utime(path)
+
+        return result
+
+    def put(self, key, result):
+        """
+        Stores a DataFrame under ``key`` and evicts the least recently used
+        results if the cache exceeds ``max_size``.
+        """
+        path = self._path(key)
+        tmp = path.with_suffix('.{}.tmp'.format(uuid.uuid4().hex))
+        result.to_parquet(tmp)
+        os.replace(tmp, path)
+
+        self.evict()
+
+    def get_or_compute(self, key, func, *args, **kwargs):
+        """
+        Returns the result stored under ``key``, computing and storing
+        ``func(*args, **kwargs)`` if it is not cached.
+        """
+        result = self.get(key)
+        if result is None:
+            result = func(*args, **kwargs)
+            self.put(key, result)
+        return result
+
+    def evict(self):
+        """Removes least recently used results until the size cap is met."""
+        files = []
+        for f in self._files():
+            try:
+                files.append((f.stat().st_mtime, f.stat().st_size, f))
+            except FileNotFoundError:
+                pass
+
+        total = sum(size for _, size, _ in files)
+        for _, size, f in sorted(files, key=lambda x: x[0]):
+            if total <= self.max_size:
+                break
+            try:
+                f.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Removes every cached result."""
+        for f in self._files():
+            f.unlink()
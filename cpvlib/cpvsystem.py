@@ -3,14 +3,74 @@ The ``cpvsystem`` module contains functions for modeling the output and
 performance of CPV modules.
 """
 
+import base64
+import json
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
 
 import pvlib
 from pvlib.tools import _build_kwargs
 
+from cpvlib import electrical, losses, temperature, tracking
+from cpvlib.results import HybridResults
+
+# version of the to_dict/to_bytes format
+SERIALIZATION_VERSION = 1
+
+
+class _Serializable():
+    """
+    Versioned ``to_dict``/``from_dict`` and compact ``to_bytes``/``from_bytes``
+    (zlib compressed JSON) of the constructor arguments, also used to pickle
+    the systems.
+    """
+
+    def _get_arguments(self):
+        raise NotImplementedError
 
-class CPVSystem(pvlib.pvsystem.PVSystem):
+    def to_dict(self):
+        """
+        Returns
+        -------
+        data : dict
+            JSON serializable ``class``, ``version`` and constructor
+            ``arguments``. NumPy arrays, Series and TrackerTables are
+            encoded exactly.
+        """
+        return {'class': type(self).__name__,
+                'version': SERIALIZATION_VERSION,
+                'arguments': _encode(self._get_arguments())}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Creates a system from the output of :py:meth:`to_dict`."""
+        system = from_dict(data)
+        if not isinstance(system, cls):
+            raise ValueError('Data of a {}, not of a {}'.format(
+                data['class'], cls.__name__))
+        return system
+
+    def to_bytes(self):
+        """Compact binary form of :py:meth:`to_dict`."""
+        return zlib.compress(json.dumps(
+            self.to_dict(), separators=(',', ':')).encode())
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Creates a system from the output of :py:meth:`to_bytes`."""
+        return cls.from_dict(json.loads(zlib.decompress(data)))
+
+    def __reduce__(self):
+        return (from_bytes, (self.to_bytes(),))
+
+
+class CPVSystem(pvlib.pvsystem.PVSystem, _Serializable):
     """
     The CPVSystem class defines a set of CPV system attributes and modeling
     functions. This class describes the collection and interactions of CPV
@@ -134,14 +194,37 @@ class CPVSystem(pvlib.pvsystem.PVSystem):
         return ('CPVSystem: \n  ' + '\n  '.join(
             ('{}: {}'.format(attr, getattr(self, attr)) for attr in attrs)))
 
-    def get_irradiance(self, solar_zenith, solar_azimuth, dni, ghi, dhi,
-                       dni_extra=None, airmass=None, model='haydavies',
+    def _get_arguments(self):
+        return _get_attributes(self, [
+            'module', 'module_parameters', 'temperature_model_parameters',
+            'modules_per_string', 'strings_per_inverter', 'inverter',
+            'inverter_parameters', 'racking_model', 'losses_parameters',
+            'name', 'albedo', 'surface_type'])
+
+    def get_loss_stack(self):
+        """
+        Returns
+        -------
+        stack : LossStack
+            Stack of the ``losses_parameters`` (% constant or time series),
+            see :py:class:`losses.LossStack`.
+        """
+        return losses.LossStack.from_parameters(self.losses_parameters)
+
+    def get_irradiance(self, solar_zenith, solar_azimuth, dni, ghi=None,
+                       dhi=None, dni_extra=None, airmass=None,
+                       model='haydavies', context=None, beam_only=False,
                        **kwargs):
         """
         Uses the :py:func:`irradiance.get_total_irradiance` function to
         calculate the plane of array irradiance components on a Dual axis
         tracker.
 
+        With ``beam_only``, only the beam component is calculated with
+        :py:func:`irradiance.beam_component`, which is all a high
+        concentration module collects, so ``ghi``, ``dhi``, ``dni_extra``
+        and ``airmass`` are not needed.
+
         Parameters
         ----------
         solar_zenith : float or Series.
@@ -150,16 +233,21 @@ class CPVSystem(pvlib.pvsystem.PVSystem):
             Solar azimuth angle.
         dni : float or Series
             Direct Normal Irradiance
-        ghi : float or Series
-            Global horizontal irradiance
-        dhi : float or Series
-            Diffuse horizontal irradiance
+        ghi : None, float or Series, default None
+            Global horizontal irradiance. Required unless ``beam_only``.
+        dhi : None, float or Series, default None
+            Diffuse horizontal irradiance. Required unless ``beam_only``.
         dni_extra : None, float or Series, default None
             Extraterrestrial direct normal irradiance
         airmass : None, float or Series, default None
             Airmass
         model : String, default 'haydavies'
             Irradiance model.
+        context : None or AtmosphericContext, default None
+            Source of ``dni_extra`` and ``airmass`` when they are None, see
+            :py:func:`atmosphere.get_atmospheric_context`.
+        beam_only : bool, default False
+            If True, only ``poa_direct`` is calculated.
 
         **kwargs
             Passed to :func:`irradiance.total_irrad`.
@@ -167,16 +255,26 @@ class CPVSystem(pvlib.pvsystem.PVSystem):
         Returns
         -------
         poa_irradiance : DataFrame
-            Column names are: ``total, beam, sky, ground``.
+            Column names are: ``total, beam, sky, ground``, only ``poa_direct``
+            with ``beam_only``.
         """
 
-        # not needed for all models, but this is easier
-        if dni_extra is None:
-            dni_extra = pvlib.irradiance.get_extra_radiation(
-                solar_zenith.index)
+        if beam_only:
+            poa_direct = pvlib.irradiance.beam_component(90 - solar_zenith,
+                                                         solar_azimuth,
+                                                         solar_zenith,
+                                                         solar_azimuth,
+                                                         dni)
+            if isinstance(poa_direct, pd.Series):
+                return pd.DataFrame({'poa_direct': poa_direct})
+            return {'poa_direct': poa_direct}
 
-        if airmass is None:
-            airmass = pvlib.atmosphere.get_relative_airmass(solar_zenith)
+        if ghi is None or dhi is None:
+            raise ValueError('ghi and dhi are required unless beam_only')
+
+        # not needed for all models, but this is easier
+        dni_extra, airmass = _get_atmosphere(solar_zenith, dni_extra, airmass,
+                                             context)
 
         return pvlib.irradiance.get_total_irradiance(90 - solar_zenith,
                                                      solar_azimuth,
@@ -210,6 +308,41 @@ class CPVSystem(pvlib.pvsystem.PVSystem):
         return pvlib.temperature.pvsyst_cell(poa_global, temp_air, wind_speed,
                                              **kwargs)
 
+    def pvsyst_celltemp_transient(self, poa_global, temp_air, wind_speed=1.0,
+                                  initial_state=None):
+        """
+        Cell temperature with thermal inertia: :py:meth:`pvsyst_celltemp`
+        filtered by :py:func:`temperature.first_order` with the ``tau``
+        time constant [s] (and optional ``max_gap`` [s]) of
+        ``self.temperature_model_parameters``.
+
+        Parameters
+        ----------
+        poa_global : Series
+            Plane of array irradiance, with a DatetimeIndex.
+        temp_air : numeric or Series
+            Ambient dry bulb temperature in degrees C.
+        wind_speed : numeric or Series, default 1.0
+            Wind speed in m/s.
+        initial_state : None or ThermalState, default None
+            State returned by the previous chunk of data.
+
+        Returns
+        -------
+        temp_cell : Series
+        state : ThermalState
+        """
+        if 'tau' not in self.temperature_model_parameters:
+            raise AttributeError(
+                'Missing "tau" parameter in "temperature_model_parameters"')
+
+        temp_cell = self.pvsyst_celltemp(poa_global, temp_air, wind_speed)
+
+        return temperature.first_order(
+            temp_cell, self.temperature_model_parameters['tau'],
+            max_gap=self.temperature_model_parameters.get('max_gap'),
+            initial_state=initial_state)
+
     def get_am_util_factor(self, airmass, am_thld=None, am_uf_m_low=None, am_uf_m_high=None):
         """
         Retrieves the utilization factor for airmass.
@@ -321,29 +454,95 @@ class CPVSystem(pvlib.pvsystem.PVSystem):
 
         return dni_uf
 
-    def get_global_utilization_factor(self, airmass_absolute, temp_air):
+    def get_smr_util_factor(self, smr, smr_thld=None, smr_uf_m_low=None,
+                            smr_uf_m_high=None):
         """
-        Retrieves the global utilization factor (Air mass and Air temperature CPV effects)
+        Retrieves the utilization factor for the spectral matching ratio
+        (SMR) between the top and middle subcells.
+
+        If ``module_parameters`` contains ``smr_ref`` and ``smr_uf_ref``,
+        the utilization factor is interpolated between those breakpoints
+        (see :py:func:`get_breakpoints_util_factor`). Otherwise, the
+        two-slope model of ``smr_thld``, ``smr_uf_m_low`` and
+        ``smr_uf_m_high`` is used.
 
         Parameters
         ----------
-        airmass : numeric
-            absolute airmass.
+        smr : numeric
+            spectral matching ratio (top/mid).
+
+        smr_thld : numeric
+            limit between the two regression lines of the utilization factor.
+
+        smr_uf_m_low : numeric
+            slope of the first regression line of the utilization factor
+            for SMR.
+
+        smr_uf_m_high : numeric
+            slope of the second regression line of the utilization factor
+            for SMR.
+
+        Returns
+        -------
+        smr_uf : numeric
+            the utilization factor for SMR.
+        """
+        if smr_thld is not None:
+            smr_uf = get_simple_util_factor(x=smr, thld=smr_thld,
+                                            m_low=smr_uf_m_low,
+                                            m_high=smr_uf_m_high)
+        elif 'smr_ref' in self.module_parameters:
+            smr_uf = get_breakpoints_util_factor(
+                x=smr, x_ref=self.module_parameters['smr_ref'],
+                uf_ref=self.module_parameters['smr_uf_ref'])
+        else:
+            smr_uf = get_simple_util_factor(x=smr, thld=self.module_parameters['smr_thld'],
+                                            m_low=self.module_parameters['smr_uf_m_low'] /
+                                            self.module_parameters['IscDNI_top'],
+                                            m_high=self.module_parameters['smr_uf_m_high']/self.module_parameters['IscDNI_top'])
+
+        return smr_uf
+
+    def get_global_utilization_factor(self, airmass_absolute, temp_air,
+                                      smr=None, context=None):
+        """
+        Retrieves the global utilization factor (Air mass, Air temperature
+        and, optionally, spectral CPV effects)
+
+        Parameters
+        ----------
+        airmass : None or numeric
+            absolute airmass. If None, taken from ``context``.
         temp_air : numeric
             Ambient dry bulb temperature in degrees C.
+        smr : None or numeric, default None
+            spectral matching ratio (top/mid). If given, its utilization
+            factor is added with the ``weight_smr`` of ``module_parameters``.
+        context : None or AtmosphericContext, default None
+            see :py:func:`atmosphere.get_atmospheric_context`.
 
         Returns
         -------
         uf_global : numeric
             the global utilization factor.
         """
-        uf_am = self.get_am_util_factor(airmass=airmass_absolute)
+        uf_am = self.get_am_util_factor(
+            airmass=_get_airmass_absolute(airmass_absolute, context))
 
         uf_ta = self.get_tempair_util_factor(temp_air=temp_air)
 
         uf_global = (uf_am * self.module_parameters['weight_am'] +
                      uf_ta * self.module_parameters['weight_temp'])
 
+        if smr is not None:
+            if 'weight_smr' not in self.module_parameters:
+                raise AttributeError(
+                    'Missing "weight_smr" parameter in "module_parameters"')
+
+            uf_smr = self.get_smr_util_factor(smr=smr)
+
+            uf_global = uf_global + uf_smr * self.module_parameters['weight_smr']
+
         return uf_global
 
 
@@ -413,6 +612,11 @@ class StaticCPVSystem(CPVSystem):
         Conttros if the system is mounted in a NS single axis tracker
         If true, it affects get_aoi() and get_irradiance()
 
+    tracker_table : None or TrackerTable, default None
+        Precomputed tracker rotation angles, see
+        :py:class:`tracking.TrackerTable`. If given, they are looked up
+        instead of calling :py:func:`pvlib.tracking.singleaxis`.
+
     name : None or string, default None
 
     **kwargs
@@ -427,6 +631,7 @@ class StaticCPVSystem(CPVSystem):
                  in_singleaxis_tracker=False,
                  b=None,
                  parameters_tracker=None,
+                 tracker_table=None,
                  modules_per_string=1, strings_per_inverter=1,
                  inverter=None, inverter_parameters=None,
                  racking_model='freestanding',
@@ -442,6 +647,8 @@ class StaticCPVSystem(CPVSystem):
         else:
             self.parameters_tracker = parameters_tracker
 
+        self.tracker_table = tracker_table
+
         super().__init__(module, module_parameters, temperature_model_parameters, modules_per_string,
                          strings_per_inverter, inverter, inverter_parameters,
                          racking_model, losses_parameters, name, **kwargs)
@@ -451,6 +658,13 @@ class StaticCPVSystem(CPVSystem):
         return ('StaticCPVSystem: \n  ' + '\n  '.join(
             ('{}: {}'.format(attr, getattr(self, attr)) for attr in attrs)))
 
+    def _get_arguments(self):
+        arguments = super()._get_arguments()
+        arguments.update(_get_attributes(self, [
+            'surface_tilt', 'surface_azimuth', 'in_singleaxis_tracker',
+            'parameters_tracker', 'tracker_table']))
+        return arguments
+
     def get_aoi(self, solar_zenith, solar_azimuth):
         """Get the angle of incidence on the system.
 
@@ -467,8 +681,7 @@ class StaticCPVSystem(CPVSystem):
             The angle of incidence
         """
         if self.in_singleaxis_tracker:
-            aoi = pvlib.tracking.singleaxis(
-                solar_zenith, solar_azimuth, **self.parameters_tracker).aoi
+            aoi = _singleaxis(self, solar_zenith, solar_azimuth)['aoi']
         else:
             aoi = pvlib.irradiance.aoi(self.surface_tilt, self.surface_azimuth,
                                        solar_zenith, solar_azimuth)
@@ -541,11 +754,10 @@ class StaticCPVSystem(CPVSystem):
         """
 
         if self.in_singleaxis_tracker:
-            tracking_info = pvlib.tracking.singleaxis(
-                solar_zenith, solar_azimuth, **self.parameters_tracker)
+            tracking_info = _singleaxis(self, solar_zenith, solar_azimuth)
 
-            surface_tilt = tracking_info.surface_tilt
-            surface_azimuth = tracking_info.surface_azimuth
+            surface_tilt = tracking_info['surface_tilt']
+            surface_azimuth = tracking_info['surface_azimuth']
         else:
             surface_tilt = self.surface_tilt
             surface_azimuth = self.surface_azimuth
@@ -559,7 +771,8 @@ class StaticCPVSystem(CPVSystem):
 
         return dii
 
-    def get_effective_irradiance(self, solar_zenith, solar_azimuth, dni):
+    def get_effective_irradiance(self, solar_zenith, solar_azimuth, dni,
+                                 aoi=None):
         """
         Calculates the effective irradiance (taking into account the IAM)
 
@@ -571,6 +784,9 @@ class StaticCPVSystem(CPVSystem):
             Solar azimuth angle.
         dni : float or Series
             Direct Normal Irradiance
+        aoi : None or float or Series, default None
+            Angle of incidence, e.g. precomputed with :py:meth:`get_aoi`.
+            If given, the beam component is derived from it.
 
         Returns
         -------
@@ -579,9 +795,11 @@ class StaticCPVSystem(CPVSystem):
             Beam component of the plane of array irradiance plus the effect of AOI
         """
 
-        dii = self.get_irradiance(solar_zenith, solar_azimuth, dni)
-
-        aoi = self.get_aoi(solar_zenith, solar_azimuth)
+        if aoi is None:
+            dii = self.get_irradiance(solar_zenith, solar_azimuth, dni)
+            aoi = self.get_aoi(solar_zenith, solar_azimuth)
+        else:
+            dii = np.maximum(dni * pvlib.tools.cosd(aoi), 0)
 
         dii_effective = dii * \
             self.get_iam(aoi, iam_model=self.module_parameters['iam_model'])
@@ -589,7 +807,7 @@ class StaticCPVSystem(CPVSystem):
         return dii_effective
 
 
-class StaticFlatPlateSystem(pvlib.pvsystem.PVSystem):
+class StaticFlatPlateSystem(pvlib.pvsystem.PVSystem, _Serializable):
     """
     The StaticFlatPlateSystem class defines a set of Static FlatPlate system attributes and
     modeling functions. This class describes the collection and interactions of
@@ -655,6 +873,11 @@ class StaticFlatPlateSystem(pvlib.pvsystem.PVSystem):
         Conttros if the system is mounted in a NS single axis tracker
         If true, it affects get_aoi() and get_irradiance()
 
+    tracker_table : None or TrackerTable, default None
+        Precomputed tracker rotation angles, see
+        :py:class:`tracking.TrackerTable`. If given, they are looked up
+        instead of calling :py:func:`pvlib.tracking.singleaxis`.
+
     name : None or string, default None
 
     **kwargs
@@ -669,6 +892,7 @@ class StaticFlatPlateSystem(pvlib.pvsystem.PVSystem):
                  modules_per_string=1,
                  in_singleaxis_tracker=False,
                  parameters_tracker=None,
+                 tracker_table=None,
                  strings_per_inverter=1,
                  inverter=None, inverter_parameters=None,
                  racking_model='freestanding',
@@ -681,6 +905,8 @@ class StaticFlatPlateSystem(pvlib.pvsystem.PVSystem):
         else:
             self.parameters_tracker = parameters_tracker
 
+        self.tracker_table = tracker_table
+
         super().__init__(surface_tilt=surface_tilt, surface_azimuth=surface_azimuth,
                          albedo=None, surface_type=None,
                          module=module, module_type='glass_polymer',
@@ -696,6 +922,24 @@ class StaticFlatPlateSystem(pvlib.pvsystem.PVSystem):
         return ('StaticFlatPlateSystem: \n  ' + '\n  '.join(
             ('{}: {}'.format(attr, getattr(self, attr)) for attr in attrs)))
 
+    def _get_arguments(self):
+        return _get_attributes(self, [
+            'surface_tilt', 'surface_azimuth', 'module', 'module_parameters',
+            'temperature_model_parameters', 'modules_per_string',
+            'in_singleaxis_tracker', 'parameters_tracker', 'tracker_table',
+            'strings_per_inverter', 'inverter', 'inverter_parameters',
+            'racking_model', 'losses_parameters', 'name'])
+
+    def get_loss_stack(self):
+        """
+        Returns
+        -------
+        stack : LossStack
+            Stack of the ``losses_parameters`` (% constant or time series),
+            see :py:class:`losses.LossStack`.
+        """
+        return losses.LossStack.from_parameters(self.losses_parameters)
+
     def get_aoi(self, solar_zenith, solar_azimuth):
         """Get the angle of incidence on the system.
 
@@ -712,8 +956,7 @@ class StaticFlatPlateSystem(pvlib.pvsystem.PVSystem):
             The angle of incidence
         """
         if self.in_singleaxis_tracker:
-            aoi = pvlib.tracking.singleaxis(
-                solar_zenith, solar_azimuth, **self.parameters_tracker).aoi
+            aoi = _singleaxis(self, solar_zenith, solar_azimuth)['aoi']
         else:
             aoi = pvlib.irradiance.aoi(self.surface_tilt, self.surface_azimuth,
                                        solar_zenith, solar_azimuth)
@@ -774,7 +1017,8 @@ class StaticFlatPlateSystem(pvlib.pvsystem.PVSystem):
     
     def get_effective_irradiance(self, solar_zenith, solar_azimuth, dni=None,
                        ghi=None, dhi=None, dii=None, gii=None, dni_extra=None,
-                       airmass=None, model='haydavies', spillage=0, **kwargs):
+                       airmass=None, model='haydavies', spillage=0, aoi=None,
+                       context=None, **kwargs):
         """
         Calculates the plane of array irradiance of a Static Flat Plate system
         from dii and gii. If any is missing then is calculated from ghi, dhi and dhi
@@ -812,6 +1056,12 @@ class StaticFlatPlateSystem(pvlib.pvsystem.PVSystem):
             Irradiance model.
         spillage : float
             Percentage of dii allowed to pass into the system
+        aoi : None or numeric, default None
+            Angle of incidence, e.g. precomputed with :py:meth:`get_aoi`.
+            If None, it is calculated.
+        context : None or AtmosphericContext, default None
+            Source of ``dni_extra`` and ``airmass`` when they are None, see
+            :py:func:`atmosphere.get_atmospheric_context`.
 
         Returns
         -------
@@ -820,19 +1070,14 @@ class StaticFlatPlateSystem(pvlib.pvsystem.PVSystem):
         """
 
         # not needed for all models, but this is easier
-        if dni_extra is None:
-            dni_extra = pvlib.irradiance.get_extra_radiation(
-                solar_zenith.index)
-
-        if airmass is None:
-            airmass = pvlib.atmosphere.get_relative_airmass(solar_zenith)
+        dni_extra, airmass = _get_atmosphere(solar_zenith, dni_extra, airmass,
+                                             context)
 
         if self.in_singleaxis_tracker:
-            tracking_info = pvlib.tracking.singleaxis(
-                solar_zenith, solar_azimuth, **self.parameters_tracker)
+            tracking_info = _singleaxis(self, solar_zenith, solar_azimuth)
 
-            surface_tilt = tracking_info.surface_tilt
-            surface_azimuth = tracking_info.surface_azimuth
+            surface_tilt = tracking_info['surface_tilt']
+            surface_azimuth = tracking_info['surface_azimuth']
         else:
             surface_tilt = self.surface_tilt
             surface_azimuth = self.surface_azimuth
@@ -862,7 +1107,8 @@ class StaticFlatPlateSystem(pvlib.pvsystem.PVSystem):
         else:
             poa_diffuse = gii - dii
 
-        aoi = self.get_aoi(solar_zenith, solar_azimuth)
+        if aoi is None:
+            aoi = self.get_aoi(solar_zenith, solar_azimuth)
 
         dii_effective = dii * self.get_iam(aoi)
         gii_effective = dii_effective + poa_diffuse
@@ -877,8 +1123,13 @@ class StaticFlatPlateSystem(pvlib.pvsystem.PVSystem):
             raise AttributeError(
                 'Missing "aoi_limit" parameter in "module_parameters"')
 
-        poa_flatplate_static_effective = pd.concat(
-            [poa_diffuse_dii_effective_spillage[aoi < aoi_limit], gii_effective[aoi > aoi_limit]]).sort_index()
+        poa_flatplate_static_effective = np.where(
+            aoi < aoi_limit, poa_diffuse_dii_effective_spillage,
+            np.where(aoi > aoi_limit, gii_effective, np.nan))
+
+        if isinstance(solar_zenith, pd.Series):
+            poa_flatplate_static_effective = pd.Series(
+                poa_flatplate_static_effective, index=solar_zenith.index)
 
         return poa_flatplate_static_effective
 
@@ -904,8 +1155,43 @@ class StaticFlatPlateSystem(pvlib.pvsystem.PVSystem):
         return pvlib.temperature.pvsyst_cell(poa_flatplate_static, temp_air, wind_speed,
                                              **kwargs)
 
+    def pvsyst_celltemp_transient(self, poa_flatplate_static, temp_air, wind_speed=1.0,
+                                  initial_state=None):
+        """
+        Cell temperature with thermal inertia: :py:meth:`pvsyst_celltemp`
+        filtered by :py:func:`temperature.first_order` with the ``tau``
+        time constant [s] (and optional ``max_gap`` [s]) of
+        ``self.temperature_model_parameters``.
+
+        Parameters
+        ----------
+        poa_flatplate_static : Series
+            Plane of array irradiance, with a DatetimeIndex.
+        temp_air : numeric or Series
+            Ambient dry bulb temperature in degrees C.
+        wind_speed : numeric or Series, default 1.0
+            Wind speed in m/s.
+        initial_state : None or ThermalState, default None
+            State returned by the previous chunk of data.
+
+        Returns
+        -------
+        temp_cell : Series
+        state : ThermalState
+        """
+        if 'tau' not in self.temperature_model_parameters:
+            raise AttributeError(
+                'Missing "tau" parameter in "temperature_model_parameters"')
+
+        temp_cell = self.pvsyst_celltemp(poa_flatplate_static, temp_air, wind_speed)
+
+        return temperature.first_order(
+            temp_cell, self.temperature_model_parameters['tau'],
+            max_gap=self.temperature_model_parameters.get('max_gap'),
+            initial_state=initial_state)
 
-class StaticHybridSystem():
+
+class StaticHybridSystem(_Serializable):
     """
     The StaticHybridSystem class defines a set of Static Hybrid system attributes and
     modeling functions. This class describes the collection and interactions of
@@ -968,10 +1254,26 @@ class StaticHybridSystem():
     losses_parameters : None, dict or Series, default None
         Losses parameters as defined by PVWatts or other.
 
+    losses_parameters_cpv, losses_parameters_flatplate : None, dict or Series, default None
+        Losses parameters of each subsystem, see
+        :py:class:`losses.LossStack`. If None, ``losses_parameters``.
+
     in_singleaxis_tracker : None or bool, defult False
         Conttros if the system is mounted in a NS single axis tracker
         If true, it affects get_aoi() and get_irradiance()
 
+    tracker_table : None or TrackerTable, default None
+        Precomputed tracker rotation angles, see
+        :py:class:`tracking.TrackerTable`. If given, they are looked up
+        instead of calling :py:func:`pvlib.tracking.singleaxis`.
+
+    parallel : bool, default False
+        If True, the StaticCPVSystem and StaticFlatPlateSystem branches of
+        get_effective_irradiance, pvsyst_celltemp, pvsyst_celltemp_transient,
+        calcparams_pvsyst and singlediode run concurrently in two threads.
+        Worthwhile for long inputs (e.g. a year at 1 minute), since NumPy
+        and scipy release the GIL.
+
     name : None or string, default None
 
     **kwargs
@@ -990,12 +1292,16 @@ class StaticHybridSystem():
                  temperature_model_parameters_flatplate=None,
                  in_singleaxis_tracker=False,
                  parameters_tracker=None,
+                 tracker_table=None,
                  modules_per_string=1,
                  strings_per_inverter=1,
                  inverter=None,
                  inverter_parameters=None,
                  racking_model="insulated",
                  losses_parameters=None,
+                 losses_parameters_cpv=None,
+                 losses_parameters_flatplate=None,
+                 parallel=False,
                  name=None,
                  **kwargs):
 
@@ -1025,6 +1331,8 @@ class StaticHybridSystem():
         else:
             self.parameters_tracker = parameters_tracker
 
+        self.tracker_table = tracker_table
+
         self.modules_per_string = modules_per_string
         self.strings_per_inverter = strings_per_inverter
 
@@ -1041,6 +1349,13 @@ class StaticHybridSystem():
 
         self.racking_model = racking_model
 
+        if losses_parameters_cpv is None:
+            losses_parameters_cpv = losses_parameters
+        if losses_parameters_flatplate is None:
+            losses_parameters_flatplate = losses_parameters
+
+        self.parallel = parallel
+
         self.static_cpv_sys = StaticCPVSystem(
             surface_tilt=surface_tilt,
             surface_azimuth=surface_azimuth,
@@ -1048,12 +1363,14 @@ class StaticHybridSystem():
             module_parameters=module_parameters_cpv,
             temperature_model_parameters=temperature_model_parameters_cpv,
             in_singleaxis_tracker=in_singleaxis_tracker,
+            parameters_tracker=parameters_tracker,
+            tracker_table=tracker_table,
             modules_per_string=modules_per_string,
             strings_per_inverter=strings_per_inverter,
             inverter=inverter,
             inverter_parameters=inverter_parameters,
             racking_model=racking_model,
-            losses_parameters=losses_parameters,
+            losses_parameters=losses_parameters_cpv,
             name=name,
         )
 
@@ -1064,12 +1381,14 @@ class StaticHybridSystem():
             module_parameters=module_parameters_flatplate,
             temperature_model_parameters=temperature_model_parameters_flatplate,
             in_singleaxis_tracker=in_singleaxis_tracker,
+            parameters_tracker=parameters_tracker,
+            tracker_table=tracker_table,
             modules_per_string=modules_per_string,
             strings_per_inverter=strings_per_inverter,
             inverter=inverter,
             inverter_parameters=inverter_parameters,
             racking_model=racking_model,
-            losses_parameters=losses_parameters,
+            losses_parameters=losses_parameters_flatplate,
             name=name,
         )
 
@@ -1079,9 +1398,41 @@ class StaticHybridSystem():
         return ('StaticHybridSystem: \n  ' + '\n  '.join(
             ('{}: {}'.format(attr, getattr(self, attr)) for attr in attrs)))
 
+    def _get_arguments(self):
+        arguments = _get_attributes(self, [
+            'surface_tilt', 'surface_azimuth', 'module_cpv',
+            'module_parameters_cpv', 'module_flatplate',
+            'module_parameters_flatplate', 'in_singleaxis_tracker',
+            'parameters_tracker', 'tracker_table', 'modules_per_string',
+            'strings_per_inverter', 'inverter', 'inverter_parameters',
+            'racking_model', 'losses_parameters', 'parallel', 'name'])
+        arguments['temperature_model_parameters_cpv'] = \
+            self.static_cpv_sys.temperature_model_parameters
+        arguments['temperature_model_parameters_flatplate'] = \
+            self.static_flatplate_sys.temperature_model_parameters
+        arguments['losses_parameters_cpv'] = \
+            self.static_cpv_sys.losses_parameters
+        arguments['losses_parameters_flatplate'] = \
+            self.static_flatplate_sys.losses_parameters
+        return arguments
+
+    def _branches(self, cpv, flatplate):
+        """
+        Evaluates the StaticCPVSystem and StaticFlatPlateSystem branches,
+        concurrently if ``self.parallel``. The CPV branch runs in the shared
+        thread pool and the flat plate one in the calling thread.
+        """
+        if not self.parallel:
+            return cpv(), flatplate()
+
+        future = _get_executor().submit(cpv)
+        result_flatplate = flatplate()
+        return future.result(), result_flatplate
+
     def get_effective_irradiance(self, solar_zenith, solar_azimuth, dni,
                                  ghi=None, dhi=None, dii=None, gii=None, dni_extra=None,
-                                 airmass=None, model='haydavies', spillage=0, **kwargs):
+                                 airmass=None, model='haydavies', spillage=0,
+                                 context=None, **kwargs):
         """
         Calculates the effective irradiance (taking into account the IAM)
         TO BE VALIDATED
@@ -1110,6 +1461,9 @@ class StaticHybridSystem():
             Irradiance model.
         spillage : float
             Percentage of dii allowed to pass into the system
+        context : None or AtmosphericContext, default None
+            Source of ``dni_extra`` and ``airmass`` of the flat plate
+            transposition, see :py:func:`atmosphere.get_atmospheric_context`.
 
         Returns
         -------
@@ -1121,23 +1475,29 @@ class StaticHybridSystem():
             Plane of array irradiance plus the effect of AOI
         """
 
-        dii_effective = self.static_cpv_sys.get_effective_irradiance(
-            solar_zenith, solar_azimuth, dni)
-
-        aoi = self.static_flatplate_sys.get_aoi(solar_zenith, solar_azimuth)
-
-        poa_flatplate_static_effective = self.static_flatplate_sys.get_effective_irradiance(solar_zenith,
-                                                                                            solar_azimuth,
-                                                                                            aoi=aoi,
-                                                                                            dii=dii,
-                                                                                            gii=gii,
-                                                                                            ghi=ghi,
-                                                                                            dhi=dhi,
-                                                                                            dni=dni,
-                                                                                            model=model,
-                                                                                            spillage=spillage,
-                                                                                            **kwargs
-                                                                                            )
+        def flatplate():
+            aoi = self.static_flatplate_sys.get_aoi(solar_zenith, solar_azimuth)
+
+            return self.static_flatplate_sys.get_effective_irradiance(solar_zenith,
+                                                                      solar_azimuth,
+                                                                      aoi=aoi,
+                                                                      dii=dii,
+                                                                      gii=gii,
+                                                                      ghi=ghi,
+                                                                      dhi=dhi,
+                                                                      dni=dni,
+                                                                      dni_extra=dni_extra,
+                                                                      airmass=airmass,
+                                                                      model=model,
+                                                                      context=context,
+                                                                      spillage=spillage,
+                                                                      **kwargs
+                                                                      )
+
+        dii_effective, poa_flatplate_static_effective = self._branches(
+            partial(self.static_cpv_sys.get_effective_irradiance,
+                    solar_zenith, solar_azimuth, dni),
+            flatplate)
 
         return dii_effective, poa_flatplate_static_effective
 
@@ -1160,14 +1520,52 @@ class StaticHybridSystem():
         See pvsystem.pvsyst_celltemp for details
         """
 
-        celltemp_cpv = self.static_cpv_sys.pvsyst_celltemp(
-            dii, temp_air, wind_speed)
-
-        celltemp_flatplate = self.static_flatplate_sys.pvsyst_celltemp(
-            poa_flatplate_static, temp_air, wind_speed)
+        celltemp_cpv, celltemp_flatplate = self._branches(
+            partial(self.static_cpv_sys.pvsyst_celltemp,
+                    dii, temp_air, wind_speed),
+            partial(self.static_flatplate_sys.pvsyst_celltemp,
+                    poa_flatplate_static, temp_air, wind_speed))
 
         return celltemp_cpv, celltemp_flatplate
 
+    def pvsyst_celltemp_transient(self, dii, poa_flatplate_static, temp_air,
+                                  wind_speed=1.0, initial_state=None):
+        """
+        Cell temperatures with thermal inertia, using the ``tau`` time
+        constant of each subsystem, see
+        :py:meth:`StaticCPVSystem.pvsyst_celltemp_transient`.
+
+        Parameters
+        ----------
+        dii : Series
+            Direct (on the) Inclinated (plane) Irradiance [StaticCPVSystem]
+        poa_flatplate_static : Series
+            Plane of Array Irradiance [StaticFlatPlateSystem]
+        temp_air : numeric or Series
+            Ambient dry bulb temperature in degrees C.
+        wind_speed : numeric or Series, default 1.0
+            Wind speed in m/s.
+        initial_state : None or tuple of ThermalState, default None
+            States (CPV, flat plate) returned by the previous chunk of data.
+
+        Returns
+        -------
+        celltemp_cpv, celltemp_flatplate : Series
+        state : tuple of ThermalState
+            States (CPV, flat plate) to continue on the next chunk.
+        """
+        if initial_state is None:
+            initial_state = (None, None)
+
+        (celltemp_cpv, state_cpv), (celltemp_flatplate, state_flatplate) = self._branches(
+            partial(self.static_cpv_sys.pvsyst_celltemp_transient,
+                    dii, temp_air, wind_speed, initial_state=initial_state[0]),
+            partial(self.static_flatplate_sys.pvsyst_celltemp_transient,
+                    poa_flatplate_static, temp_air, wind_speed,
+                    initial_state=initial_state[1]))
+
+        return celltemp_cpv, celltemp_flatplate, (state_cpv, state_flatplate)
+
     def calcparams_pvsyst(self, dii, poa_flatplate_static, temp_cell_cpv, temp_cell_flatplate):
         """
         Use the :py:func:`calcparams_pvsyst` function, the input
@@ -1189,11 +1587,11 @@ class StaticHybridSystem():
         See pvsystem.calcparams_pvsyst for details
         """
 
-        diode_parameters_cpv = self.static_cpv_sys.calcparams_pvsyst(
-            dii, temp_cell_cpv)
-
-        diode_parameters_flatplate = self.static_flatplate_sys.calcparams_pvsyst(
-            poa_flatplate_static, temp_cell_flatplate)
+        diode_parameters_cpv, diode_parameters_flatplate = self._branches(
+            partial(self.static_cpv_sys.calcparams_pvsyst,
+                    dii, temp_cell_cpv),
+            partial(self.static_flatplate_sys.calcparams_pvsyst,
+                    poa_flatplate_static, temp_cell_flatplate))
 
         return diode_parameters_cpv, diode_parameters_flatplate
 
@@ -1206,28 +1604,97 @@ class StaticHybridSystem():
 
         Returns
         -------
-        See pvsystem.singlediode for details
+        See pvsystem.singlediode for details. For the IV curves of many
+        samples, see :py:meth:`ivcurves`.
         """
 
-        dc_cpv = self.static_cpv_sys.singlediode(*diode_parameters_cpv,
-                                                 ivcurve_pnts=ivcurve_pnts)
-
-        dc_flatplate = self.static_flatplate_sys.singlediode(*diode_parameters_flatplate,
-                                                             ivcurve_pnts=ivcurve_pnts)
+        dc_cpv, dc_flatplate = self._branches(
+            partial(self.static_cpv_sys.singlediode, *diode_parameters_cpv,
+                    ivcurve_pnts=ivcurve_pnts),
+            partial(self.static_flatplate_sys.singlediode,
+                    *diode_parameters_flatplate, ivcurve_pnts=ivcurve_pnts))
 
         return dc_cpv, dc_flatplate
 
-    def get_global_utilization_factor_cpv(self, airmass_absolute, temp_air):
+    def ivcurves(self, diode_parameters_cpv, diode_parameters_flatplate,
+                 ivcurve_pnts=100, dtype='float64', directory=None):
         """
-        Retrieves the global utilization factor (Air mass and Air temperature CPV effects)
-        for the StaticCPVSystem subsystem
+        Dense IV curves of both subsystems, evaluated on all the samples at
+        once, see :py:func:`electrical.ivcurves`.
 
         Parameters
         ----------
-        airmass : numeric
-            absolute airmass.
+        diode_parameters_cpv, diode_parameters_flatplate : tuple
+            Output of :py:meth:`calcparams_pvsyst`.
+        ivcurve_pnts : int, default 100
+            Number of points of each curve.
+        dtype : str or numpy dtype, default 'float64'
+            dtype of the arrays, e.g. 'float32'.
+        directory : None, str or Path, default None
+            If given, the arrays are memory-mapped to ``cpv_v.npy``,
+            ``cpv_i.npy``, ``flatplate_v.npy`` and ``flatplate_i.npy`` in
+            this directory.
+
+        Returns
+        -------
+        ivcurves_cpv, ivcurves_flatplate : IVCurves
+            ``v`` and ``i`` arrays of shape (samples, ivcurve_pnts).
+        """
+        def filename(name):
+            if directory is None:
+                return None
+            return str(Path(directory) / name)
+
+        return self._branches(
+            partial(electrical.ivcurves, *diode_parameters_cpv,
+                    ivcurve_pnts=ivcurve_pnts, dtype=dtype,
+                    filename=filename('cpv')),
+            partial(electrical.ivcurves, *diode_parameters_flatplate,
+                    ivcurve_pnts=ivcurve_pnts, dtype=dtype,
+                    filename=filename('flatplate')))
+
+    def combine(self, diode_parameters_cpv, diode_parameters_flatplate,
+                connection='series', **kwargs):
+        """
+        Maximum power point of the StaticCPVSystem and StaticFlatPlateSystem
+        submodules wired in series, in parallel or on separate MPPTs, solved
+        for all the samples at once, see :py:func:`electrical.combine`.
+
+        Parameters
+        ----------
+        diode_parameters_cpv, diode_parameters_flatplate : tuple
+            Output of :py:meth:`calcparams_pvsyst`.
+        connection : str, default 'series'
+            'series', 'parallel' or 'separate'.
+        **kwargs
+            Passed to :py:func:`electrical.combine`.
+
+        Returns
+        -------
+        dc : DataFrame or OrderedDict
+            ``p_mp, v_mp, i_mp`` of the combination.
+        """
+        return electrical.combine(diode_parameters_cpv,
+                                  diode_parameters_flatplate,
+                                  connection=connection, **kwargs)
+
+    def get_global_utilization_factor_cpv(self, airmass_absolute, temp_air,
+                                          smr=None, context=None):
+        """
+        Retrieves the global utilization factor (Air mass, Air temperature
+        and, optionally, spectral CPV effects) for the StaticCPVSystem
+        subsystem
+
+        Parameters
+        ----------
+        airmass : None or numeric
+            absolute airmass. If None, taken from ``context``.
         temp_air : numeric
             Ambient dry bulb temperature in degrees C.
+        smr : None or numeric, default None
+            spectral matching ratio (top/mid).
+        context : None or AtmosphericContext, default None
+            see :py:func:`atmosphere.get_atmospheric_context`.
 
         Returns
         -------
@@ -1236,15 +1703,93 @@ class StaticHybridSystem():
         """
 
         uf_am = self.static_cpv_sys.get_am_util_factor(
-            airmass=airmass_absolute)
+            airmass=_get_airmass_absolute(airmass_absolute, context))
 
         uf_ta = self.static_cpv_sys.get_tempair_util_factor(temp_air=temp_air)
 
         uf_global = (uf_am * self.static_cpv_sys.module_parameters['weight_am'] +
                      uf_ta * self.static_cpv_sys.module_parameters['weight_temp'])
 
+        if smr is not None:
+            if 'weight_smr' not in self.static_cpv_sys.module_parameters:
+                raise AttributeError(
+                    'Missing "weight_smr" parameter in "module_parameters_cpv"')
+
+            uf_smr = self.static_cpv_sys.get_smr_util_factor(smr=smr)
+
+            uf_global = uf_global + uf_smr * self.static_cpv_sys.module_parameters['weight_smr']
+
         return uf_global
 
+    def run_model(self, solar_zenith, solar_azimuth, weather,
+                  airmass_absolute=None, spillage=0, free_intermediates=False,
+                  irradiance_threshold=None, fill_value=0.,
+                  irradiance_resolution=None, temperature_resolution=None,
+                  apply_losses=False, context=None, **kwargs):
+        """
+        Runs the model chain lazily: effective irradiance, cell temperature,
+        diode parameters, singlediode and CPV utilization factor are only
+        computed when the corresponding attribute of the returned object is
+        accessed.
+
+        Parameters
+        ----------
+        solar_zenith : Series
+            Solar zenith angle.
+        solar_azimuth : Series
+            Solar azimuth angle.
+        weather : DataFrame
+            Columns are ``dni, temp_air`` and optionally ``ghi, dhi, dii,
+            gii, wind_speed``.
+        airmass_absolute : None or Series, default None
+            Absolute airmass. Required by the CPV utilization factor, unless
+            ``context`` is given.
+        spillage : float, default 0
+            Percentage of dii allowed to pass into the flat plate subsystem.
+        free_intermediates : bool, default False
+            If True, intermediate quantities are released once the
+            requested quantity is computed.
+        irradiance_threshold : None or float, default None
+            If not None, the electrical model is only evaluated on the
+            samples with sun above the horizon and effective irradiance
+            above ``irradiance_threshold`` [W/m2].
+        fill_value : float, default 0.
+            Output power of the samples skipped by ``irradiance_threshold``.
+        irradiance_resolution, temperature_resolution : None or float, default None
+            If any of them is not None, the electrical model is solved once
+            per unique pair of quantized irradiance and temperature.
+        apply_losses : bool, default False
+            If True, ``p_mp_cpv`` and ``p_mp_flatplate`` include the losses
+            of ``losses_parameters_cpv`` and ``losses_parameters_flatplate``.
+        context : None or AtmosphericContext, default None
+            Airmass and extraterrestrial irradiance shared by the flat plate
+            transposition and the CPV utilization factor, see
+            :py:func:`atmosphere.get_atmospheric_context`.
+        **kwargs
+            Passed to :py:meth:`StaticFlatPlateSystem.get_effective_irradiance`.
+
+        Returns
+        -------
+        results : HybridResults
+            Attributes are ``dii_effective, poa_flatplate_static_effective,
+            temp_cell_cpv, temp_cell_flatplate, diode_parameters_cpv,
+            diode_parameters_flatplate, dc_cpv, dc_flatplate, uf_cpv,
+            p_mp_cpv, p_mp_flatplate`` and, with ``apply_losses``,
+            ``losses_cpv, losses_flatplate``.
+        """
+
+        return HybridResults(self, solar_zenith, solar_azimuth, weather,
+                             airmass_absolute=airmass_absolute,
+                             spillage=spillage,
+                             free_intermediates=free_intermediates,
+                             irradiance_threshold=irradiance_threshold,
+                             fill_value=fill_value,
+                             irradiance_resolution=irradiance_resolution,
+                             temperature_resolution=temperature_resolution,
+                             apply_losses=apply_losses,
+                             context=context,
+                             **kwargs)
+
 
 def get_simple_util_factor(x, thld, m_low, m_high):
     """
@@ -1252,7 +1797,7 @@ def get_simple_util_factor(x, thld, m_low, m_high):
 
     Parameters
     ----------
-    x : numeric / pd.Series
+    x : numeric, np.ndarray or pd.Series
         variable value(s) for the utilization factor calc.
 
     thld : numeric
@@ -1275,13 +1820,214 @@ def get_simple_util_factor(x, thld, m_low, m_high):
         simple_uf = 1 + (x - thld) * m_low
 
     else:
-        def f(value):
-            if value <= thld:
-                s = 1 + (value - thld) * m_low
-            else:
-                s = 1 + (value - thld) * m_high
-            return s
+        simple_uf = np.where(np.asarray(x) <= thld,
+                             1 + (x - thld) * m_low,
+                             1 + (x - thld) * m_high)
 
-        simple_uf = x.apply(f)
+        if isinstance(x, pd.Series):
+            simple_uf = pd.Series(simple_uf, index=x.index, name=x.name)
 
     return simple_uf
+
+
+def get_breakpoints_util_factor(x, x_ref, uf_ref):
+    """
+    Retrieves the utilization factor for a variable from a piecewise linear
+    curve defined by n breakpoints. Out of the breakpoints range, the
+    utilization factor of the closest breakpoint is used.
+
+    Parameters
+    ----------
+    x : numeric, np.ndarray or pd.Series
+        variable value(s) for the utilization factor calc.
+
+    x_ref : array-like
+        increasing variable values of the breakpoints.
+
+    uf_ref : array-like
+        utilization factor at each breakpoint.
+
+    Returns
+    -------
+    uf : numeric
+        utilization factor for the x variable.
+    """
+    uf = np.interp(x, x_ref, uf_ref)
+
+    if isinstance(x, pd.Series):
+        uf = pd.Series(uf, index=x.index, name=x.name)
+
+    return uf
+
+
+def _get_atmosphere(solar_zenith, dni_extra, airmass, context):
+    """dni_extra and relative airmass, from ``context`` if not given."""
+    if dni_extra is None:
+        if context is not None:
+            dni_extra = context.dni_extra
+        else:
+            dni_extra = pvlib.irradiance.get_extra_radiation(
+                solar_zenith.index)
+
+    if airmass is None:
+        if context is not None:
+            airmass = context.airmass_relative
+        else:
+            airmass = pvlib.atmosphere.get_relative_airmass(solar_zenith)
+
+    return dni_extra, airmass
+
+
+def _get_airmass_absolute(airmass_absolute, context):
+    if airmass_absolute is None:
+        if context is None:
+            raise ValueError('airmass_absolute or context is required')
+        airmass_absolute = context.airmass_absolute
+    return airmass_absolute
+
+
+def _get_attributes(system, names):
+    return {name: getattr(system, name) for name in names}
+
+
+def _encode(value):
+    """Converts a value into JSON serializable types, exactly."""
+    if isinstance(value, dict):
+        return {str(k): _encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        return {'__ndarray__': base64.b64encode(value.tobytes()).decode(),
+                'dtype': value.dtype.str, 'shape': list(value.shape)}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Series):
+        return {'__series__': {'index': _encode_index(value.index),
+                               'values': _encode_values(value.array),
+                               'name': _encode(value.name)}}
+    if isinstance(value, tracking.TrackerTable):
+        return {'__tracker_table__': _encode({
+            'seconds': value.seconds, 'tracker_theta': value.tracker_theta,
+            'parameters_tracker': value.parameters_tracker,
+            'metadata': value.metadata})}
+    return value
+
+
+def _encode_values(values):
+    values = np.asarray(values)
+    if values.dtype.kind in 'biufcmM':
+        return _encode(values)
+    return {'__objects__': _encode(values.tolist())}
+
+
+def _decode_values(value):
+    if isinstance(value, dict) and '__objects__' in value:
+        values = np.empty(len(value['__objects__']), dtype=object)
+        values[:] = _decode(value['__objects__'])
+        return values
+    return _decode(value)
+
+
+def _encode_index(index):
+    """Encodes an index keeping its dtype and, for datetimes, its tz."""
+    if isinstance(index, pd.DatetimeIndex):
+        return {'__datetimeindex__': _encode(index.asi8),
+                'tz': None if index.tz is None else str(index.tz),
+                'freq': index.freqstr, 'name': _encode(index.name)}
+    return {'__index__': _encode_values(index), 'name': _encode(index.name)}
+
+
+def _decode_index(value):
+    if '__datetimeindex__' in value:
+        index = pd.DatetimeIndex(_decode(value['__datetimeindex__']),
+                                 name=_decode(value['name']))
+        if value['tz'] is not None:
+            index = index.tz_localize('UTC').tz_convert(value['tz'])
+        if value['freq'] is not None:
+            index = pd.DatetimeIndex(index, freq=value['freq'])
+        return index
+    return pd.Index(_decode_values(value['__index__']),
+                    name=_decode(value['name']))
+
+
+def _decode(value):
+    """Inverse of :py:func:`_encode`."""
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if '__ndarray__' in value:
+        return np.frombuffer(base64.b64decode(value['__ndarray__']),
+                             dtype=value['dtype']).reshape(
+                                 value['shape']).copy()
+    if '__series__' in value:
+        series = value['__series__']
+        return pd.Series(_decode_values(series['values']),
+                         index=_decode_index(series['index']),
+                         name=_decode(series['name']))
+    if '__tracker_table__' in value:
+        return tracking.TrackerTable(**_decode(value['__tracker_table__']))
+    return {k: _decode(v) for k, v in value.items()}
+
+
+def from_dict(data):
+    """
+    Creates a CPVSystem, StaticCPVSystem, StaticFlatPlateSystem or
+    StaticHybridSystem from the output of its ``to_dict()``.
+
+    Parameters
+    ----------
+    data : dict
+
+    Returns
+    -------
+    system : CPVSystem, StaticCPVSystem, StaticFlatPlateSystem or StaticHybridSystem
+
+    Raises
+    ------
+    ValueError if the class is unknown or the version is newer than
+    ``SERIALIZATION_VERSION``.
+    """
+    classes = {cls.__name__: cls for cls in [
+        CPVSystem, StaticCPVSystem, StaticFlatPlateSystem, StaticHybridSystem]}
+
+    if data.get('class') not in classes:
+        raise ValueError('Unknown class: {}'.format(data.get('class')))
+    if data.get('version', 0) > SERIALIZATION_VERSION:
+        raise ValueError('Serialization version {} is newer than {}'.format(
+            data.get('version'), SERIALIZATION_VERSION))
+
+    return classes[data['class']](**_decode(data['arguments']))
+
+
+def from_bytes(data):
+    """
+    Creates a system from the output of its ``to_bytes()``, see
+    :py:func:`from_dict`.
+    """
+    return from_dict(json.loads(zlib.decompress(data)))
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Thread pool shared by the StaticHybridSystem with ``parallel=True``."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(thread_name_prefix='cpvlib')
+    return _executor
+
+
+def _singleaxis(system, solar_zenith, solar_azimuth):
+    """
+    Tracking info of a system mounted in a single axis tracker, looked up in
+    ``system.tracker_table`` if available.
+    """
+    if getattr(system, 'tracker_table', None) is not None:
+        return system.tracker_table.singleaxis(solar_zenith, solar_azimuth)
+    return pvlib.tracking.singleaxis(solar_zenith, solar_azimuth,
+                                     **system.parameters_tracker)
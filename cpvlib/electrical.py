@@ -0,0 +1,425 @@
+"""
+The ``electrical`` module evaluates the single diode electrical model
+(``calcparams_pvsyst`` and ``singlediode``) of a StaticCPVSystem or
+StaticFlatPlateSystem only on the samples that produce power.
+
+Night and near-zero irradiance samples are removed before the electrical
+model and the results are scattered back with a fill value. Optionally, the
+(irradiance, temperature) pairs are quantized and each unique pair is solved
+once.
+
+:py:func:`ivcurves` returns the IV curves of all the samples as dense 2-D
+arrays, optionally float32 and memory-mapped to disk, and :py:func:`combine`
+finds the maximum power point of the CPV and flat plate submodules wired in
+series or parallel.
+"""
+
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+import pvlib
+
+DC_COLUMNS = ['i_sc', 'v_oc', 'i_mp', 'v_mp', 'p_mp', 'i_x', 'i_xx']
+
+Deduplication = namedtuple('Deduplication', [
+    'effective_irradiance', 'temp_cell', 'inverse', 'hit_rate',
+    'irradiance_error', 'temperature_error'])
+
+IVCurves = namedtuple('IVCurves', ['v', 'i'])
+
+
+def get_mask(effective_irradiance, solar_zenith=None, irradiance_threshold=1.):
+    """
+    Selects the samples with sun above the horizon and effective irradiance
+    above a threshold.
+
+    Parameters
+    ----------
+    effective_irradiance : numeric or Series
+        Effective irradiance of the subsystem.
+    solar_zenith : None, numeric or Series, default None
+        Solar zenith angle. If None, only the irradiance is checked.
+    irradiance_threshold : None or float, default 1.
+        Samples with effective irradiance [W/m2] equal or lower are not
+        selected. NaN samples are never selected.
+
+    Returns
+    -------
+    mask : np.ndarray of bool
+    """
+    effective_irradiance = np.asarray(effective_irradiance, dtype=float)
+    if irradiance_threshold is None:
+        mask = ~np.isnan(effective_irradiance)
+    else:
+        mask = effective_irradiance > irradiance_threshold
+    if solar_zenith is not None:
+        mask &= np.asarray(solar_zenith, dtype=float) < 90
+    return mask
+
+
+def _quantize(x, resolution):
+    if resolution is None:
+        return x
+    return np.round(x / resolution) * resolution
+
+
+def deduplicate(effective_irradiance, temp_cell, irradiance_resolution=None,
+                temperature_resolution=None):
+    """
+    Quantizes the (irradiance, temperature) pairs and finds the unique ones.
+
+    Parameters
+    ----------
+    effective_irradiance : array-like
+        Effective irradiance, without NaN.
+    temp_cell : array-like
+        Cell temperature, without NaN.
+    irradiance_resolution : None or float, default None
+        Quantization step of the irradiance [W/m2]. If None, only equal
+        values are merged.
+    temperature_resolution : None or float, default None
+        Quantization step of the temperature [C]. If None, only equal
+        values are merged.
+
+    Returns
+    -------
+    deduplication : Deduplication
+        ``effective_irradiance`` and ``temp_cell`` are the unique quantized
+        pairs and ``inverse`` the index of the pair of every sample.
+        ``hit_rate`` is the fraction of samples that reuse the solution of
+        another one. ``irradiance_error`` and ``temperature_error`` are the
+        largest differences between a sample and its quantized pair.
+    """
+    effective_irradiance = np.asarray(effective_irradiance, dtype=float)
+    temp_cell = np.asarray(temp_cell, dtype=float)
+
+    effective_irradiance_q = _quantize(effective_irradiance,
+                                       irradiance_resolution)
+    temp_cell_q = _quantize(temp_cell, temperature_resolution)
+
+    pairs, inverse = np.unique(
+        np.stack([effective_irradiance_q, temp_cell_q], axis=1), axis=0,
+        return_inverse=True)
+    inverse = inverse.ravel()
+
+    n = len(effective_irradiance)
+    return Deduplication(
+        effective_irradiance=pairs[:, 0],
+        temp_cell=pairs[:, 1],
+        inverse=inverse,
+        hit_rate=1 - len(pairs) / n if n else 0.,
+        irradiance_error=(np.abs(effective_irradiance_q - effective_irradiance).max()
+                          if n else 0.),
+        temperature_error=np.abs(temp_cell_q - temp_cell).max() if n else 0.)
+
+
+def _solve(system, effective_irradiance, temp_cell):
+    return system.singlediode(*system.calcparams_pvsyst(effective_irradiance,
+                                                        temp_cell))
+
+
+def singlediode(system, effective_irradiance, temp_cell, solar_zenith=None,
+                irradiance_threshold=1., fill_value=0.,
+                irradiance_resolution=None, temperature_resolution=None,
+                estimate_error=False):
+    """
+    Evaluates ``calcparams_pvsyst`` and ``singlediode`` of ``system`` only on
+    the samples selected by :py:func:`get_mask`.
+
+    Parameters
+    ----------
+    system : StaticCPVSystem or StaticFlatPlateSystem
+    effective_irradiance : numeric or Series
+        Effective irradiance of the subsystem, e.g. ``dii_effective``.
+    temp_cell : numeric or Series
+        Cell temperature.
+    solar_zenith : None, numeric or Series, default None
+        Solar zenith angle.
+    irradiance_threshold : None or float, default 1.
+        See :py:func:`get_mask`.
+    fill_value : float, default 0.
+        Value of every output on the samples not selected.
+    irradiance_resolution, temperature_resolution : None or float, default None
+        If any of them is not None, the selected samples are deduplicated
+        with :py:func:`deduplicate` and each unique pair is solved once.
+    estimate_error : bool, default False
+        If True, the ``p_mp`` error caused by the quantization is estimated
+        with two additional solves of the unique pairs, displaced by the
+        largest irradiance and temperature quantization errors.
+
+    Returns
+    -------
+    dc : DataFrame or OrderedDict
+        Same keys as :py:func:`pvlib.pvsystem.singlediode` (without IV
+        curves). DataFrame if ``effective_irradiance`` is a Series. When
+        deduplicating, ``dc.attrs`` (DataFrame only) holds ``hit_rate``,
+        ``irradiance_error``, ``temperature_error`` and, if
+        ``estimate_error``, ``p_mp_error``.
+    """
+    mask = get_mask(effective_irradiance, solar_zenith, irradiance_threshold)
+    mask = np.atleast_1d(mask)
+    index = np.flatnonzero(mask)
+
+    effective_irradiance_, temp_cell_ = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(effective_irradiance, dtype=float)),
+        np.atleast_1d(np.asarray(temp_cell, dtype=float)))
+
+    dc = OrderedDict((k, np.full(mask.shape, fill_value, dtype=float))
+                     for k in DC_COLUMNS)
+
+    deduplicating = (irradiance_resolution is not None or
+                     temperature_resolution is not None)
+    attrs = {}
+
+    if len(index) and deduplicating:
+        unique = deduplicate(effective_irradiance_[index], temp_cell_[index],
+                             irradiance_resolution, temperature_resolution)
+        dc_unique = _solve(system, unique.effective_irradiance,
+                           unique.temp_cell)
+        for k in DC_COLUMNS:
+            dc[k][index] = np.asarray(dc_unique[k])[unique.inverse]
+
+        attrs.update(hit_rate=unique.hit_rate,
+                     irradiance_error=unique.irradiance_error,
+                     temperature_error=unique.temperature_error)
+
+        if estimate_error:
+            p_mp = np.asarray(dc_unique['p_mp'])
+            p_mp_irradiance = np.asarray(_solve(
+                system, unique.effective_irradiance + unique.irradiance_error,
+                unique.temp_cell)['p_mp'])
+            p_mp_temperature = np.asarray(_solve(
+                system, unique.effective_irradiance,
+                unique.temp_cell + unique.temperature_error)['p_mp'])
+            attrs['p_mp_error'] = np.nanmax(
+                np.abs(p_mp_irradiance - p_mp) +
+                np.abs(p_mp_temperature - p_mp))
+
+    elif len(index):
+        dc_compact = _solve(system, effective_irradiance_[index],
+                            temp_cell_[index])
+        for k in DC_COLUMNS:
+            dc[k][index] = dc_compact[k]
+
+    if isinstance(effective_irradiance, pd.Series):
+        dc = pd.DataFrame(dc, index=effective_irradiance.index)
+        dc.attrs.update(attrs)
+    return dc
+
+
+def ivcurves(photocurrent, saturation_current, resistance_series,
+             resistance_shunt, nNsVth, ivcurve_pnts=100, dtype='float64',
+             filename=None, chunksize=100000):
+    """
+    Dense IV curves of all the samples at once, as 2-D arrays (samples x
+    points), instead of the ``v``, ``i`` entries of
+    :py:func:`pvlib.pvsystem.singlediode`. The points are equally spaced
+    from 0 to ``v_oc``, as in pvlib with ``method='lambertw'``.
+
+    Parameters
+    ----------
+    photocurrent, saturation_current, resistance_series, resistance_shunt, nNsVth : numeric or Series
+        Diode parameters, e.g. from ``calcparams_pvsyst``.
+    ivcurve_pnts : int, default 100
+        Number of points of each curve.
+    dtype : str or numpy dtype, default 'float64'
+        dtype of the output arrays, e.g. 'float32' to halve the memory.
+    filename : None, str or Path, default None
+        If given, the arrays are memory-mapped ``.npy`` files
+        ``<filename>_v.npy`` and ``<filename>_i.npy``, see
+        :py:func:`numpy.lib.format.open_memmap`.
+    chunksize : int, default 100000
+        Samples evaluated at a time, which bounds the float64 temporaries.
+
+    Returns
+    -------
+    curves : IVCurves
+        ``v`` and ``i`` arrays of shape (samples, ivcurve_pnts).
+    """
+    parameters = np.broadcast_arrays(*[
+        np.atleast_1d(np.asarray(x, dtype=float)) for x in [
+            photocurrent, saturation_current, resistance_series,
+            resistance_shunt, nNsVth]])
+    il, io, rs, rsh, nNsVth = [x.ravel() for x in parameters]
+    shape = (len(il), ivcurve_pnts)
+
+    if filename is None:
+        v = np.empty(shape, dtype=dtype)
+        i = np.empty(shape, dtype=dtype)
+    else:
+        v = np.lib.format.open_memmap('{}_v.npy'.format(filename), mode='w+',
+                                      dtype=dtype, shape=shape)
+        i = np.lib.format.open_memmap('{}_i.npy'.format(filename), mode='w+',
+                                      dtype=dtype, shape=shape)
+
+    points = np.linspace(0, 1, ivcurve_pnts)
+    for start in range(0, len(il), chunksize):
+        chunk = slice(start, start + chunksize)
+        args = [x[chunk, np.newaxis] for x in [rsh, rs, nNsVth]]
+        v_oc = pvlib.pvsystem.v_from_i(*args, 0., io[chunk, np.newaxis],
+                                       il[chunk, np.newaxis])
+        v_chunk = v_oc * points
+        v[chunk] = v_chunk
+        i[chunk] = pvlib.pvsystem.i_from_v(*args, v_chunk,
+                                           io[chunk, np.newaxis],
+                                           il[chunk, np.newaxis])
+
+    if filename is not None:
+        v.flush()
+        i.flush()
+    return IVCurves(v=v, i=i)
+
+
+def _current(v, il, io, rs, rsh, nNsVth):
+    """Current at voltage ``v`` (samples or samples x points)."""
+    column = (slice(None),) + (np.newaxis,) * (np.ndim(v) - 1)
+    return pvlib.pvsystem.i_from_v(rsh[column], rs[column], nNsVth[column], v,
+                                   io[column], il[column])
+
+
+def _voltage(i, il, io, rs, rsh, nNsVth):
+    """Voltage at current ``i`` (samples or samples x points)."""
+    column = (slice(None),) + (np.newaxis,) * (np.ndim(i) - 1)
+    return pvlib.pvsystem.v_from_i(rsh[column], rs[column], nNsVth[column], i,
+                                   io[column], il[column])
+
+
+def _golden_section(func, lower, upper, atol):
+    """
+    Vectorized golden-section search of the maximum of ``func`` on
+    [lower, upper], for all the samples at once.
+    """
+    phi = (np.sqrt(5) - 1) / 2
+    a, b = lower, upper
+    c = b - phi * (b - a)
+    d = a + phi * (b - a)
+    fc, fd = func(c), func(d)
+
+    width = np.max(np.nan_to_num(b - a), initial=0.)
+    iterations = 0
+    if width > atol:
+        iterations = int(np.ceil(np.log(atol / width) / np.log(phi)))
+
+    for _ in range(iterations):
+        left = fc > fd
+        a = np.where(left, a, c)
+        b = np.where(left, d, b)
+        keep = np.where(left, c, d)
+        f_keep = np.where(left, fc, fd)
+        x = np.where(left, b - phi * (b - a), a + phi * (b - a))
+        fx = func(x)
+        c, fc = np.where(left, x, keep), np.where(left, fx, f_keep)
+        d, fd = np.where(left, keep, x), np.where(left, f_keep, fx)
+
+    x = np.where(fc > fd, c, d)
+    return x, func(x)
+
+
+def _maximize(func, lower, upper, grid_pnts, atol):
+    """
+    Brackets the maximum of ``func`` on [lower, upper] with a coarse grid
+    and refines it with :py:func:`_golden_section`.
+    """
+    step = (upper - lower) / (grid_pnts - 1)
+    grid = lower[:, np.newaxis] + step[:, np.newaxis] * np.arange(grid_pnts)
+    k = np.argmax(np.nan_to_num(func(grid), nan=-np.inf), axis=1)
+    return _golden_section(func, lower + np.maximum(k - 1, 0) * step,
+                           lower + np.minimum(k + 1, grid_pnts - 1) * step,
+                           atol)
+
+
+def _maximize_humps(func, limits, grid_pnts, atol):
+    """
+    Maximum of ``func`` on [0, max(limits)], which has a hump between 0 and
+    min(limits), where both submodules conduct, and another one between
+    min(limits) and max(limits), where only one does. Each hump is
+    maximized on its own and the highest one is kept.
+    """
+    lower, upper = np.sort(np.maximum(limits, 0), axis=0)
+    x_both, f_both = _maximize(func, np.zeros(len(lower)), lower, grid_pnts,
+                               atol)
+    x_one, f_one = _maximize(func, lower, upper, grid_pnts, atol)
+    one = (np.nan_to_num(f_one, nan=-np.inf) >
+           np.nan_to_num(f_both, nan=-np.inf))
+    return np.where(one, x_one, x_both), np.where(one, f_one, f_both)
+
+
+def combine(diode_parameters_cpv, diode_parameters_flatplate,
+            connection='series', grid_pnts=20, atol=1e-4):
+    """
+    Maximum power point of the CPV and flat plate submodules of a
+    StaticHybridSystem wired together.
+
+    Parameters
+    ----------
+    diode_parameters_cpv, diode_parameters_flatplate : tuple
+        Diode parameters of each submodule (``photocurrent,
+        saturation_current, resistance_series, resistance_shunt, nNsVth``),
+        e.g. from :py:meth:`StaticHybridSystem.calcparams_pvsyst`.
+    connection : str, default 'series'
+        * 'series': same current, the voltages add up. Ideal bypass diodes
+          keep the voltage of a submodule at or above 0.
+        * 'parallel': same voltage, the currents add up. Ideal blocking
+          diodes keep the current of a submodule at or above 0.
+        * 'separate': each submodule on its own MPPT, the powers add up.
+    grid_pnts : int, default 20
+        Points of the coarse grid that brackets the maximum of each hump of
+        the power curve, which is bimodal with bypass or blocking diodes:
+        in series, below and above the smaller short circuit current, in
+        parallel, below and above the smaller open circuit voltage.
+    atol : float, default 1e-4
+        Tolerance of the golden-section refinement, in A or V.
+
+    Returns
+    -------
+    dc : DataFrame or OrderedDict
+        ``p_mp, v_mp, i_mp`` of the combination (``v_mp, i_mp`` are NaN for
+        'separate'). DataFrame if the diode parameters are Series.
+    """
+    if connection not in ['series', 'parallel', 'separate']:
+        raise ValueError('connection must be series, parallel or separate')
+
+    index = next((x.index for x in diode_parameters_cpv
+                  if isinstance(x, pd.Series)), None)
+
+    arrays = np.broadcast_arrays(*[
+        np.atleast_1d(np.asarray(x, dtype=float))
+        for x in list(diode_parameters_cpv) + list(diode_parameters_flatplate)])
+    arrays = [x.ravel() for x in arrays]
+    cpv, flatplate = arrays[:5], arrays[5:]
+
+    zero = np.zeros(len(cpv[0]))
+
+    if connection == 'separate':
+        p_mp = sum(np.asarray(pvlib.pvsystem.singlediode(*x)['p_mp'])
+                   for x in [cpv, flatplate])
+        v_mp = i_mp = np.full(len(p_mp), np.nan)
+
+    elif connection == 'series':
+        def power(i):
+            v = (np.maximum(_voltage(i, *cpv), 0) +
+                 np.maximum(_voltage(i, *flatplate), 0))
+            return i * v
+
+        i_sc = np.array([_current(zero, *cpv), _current(zero, *flatplate)])
+        i_mp, p_mp = _maximize_humps(power, i_sc, grid_pnts, atol)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            v_mp = np.where(i_mp > 0, p_mp / i_mp, 0.)
+
+    else:
+        def power(v):
+            i = (np.maximum(_current(v, *cpv), 0) +
+                 np.maximum(_current(v, *flatplate), 0))
+            return v * i
+
+        v_oc = np.array([_voltage(zero, *cpv), _voltage(zero, *flatplate)])
+        v_mp, p_mp = _maximize_humps(power, v_oc, grid_pnts, atol)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            i_mp = np.where(v_mp > 0, p_mp / v_mp, 0.)
+
+    dc = OrderedDict([('p_mp', p_mp), ('v_mp', v_mp), ('i_mp', i_mp)])
+    if index is not None:
+        dc = pd.DataFrame(dc, index=index)
+    return dc
@@ -0,0 +1,229 @@
+"""
+The ``gridded`` module applies the StaticCPVSystem and StaticHybridSystem
+model chains to gridded weather datasets (time x lat x lon) stored as
+xarray Datasets, e.g. read from NetCDF or Zarr files.
+
+When the Dataset is Dask-chunked the computation is lazy and is evaluated
+chunk by chunk, so yield maps larger than memory can be computed on one
+workstation::
+
+    ds = xr.open_zarr('irradiance.zarr').chunk({'time': 24 * 31})
+    yield_map = gridded.hybrid_yield(system, ds).sum('time')
+    yield_map.to_netcdf('yield.nc')  # computed with the local scheduler
+
+Requires xarray, and Dask for chunked Datasets.
+"""
+
+import numpy as np
+import pandas as pd
+
+import pvlib
+
+# optional Dataset variables, in the order they are passed to the kernels
+INPUTS = ['dni', 'ghi', 'dhi', 'temp_air', 'wind_speed',
+          'solar_zenith', 'solar_azimuth', 'pressure']
+
+
+def _import_xarray():
+    try:
+        import xarray as xr
+    except ImportError:
+        raise ImportError('The gridded module requires xarray.')
+    return xr
+
+
+def get_solarposition(time, latitude, longitude):
+    """
+    Vectorized analytical solar position for arrays of times, latitudes
+    and longitudes, based on the Spencer (1971) declination and equation
+    of time.
+
+    Parameters
+    ----------
+    time : array of datetime64
+        UTC times.
+    latitude : numeric
+        Latitude in decimal degrees, broadcastable to ``time``.
+    longitude : numeric
+        Longitude in decimal degrees, broadcastable to ``time``.
+
+    Returns
+    -------
+    solar_zenith, solar_azimuth : np.ndarray
+        Solar zenith and azimuth angles in degrees.
+    """
+    time, latitude, longitude = np.broadcast_arrays(time, latitude, longitude)
+    times = pd.DatetimeIndex(time.ravel())
+
+    dayofyear = times.dayofyear.values
+    declination = pvlib.solarposition.declination_spencer71(dayofyear)
+    equation_of_time = pvlib.solarposition.equation_of_time_spencer71(
+        dayofyear)
+
+    hours = (times.hour + times.minute / 60 + times.second / 3600).values
+    hourangle = np.radians(
+        (hours - 12) * 15 + longitude.ravel() + equation_of_time / 4)
+    latitude = np.radians(latitude.ravel())
+
+    zenith = pvlib.solarposition.solar_zenith_analytical(
+        latitude, hourangle, declination)
+    azimuth = pvlib.solarposition.solar_azimuth_analytical(
+        latitude, hourangle, declination, zenith)
+
+    return (np.degrees(zenith).reshape(time.shape),
+            np.degrees(azimuth).reshape(time.shape))
+
+
+def _prepare_block(time, latitude, longitude, names, arrays, altitude):
+    """Broadcasts and flattens one block of every input variable."""
+    arrays = np.broadcast_arrays(time, latitude, longitude, *arrays)
+    shape = arrays[0].shape
+    time, latitude, longitude, *arrays = [a.ravel() for a in arrays]
+
+    inputs = dict(zip(names, arrays))
+    inputs.setdefault('wind_speed', 1.0)
+
+    if 'solar_zenith' not in inputs:
+        inputs['solar_zenith'], inputs['solar_azimuth'] = get_solarposition(
+            time, latitude, longitude)
+
+    if 'pressure' not in inputs:
+        inputs['pressure'] = pvlib.atmosphere.alt2pres(altitude)
+
+    inputs['dni_extra'] = np.asarray(pvlib.irradiance.get_extra_radiation(
+        pd.DatetimeIndex(time)))
+    inputs['airmass_relative'] = pvlib.atmosphere.get_relative_airmass(
+        inputs['solar_zenith'])
+    inputs['airmass_absolute'] = pvlib.atmosphere.get_absolute_airmass(
+        inputs['airmass_relative'], inputs['pressure'])
+
+    return shape, inputs
+
+
+def _cpv_kernel(time, latitude, longitude, *arrays, system, names, altitude):
+    shape, inputs = _prepare_block(time, latitude, longitude, names, arrays,
+                                   altitude)
+
+    dii_effective = system.get_effective_irradiance(
+        inputs['solar_zenith'], inputs['solar_azimuth'], inputs['dni'])
+
+    temp_cell = system.pvsyst_celltemp(
+        dii_effective, inputs['temp_air'], inputs['wind_speed'])
+
+    dc = system.singlediode(*system.calcparams_pvsyst(dii_effective, temp_cell))
+
+    uf = system.get_global_utilization_factor(
+        inputs['airmass_absolute'], inputs['temp_air'])
+
+    return (dii_effective.reshape(shape),
+            temp_cell.reshape(shape),
+            (dc['p_mp'] * uf).reshape(shape))
+
+
+def _hybrid_kernel(time, latitude, longitude, *arrays, system, names,
+                   altitude, spillage, model):
+    shape, inputs = _prepare_block(time, latitude, longitude, names, arrays,
+                                   altitude)
+
+    dii_effective = system.static_cpv_sys.get_effective_irradiance(
+        inputs['solar_zenith'], inputs['solar_azimuth'], inputs['dni'])
+
+    poa_flatplate_static_effective = system.static_flatplate_sys.get_effective_irradiance(
+        inputs['solar_zenith'], inputs['solar_azimuth'],
+        dni=inputs['dni'], ghi=inputs['ghi'], dhi=inputs['dhi'],
+        dni_extra=inputs['dni_extra'], airmass=inputs['airmass_relative'],
+        model=model, spillage=spillage)
+
+    temp_cell_cpv, temp_cell_flatplate = system.pvsyst_celltemp(
+        dii_effective, poa_flatplate_static_effective + dii_effective,
+        inputs['temp_air'], inputs['wind_speed'])
+
+    diode_parameters_cpv, diode_parameters_flatplate = system.calcparams_pvsyst(
+        dii_effective, poa_flatplate_static_effective, temp_cell_cpv,
+        temp_cell_flatplate)
+
+    dc_cpv, dc_flatplate = system.singlediode(diode_parameters_cpv,
+                                              diode_parameters_flatplate)
+
+    uf_cpv = system.get_global_utilization_factor_cpv(
+        inputs['airmass_absolute'], inputs['temp_air'])
+
+    return ((dc_cpv['p_mp'] * uf_cpv).reshape(shape),
+            dc_flatplate['p_mp'].reshape(shape))
+
+
+def _apply(kernel, ds, outputs, latitude, longitude, **kwargs):
+    xr = _import_xarray()
+
+    names = [name for name in INPUTS if name in ds]
+    args = [ds['time'], ds[latitude], ds[longitude]] + [ds[n] for n in names]
+
+    results = xr.apply_ufunc(
+        kernel, *args,
+        kwargs=dict(names=names, **kwargs),
+        dask='parallelized',
+        output_core_dims=[[] for _ in outputs],
+        output_dtypes=[float for _ in outputs])
+
+    return xr.Dataset(dict(zip(outputs, results)))
+
+
+def cpv_yield(system, ds, altitude=0, latitude='lat', longitude='lon'):
+    """
+    Applies the StaticCPVSystem model chain to a gridded Dataset.
+
+    Parameters
+    ----------
+    system : StaticCPVSystem
+    ds : xarray.Dataset
+        Variables are ``dni, temp_air`` and optionally ``wind_speed,
+        solar_zenith, solar_azimuth, pressure``. Coordinates are ``time``
+        (UTC) and the latitude and longitude coordinates. Solar position is
+        computed with :py:func:`get_solarposition` if not provided.
+    altitude : numeric, default 0
+        Altitude used to estimate the pressure if not provided.
+    latitude, longitude : string, default 'lat', 'lon'
+        Names of the latitude and longitude coordinates.
+
+    Returns
+    -------
+    yield : xarray.Dataset
+        Variables are ``dii_effective, temp_cell, p_mp`` (including the
+        global utilization factor). Lazy if ``ds`` is Dask-chunked.
+    """
+    return _apply(_cpv_kernel, ds, ['dii_effective', 'temp_cell', 'p_mp'],
+                  latitude, longitude, system=system, altitude=altitude)
+
+
+def hybrid_yield(system, ds, spillage=0, model='haydavies', altitude=0,
+                 latitude='lat', longitude='lon'):
+    """
+    Applies the StaticHybridSystem model chain to a gridded Dataset.
+
+    Parameters
+    ----------
+    system : StaticHybridSystem
+    ds : xarray.Dataset
+        Variables are ``dni, ghi, dhi, temp_air`` and optionally
+        ``wind_speed, solar_zenith, solar_azimuth, pressure``. Coordinates
+        are ``time`` (UTC) and the latitude and longitude coordinates.
+        Solar position is computed with :py:func:`get_solarposition` if not
+        provided.
+    spillage : float, default 0
+        Percentage of dii allowed to pass into the flat plate subsystem.
+    model : String, default 'haydavies'
+        Irradiance model of the flat plate subsystem.
+    altitude : numeric, default 0
+        Altitude used to estimate the pressure if not provided.
+    latitude, longitude : string, default 'lat', 'lon'
+        Names of the latitude and longitude coordinates.
+
+    Returns
+    -------
+    yield : xarray.Dataset
+        Variables are ``p_mp_cpv`` (including the global utilization
+        factor) and ``p_mp_flatplate``. Lazy if ``ds`` is Dask-chunked.
+    """
+    return _apply(_hybrid_kernel, ds, ['p_mp_cpv', 'p_mp_flatplate'],
+                  latitude, longitude, system=system, altitude=altitude,
+                  spillage=spillage, model=model)
@@ -0,0 +1,650 @@
+"""
+The ``kernels`` module contains fused implementations of the per-sample
+steps of the StaticCPVSystem and StaticFlatPlateSystem model chains: AOI
+cosine, beam projection, IAM interpolation, spillage weighting, the
+``aoi_limit`` split, the pvsyst cell temperature and the two-slope
+utilization factors.
+
+Two backends are available. 'numba' compiles one loop per subsystem that
+evaluates every step for a sample without allocating temporaries, and is
+only available when Numba is installed. 'numpy' is a vectorized fallback
+that gives the same results. ``backend=None`` selects 'numba' when
+available.
+"""
+
+import numpy as np
+import pandas as pd
+
+import pvlib
+from cpvlib import cpvsystem
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+HAS_NUMBA = numba is not None
+
+IAM_MODELS = {'ashrae': 0, 'interp': 1}
+
+# pvlib.temperature.pvsyst_cell defaults
+PVSYST_CELL_DEFAULTS = {'u_c': 29.0, 'u_v': 0.0, 'eta_m': 0.1,
+                        'alpha_absorption': 0.9}
+
+
+def get_backend(backend=None):
+    """
+    Resolves the backend name.
+
+    Parameters
+    ----------
+    backend : None or string, default None
+        'numba', 'numpy' or None (Numba if installed, else NumPy).
+
+    Returns
+    -------
+    backend : string
+    """
+    if backend is None:
+        return 'numba' if HAS_NUMBA else 'numpy'
+    if backend == 'numba' and not HAS_NUMBA:
+        raise ImportError('The numba backend requires numba.')
+    if backend not in ('numba', 'numpy'):
+        raise ValueError(backend + ' is not a valid backend')
+    return backend
+
+
+def _jit(func):
+    if HAS_NUMBA:
+        return numba.njit(cache=True, nogil=True)(func)
+    return func
+
+
+# Numba kernels
+
+
+@_jit
+def _interp(x, xp, fp):
+    # linear interpolation, extrapolated with the end segments
+    # (as scipy.interpolate.interp1d(fill_value='extrapolate'))
+    if x != x:
+        return np.nan
+    n = xp.shape[0]
+    if x <= xp[0]:
+        i = 0
+    elif x >= xp[n - 1]:
+        i = n - 2
+    else:
+        lo = 0
+        hi = n - 1
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if xp[mid] <= x:
+                lo = mid
+            else:
+                hi = mid
+        i = lo
+    return fp[i] + (x - xp[i]) * (fp[i + 1] - fp[i]) / (xp[i + 1] - xp[i])
+
+
+@_jit
+def _iam(aoi, iam_model, b, theta_ref, iam_ref, iam_norm):
+    if iam_model == 0:
+        if aoi != aoi:
+            return np.nan
+        if abs(aoi) >= 90:
+            return 0.
+        return max(0., 1 - b * (1 / np.cos(np.radians(aoi)) - 1))
+    return max(0., _interp(abs(aoi), theta_ref, iam_ref)) / iam_norm
+
+
+@_jit
+def _two_slope(x, thld, m_low, m_high):
+    if x <= thld:
+        return 1 + (x - thld) * m_low
+    return 1 + (x - thld) * m_high
+
+
+@_jit
+def _aoi_projection(surface_tilt, surface_azimuth, solar_zenith, solar_azimuth):
+    t = np.radians(surface_tilt)
+    z = np.radians(solar_zenith)
+    return (np.cos(t) * np.cos(z) + np.sin(t) * np.sin(z) *
+            np.cos(np.radians(solar_azimuth - surface_azimuth)))
+
+
+@_jit
+def _cpv_sample(solar_zenith, solar_azimuth, dni, surface_tilt,
+                surface_azimuth, iam_model, b, theta_ref, iam_ref, iam_norm):
+    projection = _aoi_projection(surface_tilt, surface_azimuth,
+                                 solar_zenith, solar_azimuth)
+    aoi = np.degrees(np.arccos(projection))
+    dii = max(dni * projection, 0.)
+    return dii * _iam(aoi, iam_model, b, theta_ref, iam_ref, iam_norm)
+
+
+@_jit
+def _flatplate_sample(solar_zenith, solar_azimuth, surface_tilt,
+                      surface_azimuth, dii, project_dii, poa_diffuse,
+                      spillage, aoi_limit, theta_ref, iam_ref, iam_norm,
+                      theta_ref_spillage, iam_ref_spillage, iam_norm_spillage):
+    projection = _aoi_projection(surface_tilt, surface_azimuth,
+                                 solar_zenith, solar_azimuth)
+    aoi = np.degrees(np.arccos(projection))
+
+    beam = dii
+    if project_dii:
+        beam = max(beam * projection, 0.)
+
+    dii_effective = beam * _iam(aoi, 1, 0., theta_ref, iam_ref, iam_norm)
+
+    if aoi < aoi_limit:
+        return poa_diffuse + dii_effective * spillage * _iam(
+            aoi, 1, 0., theta_ref_spillage, iam_ref_spillage,
+            iam_norm_spillage)
+    if aoi > aoi_limit:
+        return dii_effective + poa_diffuse
+    return np.nan
+
+
+@_jit
+def _cpv_loop(solar_zenith, solar_azimuth, dni, surface_tilt, surface_azimuth,
+              temp_air, wind_speed, airmass_absolute,
+              iam_model, b, theta_ref, iam_ref, iam_norm,
+              u_c, u_v, eta_m, alpha_absorption,
+              am_thld, am_m_low, am_m_high, weight_am,
+              ta_thld, ta_m_low, ta_m_high, weight_temp,
+              dii_effective, temp_cell, uf_global):
+    for k in range(dni.shape[0]):
+        dii_effective[k] = _cpv_sample(
+            solar_zenith[k], solar_azimuth[k], dni[k], surface_tilt[k],
+            surface_azimuth[k], iam_model, b, theta_ref, iam_ref, iam_norm)
+
+        temp_cell[k] = temp_air[k] + (
+            dii_effective[k] * alpha_absorption * (1 - eta_m) /
+            (u_c + u_v * wind_speed[k]))
+
+        uf_global[k] = (
+            _two_slope(airmass_absolute[k], am_thld, am_m_low, am_m_high) *
+            weight_am +
+            _two_slope(temp_air[k], ta_thld, ta_m_low, ta_m_high) *
+            weight_temp)
+
+
+@_jit
+def _flatplate_loop(solar_zenith, solar_azimuth, surface_tilt, surface_azimuth,
+                    dii, project_dii, poa_diffuse, spillage, aoi_limit,
+                    temp_air, wind_speed, irradiance_offset,
+                    theta_ref, iam_ref, iam_norm,
+                    theta_ref_spillage, iam_ref_spillage, iam_norm_spillage,
+                    u_c, u_v, eta_m, alpha_absorption,
+                    poa_effective, temp_cell):
+    for k in range(poa_diffuse.shape[0]):
+        poa = _flatplate_sample(
+            solar_zenith[k], solar_azimuth[k], surface_tilt[k],
+            surface_azimuth[k], dii[k], project_dii, poa_diffuse[k],
+            spillage, aoi_limit, theta_ref, iam_ref, iam_norm,
+            theta_ref_spillage, iam_ref_spillage, iam_norm_spillage)
+        poa_effective[k] = poa
+
+        temp_cell[k] = temp_air[k] + (
+            (poa + irradiance_offset[k]) * alpha_absorption * (1 - eta_m) /
+            (u_c + u_v * wind_speed[k]))
+
+
+@_jit
+def _irradiance_loop(solar_zenith, solar_azimuth, surface_tilt,
+                     surface_azimuth, dii, project_dii, poa_diffuse, spillage,
+                     aoi_limit, theta_ref, iam_ref, iam_norm,
+                     theta_ref_spillage, iam_ref_spillage, iam_norm_spillage,
+                     dni, surface_tilt_cpv, surface_azimuth_cpv,
+                     iam_model, b, theta_ref_cpv, iam_ref_cpv, iam_norm_cpv,
+                     poa_effective, dii_effective):
+    # dii_effective is empty without a CPV subsystem
+    with_cpv = dii_effective.shape[0] > 0
+    for k in range(poa_diffuse.shape[0]):
+        poa_effective[k] = _flatplate_sample(
+            solar_zenith[k], solar_azimuth[k], surface_tilt[k],
+            surface_azimuth[k], dii[k], project_dii, poa_diffuse[k],
+            spillage, aoi_limit, theta_ref, iam_ref, iam_norm,
+            theta_ref_spillage, iam_ref_spillage, iam_norm_spillage)
+        if with_cpv:
+            dii_effective[k] = _cpv_sample(
+                solar_zenith[k], solar_azimuth[k], dni[k],
+                surface_tilt_cpv[k], surface_azimuth_cpv[k], iam_model, b,
+                theta_ref_cpv, iam_ref_cpv, iam_norm_cpv)
+
+
+# NumPy kernels
+
+
+def _interp_numpy(x, xp, fp):
+    y = np.interp(x, xp, fp)
+    y = np.where(x < xp[0],
+                 fp[0] + (x - xp[0]) * (fp[1] - fp[0]) / (xp[1] - xp[0]), y)
+    y = np.where(x > xp[-1],
+                 fp[-1] + (x - xp[-1]) * (fp[-1] - fp[-2]) / (xp[-1] - xp[-2]),
+                 y)
+    return y
+
+
+def _iam_numpy(aoi, iam_model, b, theta_ref, iam_ref, iam_norm):
+    if iam_model == 0:
+        return pvlib.iam.ashrae(aoi, b=b)
+    return np.clip(_interp_numpy(np.abs(aoi), theta_ref, iam_ref),
+                   0, None) / iam_norm
+
+
+def _two_slope_numpy(x, thld, m_low, m_high):
+    return np.where(x <= thld, 1 + (x - thld) * m_low,
+                    1 + (x - thld) * m_high)
+
+
+def _cpv_dii_numpy(solar_zenith, solar_azimuth, dni, surface_tilt,
+                   surface_azimuth, iam_model, b, theta_ref, iam_ref, iam_norm,
+                   dii_effective):
+    projection = pvlib.irradiance.aoi_projection(
+        surface_tilt, surface_azimuth, solar_zenith, solar_azimuth)
+    aoi = np.degrees(np.arccos(projection))
+
+    np.multiply(dni, projection, out=dii_effective)
+    np.maximum(dii_effective, 0, out=dii_effective)
+    dii_effective *= _iam_numpy(aoi, iam_model, b, theta_ref, iam_ref,
+                                iam_norm)
+
+
+def _flatplate_poa_numpy(solar_zenith, solar_azimuth, surface_tilt,
+                         surface_azimuth, dii, project_dii, poa_diffuse,
+                         spillage, aoi_limit, theta_ref, iam_ref, iam_norm,
+                         theta_ref_spillage, iam_ref_spillage,
+                         iam_norm_spillage, poa_effective):
+    projection = pvlib.irradiance.aoi_projection(
+        surface_tilt, surface_azimuth, solar_zenith, solar_azimuth)
+    aoi = np.degrees(np.arccos(projection))
+
+    # dii_effective, reusing the projection buffer
+    dii_effective = projection
+    if project_dii:
+        dii_effective *= dii
+        np.maximum(dii_effective, 0, out=dii_effective)
+    else:
+        dii_effective[:] = dii
+    dii_effective *= _iam_numpy(aoi, 1, 0., theta_ref, iam_ref, iam_norm)
+
+    spillage_effective = _iam_numpy(aoi, 1, 0., theta_ref_spillage,
+                                    iam_ref_spillage, iam_norm_spillage)
+    spillage_effective *= spillage
+
+    # aoi < aoi_limit: diffuse and spillage, aoi > aoi_limit: global
+    np.multiply(dii_effective, spillage_effective, out=poa_effective)
+    np.copyto(poa_effective, dii_effective, where=aoi > aoi_limit)
+    poa_effective += poa_diffuse
+    poa_effective[aoi == aoi_limit] = np.nan
+
+
+def _cpv_numpy(solar_zenith, solar_azimuth, dni, surface_tilt, surface_azimuth,
+               temp_air, wind_speed, airmass_absolute,
+               iam_model, b, theta_ref, iam_ref, iam_norm,
+               u_c, u_v, eta_m, alpha_absorption,
+               am_thld, am_m_low, am_m_high, weight_am,
+               ta_thld, ta_m_low, ta_m_high, weight_temp,
+               dii_effective, temp_cell, uf_global):
+    _cpv_dii_numpy(solar_zenith, solar_azimuth, dni, surface_tilt,
+                   surface_azimuth, iam_model, b, theta_ref, iam_ref, iam_norm,
+                   dii_effective)
+
+    temp_cell[:] = temp_air + (dii_effective * alpha_absorption *
+                               (1 - eta_m) / (u_c + u_v * wind_speed))
+
+    uf_global[:] = (
+        _two_slope_numpy(airmass_absolute, am_thld, am_m_low, am_m_high) *
+        weight_am +
+        _two_slope_numpy(temp_air, ta_thld, ta_m_low, ta_m_high) *
+        weight_temp)
+
+
+def _flatplate_numpy(solar_zenith, solar_azimuth, surface_tilt, surface_azimuth,
+                     dii, project_dii, poa_diffuse, spillage, aoi_limit,
+                     temp_air, wind_speed, irradiance_offset,
+                     theta_ref, iam_ref, iam_norm,
+                     theta_ref_spillage, iam_ref_spillage, iam_norm_spillage,
+                     u_c, u_v, eta_m, alpha_absorption,
+                     poa_effective, temp_cell):
+    _flatplate_poa_numpy(solar_zenith, solar_azimuth, surface_tilt,
+                         surface_azimuth, dii, project_dii, poa_diffuse,
+                         spillage, aoi_limit, theta_ref, iam_ref, iam_norm,
+                         theta_ref_spillage, iam_ref_spillage,
+                         iam_norm_spillage, poa_effective)
+
+    temp_cell[:] = temp_air + ((poa_effective + irradiance_offset) *
+                               alpha_absorption * (1 - eta_m) /
+                               (u_c + u_v * wind_speed))
+
+
+def _irradiance_numpy(solar_zenith, solar_azimuth, surface_tilt,
+                      surface_azimuth, dii, project_dii, poa_diffuse, spillage,
+                      aoi_limit, theta_ref, iam_ref, iam_norm,
+                      theta_ref_spillage, iam_ref_spillage, iam_norm_spillage,
+                      dni, surface_tilt_cpv, surface_azimuth_cpv,
+                      iam_model, b, theta_ref_cpv, iam_ref_cpv, iam_norm_cpv,
+                      poa_effective, dii_effective):
+    _flatplate_poa_numpy(solar_zenith, solar_azimuth, surface_tilt,
+                         surface_azimuth, dii, project_dii, poa_diffuse,
+                         spillage, aoi_limit, theta_ref, iam_ref, iam_norm,
+                         theta_ref_spillage, iam_ref_spillage,
+                         iam_norm_spillage, poa_effective)
+    if dii_effective.shape[0] > 0:
+        _cpv_dii_numpy(solar_zenith, solar_azimuth, dni, surface_tilt_cpv,
+                       surface_azimuth_cpv, iam_model, b, theta_ref_cpv,
+                       iam_ref_cpv, iam_norm_cpv, dii_effective)
+
+
+# System wrappers
+
+
+def _arrays(*values):
+    """Broadcasts inputs to 1-D float arrays without copying scalars."""
+    arrays = [np.asarray(v, dtype=float) for v in values]
+    shape = (int(np.prod(np.broadcast_shapes(*[a.shape for a in arrays]))),)
+    return [np.broadcast_to(a.ravel(), shape) if a.size > 1 else
+            np.broadcast_to(a.reshape(1), shape) for a in arrays]
+
+
+def _iam_table(theta_ref, iam_ref):
+    theta_ref = np.asarray(theta_ref, dtype=float)
+    iam_ref = np.asarray(iam_ref, dtype=float)
+    order = np.argsort(theta_ref)
+    theta_ref, iam_ref = theta_ref[order], iam_ref[order]
+    iam_norm = float(_interp_numpy(np.array([0.]), theta_ref, iam_ref)[0])
+    return theta_ref, iam_ref, iam_norm
+
+
+def _temperature_parameters(system):
+    params = dict(PVSYST_CELL_DEFAULTS)
+    params.update({k: system.module_parameters[k]
+                   for k in ['eta_m', 'alpha_absorption']
+                   if k in system.module_parameters})
+    params.update({k: system.temperature_model_parameters[k]
+                   for k in ['u_c', 'u_v']
+                   if k in system.temperature_model_parameters})
+    return (params['u_c'], params['u_v'], params['eta_m'],
+            params['alpha_absorption'])
+
+
+def _surface_orientation(system, solar_zenith, solar_azimuth):
+    if system.in_singleaxis_tracker:
+        tracking_info = cpvsystem._singleaxis(system, solar_zenith,
+                                              solar_azimuth)
+        return tracking_info['surface_tilt'], tracking_info['surface_azimuth']
+    return system.surface_tilt, system.surface_azimuth
+
+
+def _to_output(values, like):
+    if isinstance(like, pd.Series):
+        return pd.Series(values, index=like.index)
+    return values
+
+
+def static_cpv_chain(system, solar_zenith, solar_azimuth, dni, temp_air,
+                     wind_speed=1.0, airmass_absolute=None, backend=None):
+    """
+    Fused evaluation of the per-sample steps of a StaticCPVSystem:
+    effective irradiance (AOI, beam projection and IAM), pvsyst cell
+    temperature and global utilization factor.
+
+    Equivalent to :py:meth:`StaticCPVSystem.get_effective_irradiance`,
+    :py:meth:`StaticCPVSystem.pvsyst_celltemp` and
+    :py:meth:`StaticCPVSystem.get_global_utilization_factor`. On a single
+    axis tracker the AOI is computed from the tracker surface orientation.
+
+    Parameters
+    ----------
+    system : StaticCPVSystem
+    solar_zenith, solar_azimuth : numeric or Series
+        Solar position angles.
+    dni : numeric or Series
+        Direct Normal Irradiance
+    temp_air : numeric or Series
+        Ambient dry bulb temperature in degrees C.
+    wind_speed : numeric or Series, default 1.0
+    airmass_absolute : None, numeric or Series, default None
+        Absolute airmass. If None, ``uf_global`` is not computed (NaN).
+    backend : None or string, default None
+        See :py:func:`get_backend`.
+
+    Returns
+    -------
+    dii_effective, temp_cell, uf_global : numeric or Series
+    """
+    loop = _cpv_loop if get_backend(backend) == 'numba' else _cpv_numpy
+    mp = system.module_parameters
+
+    surface_tilt, surface_azimuth = _surface_orientation(
+        system, solar_zenith, solar_azimuth)
+
+    (solar_zenith_, solar_azimuth_, dni_, surface_tilt, surface_azimuth,
+     temp_air_, wind_speed, airmass) = _arrays(
+        solar_zenith, solar_azimuth, dni, surface_tilt, surface_azimuth,
+        temp_air, wind_speed,
+        np.nan if airmass_absolute is None else airmass_absolute)
+
+    iam_model = IAM_MODELS[mp['iam_model']]
+    if iam_model == 1:
+        theta_ref, iam_ref, iam_norm = _iam_table(mp['theta_ref'],
+                                                  mp['iam_ref'])
+    else:
+        theta_ref, iam_ref, iam_norm = np.zeros(2), np.zeros(2), 1.
+
+    if airmass_absolute is None:
+        uf_parameters = (np.nan,) * 8
+    else:
+        isc = mp['IscDNI_top']
+        uf_parameters = (mp['am_thld'], mp['am_uf_m_low'] / isc,
+                         mp['am_uf_m_high'] / isc, mp['weight_am'],
+                         mp['ta_thld'], mp['ta_uf_m_low'] / isc,
+                         mp['ta_uf_m_high'] / isc, mp['weight_temp'])
+
+    n = dni_.shape[0]
+    dii_effective = np.empty(n)
+    temp_cell = np.empty(n)
+    uf_global = np.empty(n)
+
+    loop(solar_zenith_, solar_azimuth_, dni_, surface_tilt, surface_azimuth,
+         temp_air_, wind_speed, airmass,
+         iam_model, float(mp.get('b', 0.)), theta_ref, iam_ref, iam_norm,
+         *_temperature_parameters(system), *uf_parameters,
+         dii_effective, temp_cell, uf_global)
+
+    like = solar_zenith if isinstance(solar_zenith, pd.Series) else dni
+    return (_to_output(dii_effective, like), _to_output(temp_cell, like),
+            _to_output(uf_global, like))
+
+
+def static_flatplate_chain(system, solar_zenith, solar_azimuth, poa_diffuse,
+                           temp_air, wind_speed=1.0, dni=None, dii=None,
+                           spillage=0, irradiance_offset=0, backend=None):
+    """
+    Fused evaluation of the per-sample steps of a StaticFlatPlateSystem:
+    AOI, beam projection, IAM, spillage weighting, the ``aoi_limit`` split
+    and the pvsyst cell temperature.
+
+    Equivalent to the AOI dependent part of
+    :py:meth:`StaticFlatPlateSystem.get_effective_irradiance` followed by
+    :py:meth:`StaticFlatPlateSystem.pvsyst_celltemp`.
+
+    Parameters
+    ----------
+    system : StaticFlatPlateSystem
+    solar_zenith, solar_azimuth : numeric or Series
+        Solar position angles.
+    poa_diffuse : numeric or Series
+        Plane of array diffuse irradiance.
+    temp_air : numeric or Series
+        Ambient dry bulb temperature in degrees C.
+    wind_speed : numeric or Series, default 1.0
+    dni : None, numeric or Series, default None
+        Direct Normal Irradiance. Used if ``dii`` is not given.
+    dii : None, numeric or Series, default None
+        Direct (on the) Inclinated (plane) Irradiance
+    spillage : float, default 0
+        Percentage of dii allowed to pass into the system
+    irradiance_offset : numeric or Series, default 0
+        Irradiance added to the effective irradiance for the cell
+        temperature, e.g. the direct light reaching the module in a
+        StaticHybridSystem.
+    backend : None or string, default None
+        See :py:func:`get_backend`.
+
+    Returns
+    -------
+    poa_flatplate_static_effective, temp_cell : numeric or Series
+    """
+    loop = (_flatplate_loop if get_backend(backend) == 'numba'
+            else _flatplate_numpy)
+    mp = system.module_parameters
+
+    if 'aoi_limit' not in mp:
+        raise AttributeError(
+            'Missing "aoi_limit" parameter in "module_parameters"')
+
+    surface_tilt, surface_azimuth = _surface_orientation(
+        system, solar_zenith, solar_azimuth)
+
+    project_dii = dii is None
+    beam = dni if project_dii else dii
+
+    (solar_zenith_, solar_azimuth_, surface_tilt, surface_azimuth, beam,
+     poa_diffuse_, temp_air_, wind_speed, irradiance_offset) = _arrays(
+        solar_zenith, solar_azimuth, surface_tilt, surface_azimuth, beam,
+        poa_diffuse, temp_air, wind_speed, irradiance_offset)
+
+    n = poa_diffuse_.shape[0]
+    poa_effective = np.empty(n)
+    temp_cell = np.empty(n)
+
+    loop(solar_zenith_, solar_azimuth_, surface_tilt, surface_azimuth,
+         beam, project_dii, poa_diffuse_, float(spillage),
+         float(mp['aoi_limit']), temp_air_, wind_speed, irradiance_offset,
+         *_iam_table(mp['theta_ref'], mp['iam_ref']),
+         *_iam_table(mp['theta_ref_spillage'], mp['iam_ref_spillage']),
+         *_temperature_parameters(system),
+         poa_effective, temp_cell)
+
+    like = solar_zenith if isinstance(solar_zenith, pd.Series) else poa_diffuse
+    return _to_output(poa_effective, like), _to_output(temp_cell, like)
+
+
+def static_effective_irradiance(system, solar_zenith, solar_azimuth,
+                                poa_diffuse, dni=None, dii=None, spillage=0,
+                                out=None, backend=None):
+    """
+    Fused evaluation of the AOI dependent part of the effective irradiance
+    of a StaticFlatPlateSystem (AOI, beam projection, IAM, spillage IAM and
+    the ``aoi_limit`` split) and, for a StaticHybridSystem, of the
+    ``dii_effective`` of its CPV subsystem, in a single pass over the
+    samples that writes into preallocated outputs.
+
+    Equivalent to the AOI dependent part of
+    :py:meth:`StaticFlatPlateSystem.get_effective_irradiance` and
+    :py:meth:`StaticHybridSystem.get_effective_irradiance`.
+
+    Parameters
+    ----------
+    system : StaticFlatPlateSystem or StaticHybridSystem
+    solar_zenith, solar_azimuth : numeric or Series
+        Solar position angles.
+    poa_diffuse : numeric or Series
+        Plane of array diffuse irradiance of the flat plate subsystem.
+    dni : None, numeric or Series, default None
+        Direct Normal Irradiance. Required for a StaticHybridSystem or if
+        ``dii`` is not given.
+    dii : None, numeric or Series, default None
+        Direct (on the) Inclinated (plane) Irradiance of the flat plate
+        subsystem.
+    spillage : float, default 0
+        Percentage of dii allowed to pass into the flat plate subsystem.
+    out : None, ndarray or tuple of ndarray, default None
+        Float arrays with the length of the samples for the output,
+        ``poa_flatplate_static_effective`` or, for a StaticHybridSystem,
+        ``(dii_effective, poa_flatplate_static_effective)``. They can be
+        reused between calls, e.g. on chunks of the same length.
+    backend : None or string, default None
+        See :py:func:`get_backend`.
+
+    Returns
+    -------
+    poa_flatplate_static_effective : numeric or Series
+        For a StaticFlatPlateSystem.
+    dii_effective, poa_flatplate_static_effective : numeric or Series
+        For a StaticHybridSystem.
+    """
+    loop = (_irradiance_loop if get_backend(backend) == 'numba'
+            else _irradiance_numpy)
+
+    hybrid = isinstance(system, cpvsystem.StaticHybridSystem)
+    flatplate_sys = system.static_flatplate_sys if hybrid else system
+    mp = flatplate_sys.module_parameters
+
+    if 'aoi_limit' not in mp:
+        raise AttributeError(
+            'Missing "aoi_limit" parameter in "module_parameters"')
+    if dni is None and (hybrid or dii is None):
+        raise ValueError('dni is required')
+
+    surface_tilt, surface_azimuth = _surface_orientation(
+        flatplate_sys, solar_zenith, solar_azimuth)
+    if hybrid:
+        surface_tilt_cpv, surface_azimuth_cpv = _surface_orientation(
+            system.static_cpv_sys, solar_zenith, solar_azimuth)
+    else:
+        surface_tilt_cpv, surface_azimuth_cpv = 0., 0.
+
+    project_dii = dii is None
+    beam = dni if project_dii else dii
+
+    (solar_zenith_, solar_azimuth_, surface_tilt, surface_azimuth, beam,
+     poa_diffuse_, dni_, surface_tilt_cpv, surface_azimuth_cpv) = _arrays(
+        solar_zenith, solar_azimuth, surface_tilt, surface_azimuth, beam,
+        poa_diffuse, np.nan if dni is None else dni, surface_tilt_cpv,
+        surface_azimuth_cpv)
+
+    n = poa_diffuse_.shape[0]
+    if out is None:
+        dii_effective = np.empty(n if hybrid else 0)
+        poa_effective = np.empty(n)
+    elif hybrid:
+        dii_effective, poa_effective = out
+    else:
+        dii_effective, poa_effective = np.empty(0), out
+
+    for buffer in ([dii_effective, poa_effective] if hybrid
+                   else [poa_effective]):
+        if buffer.shape != (n,) or buffer.dtype != np.float64:
+            raise ValueError(
+                'out must be float64 arrays of length {}'.format(n))
+
+    if hybrid:
+        mp_cpv = system.static_cpv_sys.module_parameters
+        iam_model = IAM_MODELS[mp_cpv['iam_model']]
+        b = float(mp_cpv.get('b', 0.))
+        if iam_model == 1:
+            iam_table_cpv = _iam_table(mp_cpv['theta_ref'], mp_cpv['iam_ref'])
+        else:
+            iam_table_cpv = np.zeros(2), np.zeros(2), 1.
+    else:
+        iam_model, b = 1, 0.
+        iam_table_cpv = np.zeros(2), np.zeros(2), 1.
+
+    loop(solar_zenith_, solar_azimuth_, surface_tilt, surface_azimuth,
+         beam, project_dii, poa_diffuse_, float(spillage),
+         float(mp['aoi_limit']),
+         *_iam_table(mp['theta_ref'], mp['iam_ref']),
+         *_iam_table(mp['theta_ref_spillage'], mp['iam_ref_spillage']),
+         dni_, surface_tilt_cpv, surface_azimuth_cpv, iam_model, b,
+         *iam_table_cpv, poa_effective, dii_effective)
+
+    like = solar_zenith if isinstance(solar_zenith, pd.Series) else poa_diffuse
+    if hybrid:
+        return (_to_output(dii_effective, like),
+                _to_output(poa_effective, like))
+    return _to_output(poa_effective, like)
@@ -0,0 +1,269 @@
+"""
+The ``lifetime`` module simulates the yearly energy of a StaticHybridSystem
+over its lifetime (e.g. 25-30 years) with degradation::
+
+    lifetime = LifetimeSimulation(system, location,
+                                  degradation_rates={'cpv_optics': 0.3,
+                                                     'cpv_cells': 0.4,
+                                                     'flatplate_cells': 0.5})
+    energy = lifetime.run(weather_years)  # one row per year
+
+The solar geometry (solar position, airmass, extraterrestrial irradiance and
+the angle of incidence of both subsystems) barely changes from one year to
+the next, so it is computed once on a reference year, indexed by UTC month,
+day and time of day, and reused for every year of weather. Only the weather
+dependent part of the model chain is evaluated each year, and each year is
+reduced to its energy before the next one is read.
+
+Systems in a single axis tracker can also reuse the tracker angles of a
+reference year through their ``tracker_table``, see
+:py:class:`tracking.TrackerTable`.
+"""
+
+import numpy as np
+import pandas as pd
+
+from cpvlib.atmosphere import get_atmospheric_context
+
+DEGRADATION_RATES = ['cpv_optics', 'cpv_cells', 'flatplate_cells']
+
+GEOMETRY_COLUMNS = ['solar_zenith', 'solar_azimuth', 'airmass_relative',
+                    'airmass_absolute', 'dni_extra', 'aoi_cpv',
+                    'aoi_flatplate']
+
+
+def get_degradation(degradation_rates, year):
+    """
+    Linear degradation factors of a year of operation.
+
+    Parameters
+    ----------
+    degradation_rates : dict
+        ``{name: rate}`` in %/year, for the names of ``DEGRADATION_RATES``.
+    year : int
+        Years of operation, 0 for the first year.
+
+    Returns
+    -------
+    factors : dict
+        ``{name: factor}`` between 0 and 1 for every name of
+        ``DEGRADATION_RATES``.
+    """
+    return {name: max(1 - degradation_rates.get(name, 0) * year / 100, 0)
+            for name in DEGRADATION_RATES}
+
+
+class LifetimeSimulation():
+    """
+    Lifetime simulation of a StaticHybridSystem.
+
+    Parameters
+    ----------
+    system : StaticHybridSystem
+    location : pvlib.location.Location
+    degradation_rates : None or dict, default None
+        ``{name: rate}`` in %/year (linear) for ``cpv_optics`` (scales the
+        effective irradiance of the CPV subsystem), ``cpv_cells`` (scales
+        ``p_mp_cpv``) and ``flatplate_cells`` (scales ``p_mp_flatplate``).
+        Missing names do not degrade.
+    spillage : float, default 0
+        Percentage of dii allowed to pass into the flat plate subsystem.
+    reference_year : int, default 2019
+        Year, not a leap year, of the reference geometry. 29 February is
+        looked up as 28 February.
+    """
+
+    def __init__(self, system, location, degradation_rates=None, spillage=0,
+                 reference_year=2019):
+        if degradation_rates is None:
+            self.degradation_rates = {}
+        else:
+            self.degradation_rates = dict(degradation_rates)
+
+        for name in self.degradation_rates:
+            if name not in DEGRADATION_RATES:
+                raise ValueError(
+                    '{} is not a valid degradation rate, use one of {}'.format(
+                        name, ', '.join(DEGRADATION_RATES)))
+
+        if pd.Timestamp(year=reference_year, month=1, day=1).is_leap_year:
+            raise ValueError('reference_year must not be a leap year')
+
+        self.system = system
+        self.location = location
+        self.spillage = spillage
+        self.reference_year = reference_year
+
+        self.geometry = pd.DataFrame(columns=GEOMETRY_COLUMNS, dtype=float)
+
+    def __repr__(self):
+        return ('LifetimeSimulation: \n  degradation_rates: {}\n  '
+                'geometry: {} samples'.format(self.degradation_rates,
+                                              len(self.geometry)))
+
+    def _keys(self, index):
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        day = np.where((index.month == 2) & (index.day == 29), 28, index.day)
+        return pd.DatetimeIndex(pd.to_datetime(pd.DataFrame({
+            'year': self.reference_year, 'month': index.month, 'day': day,
+            'hour': index.hour, 'minute': index.minute,
+            'second': index.second})))
+
+    def _compute_geometry(self, keys, tz):
+        times = keys if tz is None else keys.tz_localize('UTC')
+
+        solar_position = self.location.get_solarposition(times)
+        solar_zenith = solar_position['zenith']
+        solar_azimuth = solar_position['azimuth']
+        context = get_atmospheric_context(self.location,
+                                          solar_position=solar_position)
+
+        geometry = pd.DataFrame({
+            'solar_zenith': solar_zenith,
+            'solar_azimuth': solar_azimuth,
+            'airmass_relative': context.airmass_relative,
+            'airmass_absolute': context.airmass_absolute,
+            'dni_extra': context.dni_extra,
+            'aoi_cpv': self.system.static_cpv_sys.get_aoi(solar_zenith,
+                                                          solar_azimuth),
+            'aoi_flatplate': self.system.static_flatplate_sys.get_aoi(
+                solar_zenith, solar_azimuth),
+        }, index=times)
+        geometry.index = keys
+        return geometry
+
+    def get_geometry(self, index):
+        """
+        Reference geometry of the timestamps of a year of weather. Only the
+        timestamps not seen before (in UTC month, day and time of day) are
+        computed.
+
+        Parameters
+        ----------
+        index : DatetimeIndex
+
+        Returns
+        -------
+        geometry : DataFrame
+            Columns are ``GEOMETRY_COLUMNS``, indexed like ``index``.
+        """
+        keys = self._keys(index)
+
+        missing = keys.difference(self.geometry.index)
+        if len(missing) > 0:
+            self.geometry = pd.concat(
+                [self.geometry, self._compute_geometry(missing, index.tz)])
+            self.geometry.sort_index(inplace=True)
+
+        geometry = self.geometry.reindex(keys)
+        geometry.index = index
+        return geometry
+
+    def simulate_year(self, weather, year=0):
+        """
+        Runs the weather dependent part of the model chain for a year.
+
+        Parameters
+        ----------
+        weather : DataFrame
+            Columns are ``dni, ghi, dhi, temp_air`` and optionally
+            ``wind_speed``.
+        year : int, default 0
+            Years of operation, for the degradation.
+
+        Returns
+        -------
+        power : DataFrame
+            Columns are ``p_mp_cpv`` (including the global utilization
+            factor) and ``p_mp_flatplate``, in W.
+        """
+        geometry = self.get_geometry(weather.index)
+        degradation = get_degradation(self.degradation_rates, year)
+        static_cpv_sys = self.system.static_cpv_sys
+        static_flatplate_sys = self.system.static_flatplate_sys
+
+        solar_zenith = geometry['solar_zenith']
+        solar_azimuth = geometry['solar_azimuth']
+        wind_speed = weather.get('wind_speed', 1.0)
+
+        dii_effective = static_cpv_sys.get_effective_irradiance(
+            solar_zenith, solar_azimuth, weather['dni'],
+            aoi=geometry['aoi_cpv']) * degradation['cpv_optics']
+
+        poa_flatplate_static_effective = \
+            static_flatplate_sys.get_effective_irradiance(
+                solar_zenith, solar_azimuth, dni=weather['dni'],
+                ghi=weather['ghi'], dhi=weather['dhi'],
+                dni_extra=geometry['dni_extra'],
+                airmass=geometry['airmass_relative'],
+                spillage=self.spillage, aoi=geometry['aoi_flatplate'])
+
+        temp_cell_cpv, temp_cell_flatplate = self.system.pvsyst_celltemp(
+            dii_effective, poa_flatplate_static_effective + dii_effective,
+            weather['temp_air'], wind_speed)
+
+        dc_cpv, dc_flatplate = self.system.singlediode(
+            *self.system.calcparams_pvsyst(dii_effective,
+                                           poa_flatplate_static_effective,
+                                           temp_cell_cpv, temp_cell_flatplate))
+
+        uf_cpv = self.system.get_global_utilization_factor_cpv(
+            geometry['airmass_absolute'], weather['temp_air'])
+
+        return pd.DataFrame({
+            'p_mp_cpv': dc_cpv['p_mp'] * uf_cpv * degradation['cpv_cells'],
+            'p_mp_flatplate': (dc_flatplate['p_mp'] *
+                               degradation['flatplate_cells'])})
+
+    def run(self, weathers, years=None):
+        """
+        Simulates every year of operation and integrates its energy.
+
+        Parameters
+        ----------
+        weathers : DataFrame, dict or iterable of DataFrame
+            Weather of each year of operation, in order. A generator (or a
+            dict of callables returning the weather) keeps a single year in
+            memory. A single DataFrame (e.g. a TMY) is used for every year.
+        years : None or int, default None
+            Years of operation. Required if ``weathers`` is a DataFrame,
+            otherwise the length of ``weathers``.
+
+        Returns
+        -------
+        energy : DataFrame
+            Columns are ``weather_year`` (year of the first timestamp of the
+            weather) and ``energy_cpv, energy_flatplate, energy_total`` in
+            Wh, one row per year of operation (starting at 0).
+        """
+        if isinstance(weathers, pd.DataFrame):
+            if years is None:
+                raise ValueError('years is required for a single weather')
+            weathers = [weathers] * years
+        elif isinstance(weathers, dict):
+            weathers = weathers.values()
+
+        rows = []
+        for year, weather in enumerate(weathers):
+            if years is not None and year >= years:
+                break
+            if callable(weather):
+                weather = weather()
+
+            power = self.simulate_year(weather, year)
+
+            interval = power.index.to_series().diff().median()
+            hours = interval / pd.Timedelta('1h') if pd.notna(interval) else 1
+            energy_cpv, energy_flatplate = power.fillna(0).sum() * hours
+            rows.append((year, weather.index[0].year, energy_cpv,
+                         energy_flatplate))
+            del power, weather
+
+        energy = pd.DataFrame(rows, columns=['year', 'weather_year',
+                                             'energy_cpv',
+                                             'energy_flatplate']
+                              ).set_index('year')
+        energy['energy_total'] = (energy['energy_cpv'] +
+                                  energy['energy_flatplate'])
+        return energy
@@ -0,0 +1,423 @@
+"""
+The ``live`` module feeds a StaticHybridSystem with weather samples as they
+arrive (e.g. from a datalogger) and publishes the expected power, using
+:py:mod:`asyncio`::
+
+    pipeline = LivePipeline(system, location, sink=QueueSink(records),
+                            window=60)
+    await pipeline.run(FileTailSource('meteo.jsonl'), TCPSource(port=9000))
+
+Samples are dicts (JSON lines for files and sockets) with a ``time`` in ISO
+8601 and the weather columns ``dni, ghi, dhi, temp_air, wind_speed``. They
+are micro-batched by time window, the model chain of each batch runs in an
+executor so that the sources keep being read, and the bounded queue between
+sources and model blocks the sources when the model falls behind.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from cpvlib.batch import simulate_site
+
+logger = logging.getLogger(__name__)
+
+WEATHER_COLUMNS = ['dni', 'ghi', 'dhi', 'temp_air', 'wind_speed']
+
+LiveMetrics = namedtuple(
+    'LiveMetrics', ['samples_in', 'samples_out', 'batches', 'errors',
+                    'queue_size', 'latency_mean', 'latency_max',
+                    'throughput'])
+
+_FLUSH = object()
+
+
+def parse_record(line):
+    """Parses a JSON line into a sample dict."""
+    return json.loads(line)
+
+
+class QueueSource():
+    """
+    Reads samples from an :py:class:`asyncio.Queue` until ``None`` is
+    received. Mainly for tests and for embedding in other applications.
+
+    Parameters
+    ----------
+    queue : asyncio.Queue
+    """
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def __repr__(self):
+        return 'QueueSource'
+
+    def __aiter__(self):
+        return self._samples()
+
+    async def _samples(self):
+        while True:
+            sample = await self.queue.get()
+            if sample is None:
+                return
+            yield sample
+
+
+class FileTailSource():
+    """
+    Reads the lines appended to a file, like ``tail -f``.
+
+    Parameters
+    ----------
+    path : str or Path
+    poll_interval : float, default 0.5
+        Seconds between reads when the end of the file is reached.
+    from_start : bool, default True
+        If False, the lines already in the file are skipped.
+    stop_at_eof : bool, default False
+        If True, the source ends at the end of the file instead of waiting
+        for new lines.
+    parse : callable, default parse_record
+        Converts a line into a sample dict.
+    """
+
+    def __init__(self, path, poll_interval=0.5, from_start=True,
+                 stop_at_eof=False, parse=parse_record):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.from_start = from_start
+        self.stop_at_eof = stop_at_eof
+        self.parse = parse
+
+    def __repr__(self):
+        return 'FileTailSource: \n  path: {}'.format(self.path)
+
+    def __aiter__(self):
+        return self._samples()
+
+    async def _samples(self):
+        with open(self.path) as f:
+            if not self.from_start:
+                f.seek(0, 2)
+            partial = ''
+            while True:
+                line = f.readline()
+                if not line:
+                    if self.stop_at_eof:
+                        break
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                # a line is complete once its newline is written
+                line = partial + line
+                if not line.endswith('\n'):
+                    partial = line
+                    continue
+                partial = ''
+                if line.strip():
+                    yield self.parse(line)
+            if partial.strip():
+                yield self.parse(partial)
+
+
+class TCPSource():
+    """
+    Listens on a TCP socket for JSON lines, from any number of clients.
+
+    The socket is only read while there is room in the internal queue, so
+    slow consumers slow down the clients through TCP flow control.
+
+    Parameters
+    ----------
+    host : str, default '127.0.0.1'
+    port : int, default 0
+        If 0, a free port is chosen and set once ``ready`` is set.
+    max_queue : int, default 1000
+        Size of the internal queue.
+    parse : callable, default parse_record
+        Converts a line into a sample dict.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, max_queue=1000,
+                 parse=parse_record):
+        self.host = host
+        self.port = port
+        self.max_queue = max_queue
+        self.parse = parse
+        self._ready = None
+        self._queue = None
+        self._server = None
+
+    def __repr__(self):
+        return 'TCPSource: \n  address: {}:{}'.format(self.host, self.port)
+
+    def __aiter__(self):
+        return self._samples()
+
+    @property
+    def ready(self):
+        """
+        :py:class:`asyncio.Event` set once the socket listens. It is created
+        on first access, in the running event loop, so that the source can
+        be created before ``asyncio.run``.
+        """
+        if self._ready is None:
+            self._ready = asyncio.Event()
+        return self._ready
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    await self._queue.put(self.parse(line))
+        finally:
+            writer.close()
+
+    async def _samples(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._server = await asyncio.start_server(self._handle, self.host,
+                                                  self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.ready.set()
+        try:
+            while True:
+                sample = await self._queue.get()
+                if sample is None:
+                    return
+                yield sample
+        finally:
+            self._server.close()
+
+    async def close(self):
+        """Stops listening once the samples already received are read."""
+        await self.ready.wait()
+        self._server.close()
+        await self._queue.put(None)
+
+
+class QueueSink():
+    """
+    Puts the expected power of each batch into an :py:class:`asyncio.Queue`.
+    A bounded queue slows down the pipeline when it is not consumed.
+
+    Parameters
+    ----------
+    queue : asyncio.Queue
+    """
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def __repr__(self):
+        return 'QueueSink'
+
+    async def __call__(self, power):
+        await self.queue.put(power)
+
+
+def get_weather(samples, tz=None):
+    """
+    Converts a list of samples into a weather DataFrame.
+
+    Parameters
+    ----------
+    samples : list of dict
+        With ``time`` and the weather columns.
+    tz : None or str, default None
+        Time zone of the index. Naive times are localized to it.
+
+    Returns
+    -------
+    weather : DataFrame
+        Sorted and without duplicated times (the last sample is kept).
+        Columns are ``dni, ghi, dhi, temp_air, wind_speed``, NaN if missing.
+    """
+    frame = pd.DataFrame.from_records(samples)
+    times = pd.DatetimeIndex(pd.to_datetime(frame.pop('time'))).rename(None)
+    if tz is not None:
+        if times.tz is None:
+            times = times.tz_localize(tz)
+        else:
+            times = times.tz_convert(tz)
+
+    weather = frame.reindex(columns=WEATHER_COLUMNS).astype(float)
+    weather.index = times
+    weather = weather[~weather.index.duplicated(keep='last')]
+    return weather.sort_index()
+
+
+class LivePipeline():
+    """
+    Runs the StaticHybridSystem model chain on the samples of one or more
+    async sources and sends the expected power to an async sink.
+
+    Parameters
+    ----------
+    system : StaticHybridSystem
+    location : pvlib.location.Location
+    sink : async callable
+        Called with a DataFrame per batch, columns ``p_mp_cpv`` and
+        ``p_mp_flatplate`` in W, e.g. a QueueSink.
+    window : float, default 60
+        Seconds after the first sample of a batch until the batch is
+        evaluated.
+    max_batch : int, default 1000
+        A batch is evaluated earlier when it reaches this size.
+    max_queue : int, default 10000
+        Size of the queue between sources and model. The sources wait when
+        it is full.
+    spillage : float, default 0
+        Percentage of dii allowed to pass into the flat plate subsystem.
+    executor : None or concurrent.futures.Executor, default None
+        Executor of the model chain. If None, the default executor of the
+        event loop (threads).
+    """
+
+    def __init__(self, system, location, sink, window=60., max_batch=1000,
+                 max_queue=10000, spillage=0, executor=None):
+        if window <= 0:
+            raise ValueError('window must be positive')
+        if max_batch < 1:
+            raise ValueError('max_batch must be at least 1')
+
+        self.system = system
+        self.location = location
+        self.sink = sink
+        self.window = window
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.spillage = spillage
+        self.executor = executor
+
+        self._queue = None
+        self._readers = []
+        self._reset()
+
+    def __repr__(self):
+        attrs = ['window', 'max_batch', 'max_queue', 'spillage']
+        return ('LivePipeline: \n  ' + '\n  '.join(
+            '{}: {}'.format(attr, getattr(self, attr)) for attr in attrs))
+
+    def _reset(self):
+        self._started = None
+        self._samples_in = 0
+        self._samples_out = 0
+        self._batches = 0
+        self._errors = 0
+        self._latency_sum = 0.
+        self._latency_max = 0.
+
+    def metrics(self):
+        """
+        Returns
+        -------
+        metrics : LiveMetrics
+            Samples read and evaluated, batches, failed batches, samples
+            waiting in the queue, mean and max latency (s) from reading a
+            sample to its power reaching the sink, and throughput (evaluated
+            samples/s since the start).
+        """
+        elapsed = (time.monotonic() - self._started
+                   if self._started is not None else np.nan)
+        n = self._samples_out
+        return LiveMetrics(
+            samples_in=self._samples_in,
+            samples_out=n,
+            batches=self._batches,
+            errors=self._errors,
+            queue_size=self._queue.qsize() if self._queue is not None else 0,
+            latency_mean=self._latency_sum / n if n else np.nan,
+            latency_max=self._latency_max,
+            throughput=n / elapsed if elapsed > 0 else np.nan)
+
+    async def run(self, *sources):
+        """
+        Evaluates the samples of the sources until all of them end or
+        :py:meth:`stop` is called. The last partial batch is evaluated.
+        """
+        self._reset()
+        self._started = time.monotonic()
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._readers = [asyncio.ensure_future(self._read(source))
+                         for source in sources]
+
+        async def close():
+            await asyncio.gather(*self._readers, return_exceptions=True)
+            await self._queue.put(None)
+
+        closer = asyncio.ensure_future(close())
+        try:
+            await self._process()
+        finally:
+            for reader in self._readers:
+                reader.cancel()
+            closer.cancel()
+
+    def stop(self):
+        """Stops reading the sources; the queued samples are evaluated."""
+        for reader in self._readers:
+            reader.cancel()
+
+    async def _read(self, source):
+        try:
+            async for sample in source:
+                await self._queue.put((time.monotonic(), sample))
+                self._samples_in += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception('Source %r failed', source)
+
+    async def _process(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = (None if deadline is None
+                       else max(deadline - time.monotonic(), 0))
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                item = _FLUSH
+
+            if item is None:
+                if batch:
+                    await self._evaluate(batch)
+                return
+
+            if item is not _FLUSH:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.window
+
+            if item is _FLUSH or len(batch) >= self.max_batch:
+                await self._evaluate(batch)
+                batch = []
+                deadline = None
+
+    async def _evaluate(self, batch):
+        arrivals, samples = zip(*batch)
+        loop = asyncio.get_running_loop()
+        try:
+            weather = get_weather(samples, tz=self.location.tz)
+            power = await loop.run_in_executor(
+                self.executor, simulate_site, self.system, self.location,
+                weather, self.spillage)
+            await self.sink(power)
+        except Exception:
+            self._errors += 1
+            logger.exception('Batch of %d samples failed', len(batch))
+            return
+
+        latency = time.monotonic() - np.asarray(arrivals)
+        self._batches += 1
+        self._samples_out += len(batch)
+        self._latency_sum += latency.sum()
+        self._latency_max = max(self._latency_max, latency.max())
@@ -0,0 +1,119 @@
+"""
+The ``losses`` module applies the ``losses_parameters`` of a system (e.g.
+soiling, tracker availability, wiring, mismatch) to its power::
+
+    stack = LossStack({'soiling': soiling_series, 'availability': 1.5,
+                       'wiring': 2, 'mismatch': 2})
+    for chunk in chunks:
+        p_ac = stack.apply(p_mp_chunk)
+    stack.summary()  # energy lost to each loss
+
+Losses are percentages, constant or time series, as in
+:py:func:`pvlib.pvsystem.pvwatts_losses`. They are applied in order on a
+single output buffer, and the energy lost to each one is accumulated across
+calls.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class LossStack():
+    """
+    Ordered losses of a subsystem.
+
+    Parameters
+    ----------
+    losses : None or dict, default None
+        ``{name: loss}`` in %, where loss is a float, a Series (aligned with
+        the power by index, missing times are no loss) or an array with the
+        length of the power.
+    """
+
+    def __init__(self, losses=None):
+        if losses is None:
+            self.losses = {}
+        else:
+            self.losses = dict(losses)
+
+        for name, loss in self.losses.items():
+            if np.ndim(loss) == 0 and not 0 <= loss <= 100:
+                raise ValueError(
+                    'Loss "{}" must be between 0 and 100 %'.format(name))
+
+        self.reset()
+
+    def __repr__(self):
+        return 'LossStack: \n  losses: {}'.format(', '.join(self.losses))
+
+    @classmethod
+    def from_parameters(cls, losses_parameters):
+        """Creates the stack of the ``losses_parameters`` of a system."""
+        return cls(losses_parameters)
+
+    def reset(self):
+        """Clears the accumulated energy."""
+        self.energy = dict.fromkeys(['input', *self.losses, 'output'], 0.)
+
+    def _fraction(self, loss, power):
+        if isinstance(loss, pd.Series):
+            if not isinstance(power, pd.Series):
+                raise ValueError('Series losses require Series power')
+            loss = loss.reindex(power.index).fillna(0).to_numpy()
+        return np.asarray(loss, dtype=float) / 100
+
+    def apply(self, power, out=None, hours=None):
+        """
+        Applies the losses and accumulates the energy lost to each of them.
+
+        Parameters
+        ----------
+        power : Series or array-like
+            Power before losses, e.g. ``p_mp`` in W.
+        out : None or ndarray, default None
+            Buffer for the result (may be ``power`` itself).
+        hours : None or float, default None
+            Duration of each sample in hours. If None, the median interval
+            of the DatetimeIndex of ``power``, or 1 without it.
+
+        Returns
+        -------
+        power : Series or ndarray
+            Power after losses.
+        """
+        values = np.asarray(power, dtype=float)
+        if out is None:
+            out = values.copy()
+        elif not np.may_share_memory(out, values):
+            out[...] = values
+
+        if hours is None:
+            hours = 1.
+            if isinstance(getattr(power, 'index', None), pd.DatetimeIndex):
+                interval = power.index.to_series().diff().median()
+                if pd.notna(interval):
+                    hours = interval / pd.Timedelta('1h')
+
+        self.energy['input'] += np.nansum(out) * hours
+        for name, loss in self.losses.items():
+            fraction = self._fraction(loss, power)
+            if fraction.ndim == 0:
+                self.energy[name] += np.nansum(out) * fraction * hours
+            else:
+                self.energy[name] += np.nansum(out * fraction) * hours
+            out *= 1 - fraction
+        self.energy['output'] += np.nansum(out) * hours
+
+        if isinstance(power, pd.Series):
+            return pd.Series(out, index=power.index, name=power.name)
+        return out
+
+    def summary(self):
+        """
+        Returns
+        -------
+        energy : Series
+            ``input``, each loss and ``output`` energy, in Wh (or W per
+            sample if the duration of the samples is unknown).
+        """
+        return pd.Series(self.energy)
@@ -0,0 +1,282 @@
+"""
+The ``results`` module contains the lazily evaluated results of a
+:py:meth:`cpvsystem.StaticHybridSystem.run_model` run.
+"""
+
+import functools
+
+from cpvlib import electrical
+
+
+def _memoized(func):
+    """
+    Turns ``func`` into a read-only property evaluated on first access
+    and then stored in ``self._values``.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def getter(self):
+        return self._evaluate(name, func)
+
+    return property(getter)
+
+
+class HybridResults():
+    """
+    Results of the StaticHybridSystem model chain.
+
+    Every quantity is a property computed on first access from its
+    dependencies and then memoized, so only what is asked for is computed
+    and held in memory.
+
+    Parameters
+    ----------
+    system : StaticHybridSystem
+    solar_zenith : Series
+        Solar zenith angle.
+    solar_azimuth : Series
+        Solar azimuth angle.
+    weather : DataFrame
+        Columns are ``dni, temp_air`` and optionally ``ghi, dhi, dii, gii,
+        wind_speed, smr``. ``smr`` (spectral matching ratio top/mid) adds
+        the spectral term to the utilization factor.
+    airmass_absolute : None or Series, default None
+        Absolute airmass. Required by the utilization factor.
+    spillage : float, default 0
+        Percentage of dii allowed to pass into the flat plate subsystem.
+    free_intermediates : bool, default False
+        If True, the intermediate quantities computed to obtain a requested
+        quantity are released once it is available. They are computed
+        again if they are accessed later.
+    irradiance_threshold : None or float, default None
+        If not None, the electrical model of each subsystem is only evaluated
+        on the samples with sun above the horizon and effective irradiance
+        above ``irradiance_threshold`` [W/m2], see
+        :py:func:`electrical.singlediode`. ``diode_parameters_cpv`` and
+        ``diode_parameters_flatplate`` are not available.
+    fill_value : float, default 0.
+        Value of ``dc_cpv, dc_flatplate, p_mp_cpv, p_mp_flatplate`` on the
+        samples skipped when ``irradiance_threshold`` is not None.
+    irradiance_resolution, temperature_resolution : None or float, default None
+        If any of them is not None, the (irradiance, temperature) pairs of
+        each subsystem are quantized to these resolutions and each unique
+        pair is solved once, see :py:func:`electrical.singlediode`. The hit
+        rate and error bounds are in ``dc_cpv.attrs`` and
+        ``dc_flatplate.attrs``.
+    apply_losses : bool, default False
+        If True, ``p_mp_cpv`` and ``p_mp_flatplate`` include the losses of
+        each subsystem ``losses_parameters``. The LossStack used, with the
+        energy lost to each loss, is then in ``losses_cpv`` and
+        ``losses_flatplate``.
+    context : None or AtmosphericContext, default None
+        Airmass and extraterrestrial irradiance of the flat plate
+        transposition and the CPV utilization factor, see
+        :py:func:`atmosphere.get_atmospheric_context`.
+    **kwargs
+        Passed to :py:meth:`StaticFlatPlateSystem.get_effective_irradiance`.
+    """
+
+    def __init__(self, system, solar_zenith, solar_azimuth, weather,
+                 airmass_absolute=None, spillage=0, free_intermediates=False,
+                 irradiance_threshold=None, fill_value=0.,
+                 irradiance_resolution=None, temperature_resolution=None,
+                 apply_losses=False, context=None, **kwargs):
+
+        self.system = system
+        self.solar_zenith = solar_zenith
+        self.solar_azimuth = solar_azimuth
+        self.weather = weather
+        self.airmass_absolute = airmass_absolute
+        self.spillage = spillage
+        self.free_intermediates = free_intermediates
+        self.irradiance_threshold = irradiance_threshold
+        self.fill_value = fill_value
+        self.irradiance_resolution = irradiance_resolution
+        self.temperature_resolution = temperature_resolution
+        self.apply_losses = apply_losses
+        self.context = context
+        self.kwargs = kwargs
+
+        self.losses_cpv = None
+        self.losses_flatplate = None
+
+        self._values = {}
+        self._requested = set()
+        self._depth = 0
+
+    def __repr__(self):
+        return ('HybridResults: \n  computed: {}'.format(
+            ', '.join(self.computed) or None))
+
+    def _evaluate(self, name, func):
+        top_level = self._depth == 0
+        if top_level:
+            self._requested.add(name)
+
+        if name in self._values:
+            return self._values[name]
+
+        self._depth += 1
+        try:
+            value = func(self)
+        finally:
+            self._depth -= 1
+
+        self._values[name] = value
+
+        if top_level and self.free_intermediates:
+            for key in list(self._values):
+                if key not in self._requested:
+                    del self._values[key]
+
+        return value
+
+    def _weather(self, column, default=None):
+        if column in self.weather:
+            return self.weather[column]
+        return default
+
+    def _electrical_singlediode(self, system, effective_irradiance,
+                                temp_cell):
+        if (self.irradiance_threshold is None and
+                self.irradiance_resolution is None and
+                self.temperature_resolution is None):
+            return None
+        return electrical.singlediode(
+            system, effective_irradiance, temp_cell, self.solar_zenith,
+            irradiance_threshold=self.irradiance_threshold,
+            fill_value=self.fill_value,
+            irradiance_resolution=self.irradiance_resolution,
+            temperature_resolution=self.temperature_resolution)
+
+    @property
+    def computed(self):
+        """Names of the quantities currently held in memory."""
+        return list(self._values)
+
+    def release(self, *names):
+        """
+        Frees the given quantities (all of them if no name is given).
+        They are computed again if they are accessed later.
+        """
+        for name in names or list(self._values):
+            self._values.pop(name, None)
+            self._requested.discard(name)
+
+    @_memoized
+    def dii_effective(self):
+        """Effective irradiance of the StaticCPVSystem subsystem."""
+        return self.system.static_cpv_sys.get_effective_irradiance(
+            self.solar_zenith, self.solar_azimuth, self.weather['dni'])
+
+    @_memoized
+    def poa_flatplate_static_effective(self):
+        """Effective irradiance of the StaticFlatPlateSystem subsystem."""
+        return self.system.static_flatplate_sys.get_effective_irradiance(
+            self.solar_zenith, self.solar_azimuth,
+            dni=self.weather['dni'],
+            ghi=self._weather('ghi'),
+            dhi=self._weather('dhi'),
+            dii=self._weather('dii'),
+            gii=self._weather('gii'),
+            spillage=self.spillage,
+            context=self.context,
+            **self.kwargs)
+
+    def _celltemp(self, system, poa):
+        if 'tau' in system.temperature_model_parameters:
+            return system.pvsyst_celltemp_transient(
+                poa, self.weather['temp_air'],
+                self._weather('wind_speed', 1.0))[0]
+        return system.pvsyst_celltemp(poa, self.weather['temp_air'],
+                                      self._weather('wind_speed', 1.0))
+
+    @_memoized
+    def temp_cell_cpv(self):
+        """
+        Cell temperature of the StaticCPVSystem subsystem, transient if its
+        ``temperature_model_parameters`` contain ``tau``.
+        """
+        return self._celltemp(self.system.static_cpv_sys, self.dii_effective)
+
+    @_memoized
+    def temp_cell_flatplate(self):
+        """
+        Cell temperature of the StaticFlatPlateSystem subsystem, transient if
+        its ``temperature_model_parameters`` contain ``tau``. The direct
+        light reaching the module is added to its effective irradiance.
+        """
+        return self._celltemp(
+            self.system.static_flatplate_sys,
+            self.poa_flatplate_static_effective + self.dii_effective)
+
+    @_memoized
+    def diode_parameters_cpv(self):
+        """calcparams_pvsyst output of the StaticCPVSystem subsystem."""
+        return self.system.static_cpv_sys.calcparams_pvsyst(
+            self.dii_effective, self.temp_cell_cpv)
+
+    @_memoized
+    def diode_parameters_flatplate(self):
+        """calcparams_pvsyst output of the StaticFlatPlateSystem subsystem."""
+        return self.system.static_flatplate_sys.calcparams_pvsyst(
+            self.poa_flatplate_static_effective, self.temp_cell_flatplate)
+
+    @_memoized
+    def dc_cpv(self):
+        """singlediode output of the StaticCPVSystem subsystem."""
+        dc = self._electrical_singlediode(self.system.static_cpv_sys,
+                                          self.dii_effective,
+                                          self.temp_cell_cpv)
+        if dc is not None:
+            return dc
+        return self.system.static_cpv_sys.singlediode(
+            *self.diode_parameters_cpv)
+
+    @_memoized
+    def dc_flatplate(self):
+        """singlediode output of the StaticFlatPlateSystem subsystem."""
+        dc = self._electrical_singlediode(self.system.static_flatplate_sys,
+                                          self.poa_flatplate_static_effective,
+                                          self.temp_cell_flatplate)
+        if dc is not None:
+            return dc
+        return self.system.static_flatplate_sys.singlediode(
+            *self.diode_parameters_flatplate)
+
+    @_memoized
+    def uf_cpv(self):
+        """Global utilization factor of the StaticCPVSystem subsystem."""
+        if self.airmass_absolute is None and self.context is None:
+            raise ValueError(
+                'airmass_absolute is required for the utilization factor')
+        return self.system.get_global_utilization_factor_cpv(
+            self.airmass_absolute, self.weather['temp_air'],
+            smr=self._weather('smr'), context=self.context)
+
+    @_memoized
+    def p_mp_cpv(self):
+        """Maximum power of the StaticCPVSystem subsystem including the
+        global utilization factor."""
+        p_mp_cpv = self.dc_cpv['p_mp'] * self.uf_cpv
+        if self.irradiance_threshold is not None:
+            # the utilization factor is NaN at night
+            p_mp_cpv = p_mp_cpv.where(
+                electrical.get_mask(self.dii_effective, self.solar_zenith,
+                                    self.irradiance_threshold),
+                self.fill_value)
+        if self.apply_losses:
+            self.losses_cpv = self.system.static_cpv_sys.get_loss_stack()
+            # p_mp_cpv is a new Series, so the losses are applied in place
+            p_mp_cpv = self.losses_cpv.apply(p_mp_cpv, out=p_mp_cpv.values)
+        return p_mp_cpv
+
+    @_memoized
+    def p_mp_flatplate(self):
+        """Maximum power of the StaticFlatPlateSystem subsystem."""
+        p_mp_flatplate = self.dc_flatplate['p_mp']
+        if self.apply_losses:
+            self.losses_flatplate = self.system.static_flatplate_sys.get_loss_stack()
+            p_mp_flatplate = self.losses_flatplate.apply(p_mp_flatplate)
+        return p_mp_flatplate
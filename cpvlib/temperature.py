@@ -0,0 +1,116 @@
+"""
+The ``temperature`` module contains a transient (thermal inertia) cell
+temperature model, in the spirit of :py:func:`pvlib.temperature.prilliman`.
+
+The steady state cell temperature (e.g. from ``pvsyst_celltemp``) is passed
+through a first order low-pass filter with time constant ``tau``::
+
+    T[k] = a[k] * T[k-1] + (1 - a[k]) * T_steady[k],  a[k] = exp(-dt[k] / tau)
+
+The recursion is evaluated in closed form with cumulative sums, block by
+block, so it is linear in time, handles irregular timestamps and gaps and
+can be continued across chunks of data through a ThermalState.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+ThermalState = namedtuple('ThermalState', ['time', 'temp_cell'])
+
+# largest exponent (sum of dt / tau) accumulated within a block, so that
+# exp(block) does not overflow
+BLOCK = 300.
+
+
+def _filter_run(x, temp_steady, temp_previous, out):
+    """
+    Closed form of the recursion on a run without resets. Only the first
+    ``x`` of a run can be larger than BLOCK, so it is left out of the
+    exponents.
+    """
+    decay = np.cumsum(x) - x[0]
+    weights = -np.expm1(-x) * temp_steady * np.exp(decay)
+    out[:] = np.exp(-decay) * (np.exp(-x[0]) * temp_previous +
+                               np.cumsum(weights))
+
+
+def first_order(temp_cell, tau, max_gap=None, initial_state=None):
+    """
+    Applies a first order thermal inertia filter to a steady state cell
+    temperature.
+
+    Parameters
+    ----------
+    temp_cell : Series
+        Steady state cell temperature, with a DatetimeIndex. NaN samples are
+        skipped and returned as NaN.
+    tau : float
+        Time constant of the module [s].
+    max_gap : None or float, default None
+        Samples more than ``max_gap`` seconds after the previous valid one
+        restart the filter at their steady state temperature. If None, the
+        filter is never restarted.
+    initial_state : None or ThermalState, default None
+        State returned by a previous call on the preceding chunk of data.
+        If None, the filter starts at the steady state temperature of the
+        first sample.
+
+    Returns
+    -------
+    temp_cell : Series
+        Transient cell temperature.
+    state : ThermalState
+        Time and temperature of the last valid sample, to continue the
+        filter on the next chunk.
+    """
+    if tau <= 0:
+        raise ValueError('tau must be positive')
+
+    valid = temp_cell.notna().values
+    temp_steady = temp_cell.values[valid].astype(float)
+    times = temp_cell.index[valid]
+
+    out = np.full(len(temp_cell), np.nan)
+    if not len(temp_steady):
+        return pd.Series(out, index=temp_cell.index), initial_state
+
+    seconds = times.asi8 / 1e9
+    dt = np.empty(len(seconds))
+    dt[1:] = np.diff(seconds)
+
+    if initial_state is None:
+        dt[0] = np.nan
+        temp_previous = np.nan
+    else:
+        dt[0] = (times[0] - pd.Timestamp(initial_state.time)).total_seconds()
+        temp_previous = initial_state.temp_cell
+
+    if (dt < 0).any():
+        raise ValueError('temp_cell index must be increasing')
+
+    reset = np.isnan(dt)
+    if max_gap is not None:
+        reset |= dt > max_gap
+
+    x = np.where(reset, 0, dt / tau)
+    block = np.floor(np.cumsum(x) / BLOCK)
+    starts = np.flatnonzero(reset | (np.diff(block, prepend=block[0]) != 0))
+    starts = np.union1d(starts, [0])
+    ends = np.append(starts[1:], len(x))
+
+    filtered = np.empty(len(x))
+    for start, end in zip(starts, ends):
+        if reset[start]:
+            filtered[start] = temp_previous = temp_steady[start]
+            start += 1
+        if start < end:
+            _filter_run(x[start:end], temp_steady[start:end], temp_previous,
+                        filtered[start:end])
+            temp_previous = filtered[end - 1]
+
+    out[valid] = filtered
+    state = ThermalState(time=times[-1], temp_cell=filtered[-1])
+
+    return pd.Series(out, index=temp_cell.index, name=temp_cell.name), state
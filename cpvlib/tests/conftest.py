@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import pvlib
+
+DATA_DIR = Path(__file__).resolve().parent / 'data'
+
+MOD_PARAMS_CPV = {
+    "gamma_ref": 5.524,
+    "mu_gamma": 0.003,
+    "I_L_ref": 0.96,
+    "I_o_ref": 0.00000000017,
+    "R_sh_ref": 5226,
+    "R_sh_0": 21000,
+    "R_sh_exp": 5.50,
+    "R_s": 0.01,
+    "alpha_sc": 0.00,
+    "EgRef": 3.91,
+    "irrad_ref": 1000,
+    "temp_ref": 25,
+    "cells_in_series": 12,
+    "eta_m": 0.32,
+    "alpha_absorption": 0.9,
+    "b": 0.7,
+    "iam_model": 'interp',
+    "theta_ref": [0, 5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60],
+    "iam_ref": [1.000, 1.007, 0.998, 0.991, 0.971, 0.966, 0.938, 0.894, 0.830, 0.790, 0.740, 0.649, 0.387],
+    "IscDNI_top": 0.96 / 1000,
+    "am_thld": 4.574231933073185,
+    "am_uf_m_low": 3.906372068620377e-06,
+    "am_uf_m_high": -3.0335768119184845e-05,
+    "ta_thld": 50,
+    "ta_uf_m_low": 4.6781224141650075e-06,
+    "ta_uf_m_high": 0,
+    "weight_am": 0.2,
+    "weight_temp": 0.8,
+}
+
+MOD_PARAMS_FLATPLATE = {
+    "gamma_ref": 1.05,
+    "mu_gamma": 0.001,
+    "I_L_ref": 6.0,
+    "I_o_ref": 5e-9,
+    "R_sh_ref": 300,
+    "R_sh_0": 1000,
+    "R_sh_exp": 5.5,
+    "R_s": 0.5,
+    "alpha_sc": 0.001,
+    "EgRef": 1.121,
+    "irrad_ref": 1000,
+    "temp_ref": 25,
+    "cells_in_series": 12,
+    "eta_m": 0.1,
+    "alpha_absorption": 0.9,
+    "aoi_limit": 55,
+    "theta_ref": [0, 5, 15, 25, 35, 45, 55, 65, 70, 80, 85, 90],
+    "iam_ref": [1, 1, 1, 1, 1, 1, 0.95, 0.7, 0.5, 0.5, 0.5, 0],
+    "theta_ref_spillage": [0, 10, 20, 30, 40, 50, 55, 90],
+    "iam_ref_spillage": [1, 1, 1.02, 1.16, 1.37, 1.37, 1.37, 1.37],
+}
+
+HYBRID_PARAMETERS = {
+    'surface_tilt': 30,
+    'surface_azimuth': 180,
+    'module_parameters_cpv': MOD_PARAMS_CPV,
+    'module_parameters_flatplate': MOD_PARAMS_FLATPLATE,
+    'temperature_model_parameters_cpv': {'u_c': 9.5, 'u_v': 0},
+    'temperature_model_parameters_flatplate': {'u_c': 24, 'u_v': 0.05},
+}
+
+
+@pytest.fixture
+def mod_params_cpv():
+    return dict(MOD_PARAMS_CPV)
+
+
+@pytest.fixture
+def mod_params_flatplate():
+    return dict(MOD_PARAMS_FLATPLATE)
+
+
+@pytest.fixture
+def hybrid_parameters():
+    return dict(HYBRID_PARAMETERS)
+
+
+@pytest.fixture
+def location():
+    return pvlib.location.Location(
+        latitude=40.4, longitude=-3.7, altitude=695, tz='Europe/Madrid')
+
+
+@pytest.fixture
+def weather():
+    """Two synthetic clear-sky days at 10 minute resolution, with a cloudy afternoon."""
+    location = pvlib.location.Location(
+        latitude=40.4, longitude=-3.7, altitude=695, tz='Europe/Madrid')
+    times = pd.date_range('2019-06-01', periods=2 * 144, freq='10min',
+                          tz=location.tz)
+    cos_zenith = np.clip(
+        pvlib.tools.cosd(location.get_solarposition(times)['zenith']), 0, 1)
+
+    weather = pd.DataFrame(index=times)
+    weather['dni'] = 950 * cos_zenith ** 0.3
+    weather['dhi'] = 120 * cos_zenith
+    weather['ghi'] = weather['dni'] * cos_zenith + weather['dhi']
+
+    cloudy = (times.day == 2) & (times.hour >= 15)
+    weather.loc[cloudy, 'dni'] *= 0.1
+    weather.loc[cloudy, 'ghi'] *= 0.5
+
+    hours = times.hour + times.minute / 60
+    weather['temp_air'] = 20 + 8 * np.sin(np.pi * (hours - 9) / 12)
+    weather['wind_speed'] = 2.
+
+    return weather
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from cpvlib import adaptive, cpvsystem
+
+
+@pytest.fixture
+def inputs(hybrid_parameters, location, weather):
+    system = cpvsystem.StaticHybridSystem(**hybrid_parameters)
+    weather = weather.resample('1min').interpolate()
+    solar_position = location.get_solarposition(weather.index)
+    airmass_absolute = location.get_airmass(
+        weather.index, solar_position=solar_position).airmass_absolute
+    return (system, solar_position['zenith'], solar_position['azimuth'],
+            weather, airmass_absolute)
+
+
+def test_run_adaptive_step_1(inputs):
+    system, zenith, azimuth, weather, airmass_absolute = inputs
+    power = adaptive.run_adaptive(system, zenith, azimuth, weather,
+                                  airmass_absolute, spillage=0.15, step=1)
+    results = system.run_model(zenith, azimuth, weather,
+                               airmass_absolute=airmass_absolute,
+                               spillage=0.15)
+
+    assert power['evaluated'].all()
+    pd.testing.assert_series_equal(power['p_mp_cpv'], results.p_mp_cpv,
+                                   check_names=False)
+    pd.testing.assert_series_equal(power['p_mp_flatplate'],
+                                   results.p_mp_flatplate, check_names=False)
+
+
+def test_run_adaptive_refinement(inputs):
+    system, zenith, azimuth, weather, airmass_absolute = inputs
+    power = adaptive.run_adaptive(system, zenith, azimuth, weather,
+                                  airmass_absolute, step=15)
+
+    assert power['evaluated'].mean() < 0.5
+    assert power['evaluated'].iloc[::15].all()
+
+    aoi = system.static_flatplate_sys.get_aoi(zenith, azimuth)
+    assert power['evaluated'][(aoi - 55).abs() < 2].all()
+
+    # the sharp drop in dni of the cloudy afternoon is refined
+    drop = weather.index.get_loc(pd.Timestamp('2019-06-02 15:00',
+                                              tz=weather.index.tz))
+    assert power['evaluated'].iloc[drop - 1:drop + 1].all()
+
+
+def test_get_energy_error(inputs):
+    system, zenith, azimuth, weather, airmass_absolute = inputs
+    error = adaptive.get_energy_error(system, zenith, azimuth, weather,
+                                      airmass_absolute, spillage=0.15,
+                                      step=15)
+
+    assert list(error.index) == ['energy_cpv', 'energy_flatplate',
+                                 'energy_total']
+    assert (error['relative_error'].abs() < 5e-3).all()
+    assert error.attrs['evaluated'] < 0.5
+    np.testing.assert_allclose(error.loc['energy_total', 'reference'],
+                               error['reference'].iloc[:2].sum())
+
+
+def test_run_adaptive_invalid_step(inputs):
+    with pytest.raises(ValueError):
+        adaptive.run_adaptive(*inputs, step=0)
+
+
+def test_segment_mixed_nan():
+    nan = np.nan
+    x = np.array([nan, nan, 1, 2, nan, nan, nan, 1, nan, nan])
+    starts, ends = np.array([0, 3, 6]), np.array([3, 6, 9])
+    np.testing.assert_array_equal(adaptive._segment_mixed_nan(x, starts, ends),
+                                  [True, True, True])
+
+    # NaN at the end of the last segment only
+    for x in [[nan, nan, nan, 1, nan, nan], [1, nan, nan, nan, nan]]:
+        x = np.array(x)
+        assert adaptive._segment_mixed_nan(x, np.array([0]),
+                                           np.array([len(x) - 1]))[0]
+
+    x = np.array([nan, nan, nan, 1., 2., 3.])
+    np.testing.assert_array_equal(
+        adaptive._segment_mixed_nan(x, np.array([0, 3]), np.array([2, 5])),
+        [False, False])
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+import pytest
+
+import pvlib
+from cpvlib import atmosphere
+
+
+def test_get_atmospheric_context(location, weather):
+    solar_position = location.get_solarposition(weather.index)
+    context = atmosphere.get_atmospheric_context(
+        location, solar_position=solar_position)
+
+    airmass = location.get_airmass(solar_position=solar_position)
+    pd.testing.assert_series_equal(context.airmass_relative,
+                                   airmass['airmass_relative'],
+                                   check_names=False)
+    pd.testing.assert_series_equal(context.airmass_absolute,
+                                   airmass['airmass_absolute'],
+                                   check_names=False)
+    pd.testing.assert_series_equal(
+        context.dni_extra,
+        pvlib.irradiance.get_extra_radiation(weather.index))
+    assert context.pressure == pvlib.atmosphere.alt2pres(location.altitude)
+
+    # same result from the times
+    context_times = atmosphere.get_atmospheric_context(location,
+                                                       weather.index)
+    pd.testing.assert_series_equal(context_times.airmass_absolute,
+                                   context.airmass_absolute)
+
+
+def test_get_atmospheric_context_pressure(location, weather):
+    pressure = pd.Series(90000., index=weather.index)
+    context = atmosphere.get_atmospheric_context(location, weather.index,
+                                                 pressure=pressure)
+    pd.testing.assert_series_equal(context.airmass_absolute,
+                                   context.airmass_relative * 90000 / 101325)
+
+
+def test_get_atmospheric_context_model(location, weather):
+    context = atmosphere.get_atmospheric_context(location, weather.index,
+                                                 model='young1994')
+    zenith = location.get_solarposition(weather.index)['zenith']
+    pd.testing.assert_series_equal(
+        context.airmass_relative,
+        pvlib.atmosphere.get_relative_airmass(zenith, 'young1994'))
+
+    with pytest.raises(ValueError):
+        atmosphere.get_atmospheric_context(location, weather.index,
+                                           model='unknown')
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from cpvlib import batch, cpvsystem
+
+
+@pytest.fixture
+def sites(tmp_path, weather):
+    weather.tz_localize(None).to_csv(tmp_path / 'madrid.csv')
+    weather.tz_localize(None).to_csv(tmp_path / 'sevilla.csv')
+
+    return pd.DataFrame({
+        'latitude': [40.4, 37.4, 40.4],
+        'longitude': [-3.7, -6.0, -3.7],
+        'altitude': [695, 10, 695],
+        'tz': ['Europe/Madrid'] * 3,
+        'filename': [tmp_path / 'madrid.csv', tmp_path / 'sevilla.csv',
+                     tmp_path / 'missing.csv'],
+    }, index=['madrid', 'sevilla', 'missing'])
+
+
+def test_read_tmy_csv(tmp_path, weather):
+    weather.tz_localize(None).to_csv(tmp_path / 'tmy.csv')
+
+    tmy = batch.read_tmy(tmp_path / 'tmy.csv', year=2010)
+
+    assert list(tmy.columns) == ['dni', 'ghi', 'dhi', 'temp_air', 'wind_speed']
+    assert (tmy.index.year == 2010).all()
+    np.testing.assert_allclose(tmy['dni'], weather['dni'])
+
+
+def test_read_tmy_leap_day(tmp_path):
+    times = pd.date_range('2020-02-28', '2020-03-02', freq='1h')[:-1]
+    weather = pd.DataFrame(1., index=times,
+                           columns=['dni', 'ghi', 'dhi', 'temp_air',
+                                    'wind_speed'])
+    weather.to_csv(tmp_path / 'tmy.csv')
+
+    tmy = batch.read_tmy(tmp_path / 'tmy.csv', year=2019)
+    assert len(tmy) == 48
+    assert tmy.index.is_unique
+    assert (tmy.index.year == 2019).all()
+
+    tmy = batch.read_tmy(tmp_path / 'tmy.csv', year=2012)
+    assert len(tmy) == 72
+    assert ((tmy.index.month == 2) & (tmy.index.day == 29)).sum() == 24
+
+
+def test_simulate_site(hybrid_parameters, location, weather):
+    system = cpvsystem.StaticHybridSystem(**hybrid_parameters)
+
+    power = batch.simulate_site(system, location, weather, spillage=0.15)
+    annual, monthly = batch.get_energy(power)
+
+    assert list(power.columns) == ['p_mp_cpv', 'p_mp_flatplate']
+    assert annual['energy_cpv'] > annual['energy_flatplate'] > 0
+    assert annual['energy_total'] == pytest.approx(
+        annual['energy_cpv'] + annual['energy_flatplate'])
+    assert monthly.loc[6, 'energy_total'] == pytest.approx(
+        annual['energy_total'])
+
+
+@pytest.mark.parametrize('output_format', ['csv', 'parquet'])
+def test_run_sites(tmp_path, sites, hybrid_parameters, output_format):
+    if output_format == 'parquet':
+        pytest.importorskip('pyarrow')
+
+    progress = []
+    status = batch.run_sites(sites, hybrid_parameters, tmp_path / 'out',
+                             output_format=output_format, n_workers=2,
+                             progress=progress.append)
+
+    assert list(status['status']) == ['ok', 'ok', 'failed']
+    assert 'missing.csv' in status.loc['missing', 'error']
+
+    assert [p.done for p in progress] == [1, 2, 3]
+    assert progress[-1].failed == 1
+    assert progress[-1].sites_per_minute > 0
+
+    # a rerun replaces the results instead of appending them
+    batch.run_sites(sites, hybrid_parameters, tmp_path / 'out',
+                    output_format=output_format, n_workers=2,
+                    progress=progress.append)
+
+    if output_format == 'csv':
+        annual = pd.read_csv(tmp_path / 'out' / 'annual.csv')
+        monthly = pd.read_csv(tmp_path / 'out' / 'monthly.csv')
+    else:
+        annual = pd.read_parquet(tmp_path / 'out' / 'annual')
+        monthly = pd.read_parquet(tmp_path / 'out' / 'monthly')
+
+    assert sorted(annual['site']) == ['madrid', 'sevilla']
+    assert sorted(monthly['site']) == ['madrid', 'sevilla']
+    assert (annual['energy_total'] > 0).all()
+
+
+def test_run_sites_invalid_format(tmp_path, sites, hybrid_parameters):
+    with pytest.raises(ValueError):
+        batch.run_sites(sites, hybrid_parameters, tmp_path, output_format='xls')
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cpvlib import batch, cache, cpvsystem
+
+pytest.importorskip('pyarrow')
+
+
+def test_get_key(hybrid_parameters, weather):
+    system = cpvsystem.StaticHybridSystem(**hybrid_parameters)
+    same_system = cpvsystem.StaticHybridSystem(**hybrid_parameters)
+
+    key = cache.get_key(system, weather, spillage=0.15)
+
+    assert key == cache.get_key(same_system, weather.copy(), spillage=0.15)
+    assert key != cache.get_key(system, weather, spillage=0)
+
+    other_weather = weather.copy()
+    other_weather.iloc[100, 0] += 1
+    assert key != cache.get_key(system, other_weather, spillage=0.15)
+
+    other_system = cpvsystem.StaticHybridSystem(
+        **dict(hybrid_parameters, surface_tilt=20))
+    assert key != cache.get_key(other_system, weather, spillage=0.15)
+
+
+def test_ResultCache_roundtrip(tmp_path, weather):
+    result_cache = cache.ResultCache(tmp_path)
+
+    assert result_cache.get('abc') is None
+
+    result_cache.put('abc', weather)
+
+    assert 'abc' in result_cache
+    pd.testing.assert_frame_equal(result_cache.get('abc'), weather,
+                                  check_freq=False)
+
+
+def test_ResultCache_lru_eviction(tmp_path, weather):
+    result_cache = cache.ResultCache(tmp_path)
+    result_cache.put('a', weather)
+    size = result_cache.size
+    result_cache.max_size = 2.5 * size
+
+    result_cache.put('b', weather)
+    t = os.stat(tmp_path / 'a.parquet').st_mtime
+    os.utime(tmp_path / 'a.parquet', (t - 20, t - 20))
+    os.utime(tmp_path / 'b.parquet', (t - 10, t - 10))
+
+    result_cache.get('a')
+    result_cache.put('c', weather)
+
+    assert 'a' in result_cache
+    assert 'b' not in result_cache
+    assert 'c' in result_cache
+    assert result_cache.size <= result_cache.max_size
+
+
+def test_simulate_site_cached(tmp_path, mocker, hybrid_parameters, location,
+                              weather):
+    system = cpvsystem.StaticHybridSystem(**hybrid_parameters)
+    result_cache = cache.ResultCache(tmp_path)
+
+    power = batch.simulate_site(system, location, weather, spillage=0.15,
+                                cache=result_cache)
+
+    spy = mocker.spy(system, 'singlediode')
+    power_cached = batch.simulate_site(system, location, weather,
+                                       spillage=0.15, cache=result_cache)
+
+    assert spy.call_count == 0
+    np.testing.assert_array_equal(power.values, power_cached.values)
+
+
+def test_get_key_time_series_losses(tmp_path, hybrid_parameters, location,
+                                    weather):
+    soiling = pd.Series(10., index=weather.index)
+
+    def get_system(soiling):
+        return cpvsystem.StaticHybridSystem(
+            **hybrid_parameters,
+            losses_parameters_flatplate={'soiling': soiling})
+
+    system = get_system(soiling)
+    key = cache.get_key(system, weather)
+
+    assert key == cache.get_key(get_system(soiling.copy()), weather)
+    assert key != cache.get_key(get_system(soiling * 2), weather)
+    # same values at other timestamps
+    assert key != cache.get_key(
+        get_system(soiling.tz_convert('UTC').tz_localize(None)), weather)
+
+    result_cache = cache.ResultCache(tmp_path)
+    power = batch.simulate_site(system, location, weather,
+                                cache=result_cache)
+    power_cached = batch.simulate_site(get_system(soiling.copy()), location,
+                                       weather, cache=result_cache)
+    np.testing.assert_array_equal(power.values, power_cached.values)
+
+
+def test_hash_parameters_unhashable():
+    assert (cache.hash_parameters({'a': np.arange(3),
+                                   'b': pd.Timestamp('2019-06-01')}) ==
+            cache.hash_parameters({'b': pd.Timestamp('2019-06-01'),
+                                   'a': np.arange(3)}))
+
+    # no memory addresses in the keys
+    with pytest.raises(TypeError):
+        cache.hash_parameters({'a': {1, 2}})
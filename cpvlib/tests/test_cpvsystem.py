@@ -4,11 +4,16 @@ Created on Sun Feb  7 23:16:16 2021
 
 @author: Ruben
 """
+import json
+import pickle
+import threading
+
 import pandas as pd
 import numpy as np
+import pytest
 
 import pvlib
-from cpvlib import cpvsystem
+from cpvlib import atmosphere, cpvsystem, tracking
 
 mod_params_cpv = {
     "gamma_ref": 5.524,
@@ -111,6 +116,62 @@ def test_CPVSystem_get_irradiance():
     pd.testing.assert_frame_equal(irradiance, expected, rtol=0.0001)
 
 
+def test_CPVSystem_get_irradiance_context():
+    cpv_system = cpvsystem.CPVSystem()
+    times = pd.date_range(start='20160101 1200-0700',
+                          end='20160101 1800-0700', freq='6H')
+    location = pvlib.location.Location(latitude=32, longitude=-111)
+    solar_position = location.get_solarposition(times)
+    irrads = pd.DataFrame({'dni': [900, 0], 'ghi': [600, 0], 'dhi': [100, 0]},
+                          index=times)
+    context = atmosphere.get_atmospheric_context(
+        location, solar_position=solar_position)
+
+    irradiance = cpv_system.get_irradiance(
+        solar_position['zenith'], solar_position['azimuth'], irrads['dni'],
+        irrads['ghi'], irrads['dhi'], model='perez', context=context)
+
+    expected = cpv_system.get_irradiance(
+        solar_position['zenith'], solar_position['azimuth'], irrads['dni'],
+        irrads['ghi'], irrads['dhi'], model='perez',
+        dni_extra=context.dni_extra, airmass=context.airmass_relative)
+
+    pd.testing.assert_frame_equal(irradiance, expected)
+
+
+def test_CPVSystem_get_irradiance_beam_only():
+    cpv_system = cpvsystem.CPVSystem()
+    times = pd.date_range(start='20160101 1200-0700',
+                          end='20160101 1800-0700', freq='6H')
+    location = pvlib.location.Location(latitude=32, longitude=-111)
+    solar_position = location.get_solarposition(times)
+    irrads = pd.DataFrame({'dni': [900, 0], 'ghi': [600, 0], 'dhi': [100, 0]},
+                          index=times)
+
+    irradiance = cpv_system.get_irradiance(solar_position['apparent_zenith'],
+                                           solar_position['azimuth'],
+                                           irrads['dni'],
+                                           beam_only=True)
+
+    expected = cpv_system.get_irradiance(solar_position['apparent_zenith'],
+                                         solar_position['azimuth'],
+                                         irrads['dni'],
+                                         irrads['ghi'],
+                                         irrads['dhi'])
+
+    pd.testing.assert_frame_equal(irradiance, expected[['poa_direct']])
+
+    irradiance = cpv_system.get_irradiance(
+        solar_position['apparent_zenith'].iloc[0],
+        solar_position['azimuth'].iloc[0], 900, beam_only=True)
+    assert irradiance['poa_direct'] == pytest.approx(
+        expected['poa_direct'].iloc[0])
+
+    with pytest.raises(ValueError):
+        cpv_system.get_irradiance(solar_position['apparent_zenith'],
+                                  solar_position['azimuth'], irrads['dni'])
+
+
 def test_CPVSystem_pvsyst_celltemp(mocker):
     parameter_set = 'freestanding'
     temp_model_params = pvlib.temperature.TEMPERATURE_MODEL_PARAMETERS['pvsyst'][
@@ -180,6 +241,48 @@ def test_CPVSystem_get_global_utilization_factor():
 
     pd.testing.assert_series_equal(uf_global, expected, rtol=0.0001)
 
+
+def test_CPVSystem_get_smr_util_factor():
+    cpv_system = cpvsystem.CPVSystem(module_parameters=dict(
+        mod_params_cpv, smr_ref=[0.8, 1, 1.2], smr_uf_ref=[0.9, 1, 0.85]))
+
+    smr = pd.Series(data=np.array([0.7, 0.9, 1.1, 1.3]))
+
+    smr_uf = cpv_system.get_smr_util_factor(smr)
+    expected = pd.Series(data=np.array([0.9, 0.95, 0.925, 0.85]))
+    pd.testing.assert_series_equal(smr_uf, expected)
+
+    smr_uf = cpv_system.get_smr_util_factor(
+        smr, smr_thld=1, smr_uf_m_low=0.2, smr_uf_m_high=-0.5)
+    expected = pd.Series(data=np.array([0.94, 0.98, 0.95, 0.85]))
+    pd.testing.assert_series_equal(smr_uf, expected)
+
+
+def test_CPVSystem_get_global_utilization_factor_smr():
+    cpv_system = cpvsystem.CPVSystem(module_parameters=dict(
+        mod_params_cpv, smr_ref=[0.8, 1, 1.2], smr_uf_ref=[0.9, 1, 0.85],
+        weight_smr=0.1))
+
+    times = pd.date_range(start='20160101 1200',
+                          end='20160101 1500', freq='3H')
+
+    airmass_absolute = pd.Series(
+        data=np.array([2.056997, 3.241064]), index=times)
+    temp_air = pd.Series(data=np.array([5, 35]), index=times)
+    smr = pd.Series(data=np.array([0.9, 1.1]), index=times)
+
+    uf_global = cpv_system.get_global_utilization_factor(
+        airmass_absolute, temp_air, smr=smr)
+
+    expected = pd.Series(data=np.array([0.917522, 1.032939]), index=times)
+
+    pd.testing.assert_series_equal(uf_global, expected, rtol=0.0001)
+
+    with pytest.raises(AttributeError):
+        cpvsystem.CPVSystem(
+            module_parameters=mod_params_cpv).get_global_utilization_factor(
+                airmass_absolute, temp_air, smr=smr)
+
 ##############################
 
 
@@ -426,3 +529,192 @@ def test_HybridSystem_get_global_utilization_factor_cpv():
     expected = pd.Series(data=np.array([0.822522, 0.940439]), index=times)
 
     pd.testing.assert_series_equal(uf_global, expected, rtol=0.0001)
+
+
+def test_HybridSystem_get_global_utilization_factor_cpv_context():
+
+    static_hybsystem = cpvsystem.StaticHybridSystem(
+        module_parameters_cpv=mod_params_cpv,
+        module_parameters_flatplate=mod_params_flatplate)
+
+    times = pd.date_range(start='20160101 1200',
+                          end='20160101 1500', freq='3H')
+
+    airmass_absolute = pd.Series(
+        data=np.array([2.056997, 3.241064]), index=times)
+    temp_air = pd.Series(data=np.array([5, 35]), index=times)
+    context = atmosphere.AtmosphericContext(
+        airmass_relative=None, airmass_absolute=airmass_absolute,
+        dni_extra=None, pressure=None)
+
+    uf_global = static_hybsystem.get_global_utilization_factor_cpv(
+        None, temp_air, context=context)
+
+    expected = pd.Series(data=np.array([0.822522, 0.940439]), index=times)
+
+    pd.testing.assert_series_equal(uf_global, expected, rtol=0.0001)
+
+    with pytest.raises(ValueError):
+        static_hybsystem.get_global_utilization_factor_cpv(None, temp_air)
+
+
+def test_HybridSystem_get_global_utilization_factor_cpv_smr():
+
+    static_hybsystem = cpvsystem.StaticHybridSystem(
+        module_parameters_cpv=dict(
+            mod_params_cpv, smr_ref=[0.8, 1, 1.2], smr_uf_ref=[0.9, 1, 0.85],
+            weight_smr=0.1),
+        module_parameters_flatplate=mod_params_flatplate)
+
+    times = pd.date_range(start='20160101 1200',
+                          end='20160101 1500', freq='3H')
+
+    airmass_absolute = pd.Series(
+        data=np.array([2.056997, 3.241064]), index=times)
+    temp_air = pd.Series(data=np.array([5, 35]), index=times)
+    smr = pd.Series(data=np.array([0.9, 1.1]), index=times)
+
+    uf_global = static_hybsystem.get_global_utilization_factor_cpv(
+        airmass_absolute, temp_air, smr=smr)
+
+    expected = pd.Series(data=np.array([0.917522, 1.032939]), index=times)
+
+    pd.testing.assert_series_equal(uf_global, expected, rtol=0.0001)
+
+
+def test_HybridSystem_parallel(hybrid_parameters, location, weather, mocker):
+    system = cpvsystem.StaticHybridSystem(**hybrid_parameters)
+    system_parallel = cpvsystem.StaticHybridSystem(parallel=True,
+                                                   **hybrid_parameters)
+    solar_position = location.get_solarposition(weather.index)
+
+    threads = []
+    singlediode = cpvsystem.StaticCPVSystem.singlediode
+
+    def spy(self, *args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return singlediode(self, *args, **kwargs)
+
+    mocker.patch.object(cpvsystem.StaticCPVSystem, 'singlediode', spy)
+
+    for s in [system, system_parallel]:
+        irradiance = s.get_effective_irradiance(
+            solar_position['zenith'], solar_position['azimuth'],
+            dni=weather['dni'], ghi=weather['ghi'], dhi=weather['dhi'])
+        celltemp = s.pvsyst_celltemp(*irradiance, weather['temp_air'],
+                                     weather['wind_speed'])
+        diode_parameters = s.calcparams_pvsyst(*irradiance, *celltemp)
+        dc = s.singlediode(*diode_parameters)
+
+        if s is system:
+            expected = irradiance, celltemp, dc
+
+    for result, result_expected in zip([irradiance, celltemp, dc], expected):
+        for x, x_expected in zip(result, result_expected):
+            pd.testing.assert_frame_equal(pd.DataFrame(x),
+                                          pd.DataFrame(x_expected))
+
+    # the CPV branch runs in the thread pool
+    assert threads[0] == threading.current_thread().name
+    assert threads[1].startswith('cpvlib')
+
+
+@pytest.mark.parametrize('cls', [cpvsystem.CPVSystem,
+                                 cpvsystem.StaticCPVSystem,
+                                 cpvsystem.StaticFlatPlateSystem])
+def test_to_dict_from_dict(cls):
+    module_parameters = dict(mod_params_cpv,
+                             theta_ref=np.array(mod_params_cpv['theta_ref']),
+                             iam_ref=np.float32(mod_params_cpv['iam_ref']))
+    system = cls(module_parameters=module_parameters,
+                 temperature_model_parameters=pd.Series({'u_c': 29., 'u_v': 0}),
+                 name='test')
+
+    data = system.to_dict()
+    assert data['class'] == cls.__name__
+    assert data['version'] == cpvsystem.SERIALIZATION_VERSION
+
+    for other in [cls.from_dict(data), cls.from_bytes(system.to_bytes()),
+                  pickle.loads(pickle.dumps(system))]:
+        assert type(other) is cls
+        assert other.to_dict() == data
+        assert vars(other).keys() == vars(system).keys()
+        np.testing.assert_array_equal(other.module_parameters['iam_ref'],
+                                      module_parameters['iam_ref'])
+        assert other.module_parameters['iam_ref'].dtype == np.float32
+        pd.testing.assert_series_equal(other.temperature_model_parameters,
+                                       system.temperature_model_parameters)
+
+
+def test_StaticHybridSystem_to_bytes(hybrid_parameters):
+    seconds = np.arange(0, 365 * 86400, 300.)
+    table = tracking.TrackerTable(seconds, np.sin(seconds), {'max_angle': 60})
+    system = cpvsystem.StaticHybridSystem(
+        in_singleaxis_tracker=True, tracker_table=table, parallel=True,
+        parameters_tracker={'max_angle': 60}, **hybrid_parameters)
+
+    data = system.to_bytes()
+    other = cpvsystem.from_bytes(data)
+
+    assert other.to_dict() == system.to_dict()
+    assert other.parallel
+    np.testing.assert_array_equal(other.static_cpv_sys.tracker_table.tracker_theta,
+                                  table.tracker_theta)
+    assert (other.static_flatplate_sys.temperature_model_parameters ==
+            hybrid_parameters['temperature_model_parameters_flatplate'])
+    assert len(data) < len(pickle.dumps(vars(system)))
+
+    with pytest.raises(ValueError):
+        cpvsystem.StaticCPVSystem.from_bytes(data)
+
+
+def test_StaticHybridSystem_pickle_series_losses(hybrid_parameters,
+                                                location, weather):
+    soiling = pd.Series(10., index=weather.index)
+    system = cpvsystem.StaticHybridSystem(
+        losses_parameters_flatplate={'soiling': soiling},
+        **hybrid_parameters)
+
+    solar_position = location.get_solarposition(weather.index)
+
+    def run(system):
+        return system.run_model(solar_position['zenith'],
+                                solar_position['azimuth'], weather,
+                                apply_losses=True)
+
+    expected = run(system)
+    assert expected.p_mp_flatplate.sum() > 0
+    assert expected.losses_flatplate.summary()['soiling'] > 0
+
+    for other in [pickle.loads(pickle.dumps(system)),
+                  cpvsystem.from_bytes(system.to_bytes())]:
+        losses = other.static_flatplate_sys.losses_parameters['soiling']
+        pd.testing.assert_series_equal(losses, soiling)
+
+        results = run(other)
+        pd.testing.assert_series_equal(results.p_mp_flatplate,
+                                       expected.p_mp_flatplate)
+        pd.testing.assert_series_equal(
+            results.losses_flatplate.summary(),
+            expected.losses_flatplate.summary())
+
+
+def test_Series_encode_decode():
+    for series in [
+            pd.Series([1., 2.], index=pd.date_range('2019-01-01', periods=2,
+                                                    freq='1h'), name='x'),
+            pd.Series([1, 2], index=pd.Index([0.5, 1.5], name='aoi')),
+            pd.Series(['a', None], index=['u', 'v']),
+            pd.Series([], dtype=float)]:
+        decoded = cpvsystem._decode(json.loads(json.dumps(
+            cpvsystem._encode(series))))
+        pd.testing.assert_series_equal(decoded, series)
+
+
+def test_from_dict_version():
+    data = cpvsystem.StaticCPVSystem().to_dict()
+    data['version'] = cpvsystem.SERIALIZATION_VERSION + 1
+    with pytest.raises(ValueError):
+        cpvsystem.from_dict(data)
+    with pytest.raises(ValueError):
+        cpvsystem.from_dict(dict(data, version=1, **{'class': 'PVSystem'}))
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from cpvlib import cpvsystem, electrical
+
+
+@pytest.fixture
+def cpv_inputs(mod_params_cpv, location, weather):
+    system = cpvsystem.StaticCPVSystem(
+        surface_tilt=30, surface_azimuth=180,
+        module_parameters=mod_params_cpv,
+        temperature_model_parameters={'u_c': 9.5, 'u_v': 0})
+    solar_zenith = location.get_solarposition(weather.index)['zenith']
+    dii_effective = system.get_effective_irradiance(
+        solar_zenith, location.get_solarposition(weather.index)['azimuth'],
+        weather['dni'])
+    temp_cell = system.pvsyst_celltemp(dii_effective, weather['temp_air'])
+    return system, dii_effective, temp_cell, solar_zenith
+
+
+def test_get_mask():
+    mask = electrical.get_mask(np.array([0, 0.5, 2, 800, np.nan, 800]),
+                               np.array([95, 80, 80, 30, 30, 91]))
+    np.testing.assert_array_equal(mask, [False, False, True, True, False,
+                                         False])
+
+
+def test_singlediode(mocker, cpv_inputs):
+    system, dii_effective, temp_cell, solar_zenith = cpv_inputs
+    spy = mocker.spy(system, 'calcparams_pvsyst')
+
+    dc = electrical.singlediode(system, dii_effective, temp_cell,
+                                solar_zenith, irradiance_threshold=1.)
+
+    mask = (dii_effective > 1) & (solar_zenith < 90)
+    assert len(spy.call_args[0][0]) == mask.sum() < len(dii_effective)
+
+    expected = system.singlediode(*system.calcparams_pvsyst(dii_effective,
+                                                            temp_cell))
+
+    assert list(dc.columns) == electrical.DC_COLUMNS
+    pd.testing.assert_frame_equal(dc[mask], expected[electrical.DC_COLUMNS][mask])
+    assert (dc[~mask] == 0).all().all()
+
+
+def test_singlediode_no_samples(cpv_inputs):
+    system = cpv_inputs[0]
+    dc = electrical.singlediode(system, np.zeros(3), 20., fill_value=np.nan)
+    assert np.isnan(dc['p_mp']).all()
+    assert len(dc['p_mp']) == 3
+
+
+def test_deduplicate():
+    unique = electrical.deduplicate([0, 0.2, 0.6, 10.1, 10.1, 3],
+                                    [20, 20.04, 20.02, 30, 30, 20],
+                                    irradiance_resolution=1,
+                                    temperature_resolution=0.1)
+
+    np.testing.assert_array_equal(unique.effective_irradiance, [0, 1, 3, 10])
+    np.testing.assert_array_equal(unique.inverse, [0, 0, 1, 3, 3, 2])
+    assert unique.hit_rate == pytest.approx(2 / 6)
+    assert unique.irradiance_error == pytest.approx(0.4)
+    assert unique.temperature_error == pytest.approx(0.04)
+
+
+def test_singlediode_deduplicated(cpv_inputs):
+    system, dii_effective, temp_cell, solar_zenith = cpv_inputs
+    # measurement resolution
+    dii_effective = dii_effective.round()
+    temp_cell = temp_cell.round(1)
+
+    exact = electrical.singlediode(system, dii_effective, temp_cell,
+                                   solar_zenith)
+    dc = electrical.singlediode(system, dii_effective, temp_cell,
+                                solar_zenith, irradiance_resolution=1,
+                                temperature_resolution=0.1)
+    pd.testing.assert_frame_equal(dc, exact)
+    assert 0 < dc.attrs['hit_rate'] < 1
+
+    dc = electrical.singlediode(system, dii_effective, temp_cell,
+                                solar_zenith, irradiance_resolution=20,
+                                temperature_resolution=2,
+                                estimate_error=True)
+    assert dc.attrs['irradiance_error'] <= 10
+    assert dc.attrs['temperature_error'] <= 1
+    assert (dc['p_mp'] - exact['p_mp']).abs().max() <= dc.attrs['p_mp_error']
+
+
+def test_ivcurves(cpv_inputs):
+    system, dii_effective, temp_cell, _ = cpv_inputs
+    diode_parameters = system.calcparams_pvsyst(dii_effective, temp_cell)
+    expected = system.singlediode(*diode_parameters, ivcurve_pnts=50)
+
+    curves = electrical.ivcurves(*diode_parameters, ivcurve_pnts=50,
+                                 chunksize=100)
+    assert curves.v.shape == curves.i.shape == (len(dii_effective), 50)
+    np.testing.assert_allclose(curves.v, expected['v'])
+    np.testing.assert_allclose(curves.i, expected['i'])
+
+    # the maximum of the dense curves approaches p_mp
+    p_mp = np.nanmax(curves.v * curves.i, axis=1)
+    np.testing.assert_allclose(p_mp, expected['p_mp'], rtol=2e-3, atol=0.05)
+
+
+def test_StaticHybridSystem_ivcurves(hybrid_parameters, location, weather,
+                                     tmp_path):
+    system = cpvsystem.StaticHybridSystem(**hybrid_parameters)
+    solar_position = location.get_solarposition(weather.index)
+    irradiance = system.get_effective_irradiance(
+        solar_position['zenith'], solar_position['azimuth'],
+        dni=weather['dni'], ghi=weather['ghi'], dhi=weather['dhi'])
+    diode_parameters = system.calcparams_pvsyst(
+        *irradiance, *system.pvsyst_celltemp(*irradiance, weather['temp_air']))
+
+    curves = system.ivcurves(*diode_parameters, ivcurve_pnts=20)
+    curves_float32 = system.ivcurves(*diode_parameters, ivcurve_pnts=20,
+                                     dtype='float32', directory=tmp_path)
+
+    for name, (c, c_float32) in zip(['cpv', 'flatplate'],
+                                    zip(curves, curves_float32)):
+        assert isinstance(c_float32.v, np.memmap)
+        assert c_float32.i.dtype == np.float32
+        np.testing.assert_allclose(c_float32.i, c.i, rtol=1e-6, atol=1e-6)
+
+        loaded = np.load(tmp_path / '{}_v.npy'.format(name), mmap_mode='r')
+        np.testing.assert_array_equal(loaded, c_float32.v)
+
+
+@pytest.fixture
+def hybrid_diode_parameters(hybrid_parameters, location, weather):
+    system = cpvsystem.StaticHybridSystem(**hybrid_parameters)
+    solar_position = location.get_solarposition(weather.index)
+    irradiance = system.get_effective_irradiance(
+        solar_position['zenith'], solar_position['azimuth'],
+        dni=weather['dni'], ghi=weather['ghi'], dhi=weather['dhi'])
+    return system, system.calcparams_pvsyst(
+        *irradiance, *system.pvsyst_celltemp(*irradiance, weather['temp_air']))
+
+
+def _brute_force(diode_parameters_cpv, diode_parameters_flatplate,
+                 connection, pnts=5000):
+    arrays = np.broadcast_arrays(*[
+        np.asarray(x, dtype=float) for x in
+        list(diode_parameters_cpv) + list(diode_parameters_flatplate)])
+    cpv, flatplate = arrays[:5], arrays[5:]
+    if connection == 'series':
+        upper = np.maximum(cpv[0], flatplate[0]) * 1.01
+        i = upper[:, np.newaxis] * np.linspace(0, 1, pnts)
+        v = (np.maximum(electrical._voltage(i, *cpv), 0) +
+             np.maximum(electrical._voltage(i, *flatplate), 0))
+    else:
+        zero = np.zeros(len(cpv[0]))
+        upper = np.maximum(electrical._voltage(zero, *cpv),
+                           electrical._voltage(zero, *flatplate))
+        v = upper[:, np.newaxis] * np.linspace(0, 1, pnts)
+        i = (np.maximum(electrical._current(v, *cpv), 0) +
+             np.maximum(electrical._current(v, *flatplate), 0))
+    return np.nanmax(v * i, axis=1)
+
+
+@pytest.mark.parametrize('connection', ['series', 'parallel'])
+def test_combine(hybrid_diode_parameters, connection):
+    system, (diode_parameters_cpv, diode_parameters_flatplate) = \
+        hybrid_diode_parameters
+
+    dc = electrical.combine(diode_parameters_cpv, diode_parameters_flatplate,
+                            connection=connection)
+    expected = _brute_force(diode_parameters_cpv, diode_parameters_flatplate,
+                            connection)
+
+    assert list(dc.columns) == ['p_mp', 'v_mp', 'i_mp']
+    np.testing.assert_allclose(dc['p_mp'], expected, rtol=1e-4, atol=1e-4)
+    # the dense grid search is only a lower bound of the maximum, once the
+    # golden-section search converges well below the grid step
+    fine = electrical.combine(diode_parameters_cpv,
+                              diode_parameters_flatplate,
+                              connection=connection, atol=1e-7)
+    assert (fine['p_mp'] >= expected - 1e-9).all()
+    np.testing.assert_allclose(dc['p_mp'], dc['v_mp'] * dc['i_mp'],
+                               atol=1e-9)
+
+    # wiring losses: never more than each submodule on its own MPPT, up to
+    # the tolerance of the pvlib maximum power point search
+    separate = electrical.combine(diode_parameters_cpv,
+                                  diode_parameters_flatplate,
+                                  connection='separate')
+    assert (dc['p_mp'] <= separate['p_mp'] * (1 + 1e-4) + 1e-6).all()
+
+
+def test_combine_separate(hybrid_diode_parameters):
+    system, diode_parameters = hybrid_diode_parameters
+    dc = system.combine(*diode_parameters, connection='separate')
+    dc_cpv, dc_flatplate = system.singlediode(*diode_parameters)
+    np.testing.assert_allclose(dc['p_mp'],
+                               dc_cpv['p_mp'] + dc_flatplate['p_mp'])
+
+    with pytest.raises(ValueError):
+        electrical.combine(*diode_parameters, connection='delta')
+
+
+def test_combine_bimodal():
+    # the CPV submodule limits the current: the flat plate one alone (CPV
+    # bypassed) or both at the CPV current
+    cpv = (np.array([0.5, 0.5]), 1.7e-10, 0.01, 5226, 12 * 0.0475)
+    flatplate = (np.array([6., 0.6]), 5e-9, 0.5, 300, 12 * 0.0257)
+
+    dc = electrical.combine(cpv, flatplate, connection='series', grid_pnts=10)
+    expected = _brute_force(cpv, flatplate, 'series')
+    np.testing.assert_allclose(dc['p_mp'], expected, rtol=1e-4, atol=1e-4)
+    assert dc['i_mp'][0] > 1
+
+
+@pytest.mark.parametrize('connection,cpv,flatplate', [
+    # both submodules conduct only below the small CPV short circuit
+    # current, where the CPV voltage is high
+    ('series', (np.array([0.25, 0.3]), 1.7e-10, 0.01, 5226, 8.),
+     (np.array([6., 6.]), 5e-9, 0.5, 300, 12 * 0.0257)),
+    # both submodules conduct only below the small CPV open circuit
+    # voltage, where the CPV current is high
+    ('parallel', (np.array([100., 80.]), 1.7e-10, 0.001, 5226, 0.1),
+     (np.array([6., 6.]), 5e-9, 0.5, 300, 60 * 0.0257)),
+])
+def test_combine_narrow_hump(connection, cpv, flatplate):
+    # the hump with both submodules conducting is narrower than the coarse
+    # grid step, but holds the global maximum power point
+    dc = electrical.combine(cpv, flatplate, connection=connection)
+    expected = _brute_force(cpv, flatplate, connection, pnts=20001)
+    np.testing.assert_allclose(dc['p_mp'], expected, rtol=1e-6)
+    if connection == 'series':
+        assert (dc['i_mp'] < cpv[0]).all()
+    else:
+        # open circuit voltage of the CPV submodule is about 2.7 V
+        assert (dc['v_mp'] < 2.7).all()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import pvlib
+from cpvlib import cpvsystem, gridded
+
+xr = pytest.importorskip('xarray')
+pytest.importorskip('dask')
+
+
+@pytest.fixture
+def ds(weather):
+    weather = weather.tz_convert('UTC').tz_localize(None)
+    lat = np.array([38., 40.4])
+    lon = np.array([-6., -3.7, 0.])
+    scale = xr.DataArray(np.linspace(0.8, 1., 6).reshape(2, 3),
+                         coords={'lat': lat, 'lon': lon}, dims=['lat', 'lon'])
+
+    data = {name: xr.DataArray(weather[name].values, coords={'time': weather.index},
+                               dims=['time']) for name in weather}
+    ds = xr.Dataset(data, coords={'lat': lat, 'lon': lon})
+    for name in ['dni', 'ghi', 'dhi']:
+        ds[name] = ds[name] * scale
+
+    return ds.transpose('time', 'lat', 'lon')
+
+
+def _point(ds, lat, lon):
+    point = ds.sel(lat=lat, lon=lon).to_dataframe()[
+        ['dni', 'ghi', 'dhi', 'temp_air', 'wind_speed']]
+    zenith, azimuth = gridded.get_solarposition(point.index.values, lat, lon)
+    return (point, pd.Series(zenith, index=point.index),
+            pd.Series(azimuth, index=point.index))
+
+
+def test_get_solarposition(location, weather):
+    times = weather.index.tz_convert('UTC').tz_localize(None)
+    zenith, azimuth = gridded.get_solarposition(
+        times.values, location.latitude, location.longitude)
+    solpos = location.get_solarposition(weather.index)
+
+    day = solpos['zenith'].values < 85
+    np.testing.assert_allclose(zenith[day], solpos['zenith'].values[day],
+                               atol=1)
+    np.testing.assert_allclose(azimuth[day], solpos['azimuth'].values[day],
+                               atol=1.5)
+
+
+def test_hybrid_yield_dask(ds, hybrid_parameters):
+    system = cpvsystem.StaticHybridSystem(**hybrid_parameters)
+
+    out = gridded.hybrid_yield(system, ds.chunk({'time': 48}), spillage=0.15,
+                               altitude=695)
+
+    assert out['p_mp_cpv'].chunks is not None
+    assert out['p_mp_cpv'].dims == ('time', 'lat', 'lon')
+
+    out = out.compute(scheduler='threads')
+
+    point, zenith, azimuth = _point(ds, 40.4, -3.7)
+    airmass_absolute = pvlib.atmosphere.get_absolute_airmass(
+        pvlib.atmosphere.get_relative_airmass(zenith),
+        pvlib.atmosphere.alt2pres(695))
+    results = system.run_model(zenith, azimuth, point,
+                               airmass_absolute=airmass_absolute,
+                               spillage=0.15)
+
+    np.testing.assert_allclose(
+        out['p_mp_cpv'].sel(lat=40.4, lon=-3.7).fillna(0),
+        results.p_mp_cpv.fillna(0), atol=1e-9)
+    np.testing.assert_allclose(
+        out['p_mp_flatplate'].sel(lat=40.4, lon=-3.7).fillna(0),
+        results.p_mp_flatplate.fillna(0), atol=1e-9)
+    assert (out['p_mp_cpv'].sum('time') > 0).all()
+
+
+def test_cpv_yield(ds, mod_params_cpv):
+    system = cpvsystem.StaticCPVSystem(
+        surface_tilt=30, surface_azimuth=180,
+        module_parameters=mod_params_cpv,
+        temperature_model_parameters={'u_c': 9.5, 'u_v': 0})
+
+    lazy = gridded.cpv_yield(system, ds.chunk({'time': 100, 'lat': 1}))
+    out = gridded.cpv_yield(system, ds)
+
+    xr.testing.assert_allclose(lazy.compute(), out)
+
+    point, zenith, azimuth = _point(ds, 38., 0.)
+    dii_effective = system.get_effective_irradiance(zenith, azimuth,
+                                                    point['dni'])
+    np.testing.assert_allclose(out['dii_effective'].sel(lat=38., lon=0.),
+                               dii_effective)
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+import subprocess
+import sys
+from pathlib import Path
+
+import cpvlib
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def _run(code):
+    return subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                          capture_output=True, text=True).stdout.split()
+
+
+def test_import_is_lazy():
+    heavy = ['pvlib', 'pandas', 'scipy', 'pkg_resources', 'cpvlib.cpvsystem']
+    loaded = _run('import sys, cpvlib; '
+                  'print(*[m for m in {!r} if m in sys.modules])'.format(heavy))
+    assert loaded == []
+
+
+def test_submodule_access():
+    assert _run('import cpvlib; print(cpvlib.cpvsystem.__name__)') == [
+        'cpvlib.cpvsystem']
+    assert 'cpvsystem' in dir(cpvlib)
+    assert cpvlib.tracking.TrackerTable is not None
+
+
+def test_missing_attribute():
+    assert getattr(cpvlib, 'missing', None) is None
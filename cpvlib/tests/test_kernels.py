@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import pvlib
+from cpvlib import cpvsystem, kernels
+
+from .conftest import DATA_DIR
+
+LOCATION = pvlib.location.Location(
+    latitude=40.4, longitude=-3.7, altitude=695, tz='Europe/Madrid')
+
+
+def _insolight():
+    data = pd.read_csv(DATA_DIR / 'InsolightMay2019.csv',
+                       index_col='Date Time', parse_dates=True,
+                       encoding='latin1')
+    data.index = data.index.tz_localize('Europe/Madrid')
+    return pd.DataFrame({
+        'dni': data['DNI (W/m2)'],
+        'dii': data['DII (W/m2)'],
+        'gii': data['GII (W/m2)'],
+        'temp_air': data['T_Amb (°C)'],
+        'wind_speed': data['Wind Speed (m/s)'],
+    })
+
+
+def _meteo(name):
+    meteo = pd.read_csv(DATA_DIR / name, sep='\t',
+                        index_col='yyyy/mm/dd hh:mm', parse_dates=True)
+    meteo.index = meteo.index.tz_localize('Europe/Madrid')
+    return pd.DataFrame({
+        'dni': meteo['Bn'],
+        'ghi': meteo['Gh'],
+        'dhi': meteo['Dh'],
+        'temp_air': meteo['Temp. Ai 1'],
+        'wind_speed': meteo['V.Vien.1'],
+    })
+
+
+@pytest.fixture(scope='module', params=[
+    'InsolightMay2019.csv', 'meteo2020_03_04.txt', 'meteo2020_03_14.txt'])
+def dataset(request):
+    if request.param.endswith('.csv'):
+        data = _insolight()
+    else:
+        data = _meteo(request.param)
+    solar_position = LOCATION.get_solarposition(data.index)
+    data['solar_zenith'] = solar_position['zenith']
+    data['solar_azimuth'] = solar_position['azimuth']
+    data['airmass_absolute'] = LOCATION.get_airmass(
+        data.index, solar_position=solar_position)['airmass_absolute']
+    return data
+
+
+@pytest.fixture(params=['interp', 'ashrae'])
+def cpv_system(request, mod_params_cpv):
+    return cpvsystem.StaticCPVSystem(
+        surface_tilt=30, surface_azimuth=180,
+        module_parameters=dict(mod_params_cpv, iam_model=request.param),
+        temperature_model_parameters={'u_c': 9.5, 'u_v': 0.2})
+
+
+@pytest.fixture
+def flatplate_system(mod_params_flatplate):
+    return cpvsystem.StaticFlatPlateSystem(
+        surface_tilt=30, surface_azimuth=180,
+        module_parameters=mod_params_flatplate,
+        temperature_model_parameters={'u_c': 24, 'u_v': 0.05})
+
+
+def _flatplate_chain(system, dataset, backend, **kwargs):
+    if 'dii' in dataset:
+        kwargs.update(dii=dataset['dii'],
+                      poa_diffuse=dataset['gii'] - dataset['dii'])
+    else:
+        irr = system.get_irradiance(
+            dataset['solar_zenith'], dataset['solar_azimuth'],
+            dataset['dni'], dataset['ghi'], dataset['dhi'])
+        kwargs.update(dni=dataset['dni'], poa_diffuse=irr['poa_diffuse'])
+
+    return kernels.static_flatplate_chain(
+        system, dataset['solar_zenith'], dataset['solar_azimuth'],
+        temp_air=dataset['temp_air'], wind_speed=dataset['wind_speed'],
+        backend=backend, **kwargs)
+
+
+def test_get_backend():
+    assert kernels.get_backend('numpy') == 'numpy'
+    assert kernels.get_backend() == ('numba' if kernels.HAS_NUMBA
+                                     else 'numpy')
+    with pytest.raises(ValueError):
+        kernels.get_backend('fortran')
+
+
+def test_static_cpv_chain_numpy(cpv_system, dataset):
+    dii_effective, temp_cell, uf_global = kernels.static_cpv_chain(
+        cpv_system, dataset['solar_zenith'], dataset['solar_azimuth'],
+        dataset['dni'], dataset['temp_air'], dataset['wind_speed'],
+        dataset['airmass_absolute'], backend='numpy')
+
+    expected = cpv_system.get_effective_irradiance(
+        dataset['solar_zenith'], dataset['solar_azimuth'], dataset['dni'])
+
+    assert isinstance(dii_effective, pd.Series)
+    pd.testing.assert_series_equal(dii_effective, expected,
+                                   check_names=False)
+    pd.testing.assert_series_equal(
+        temp_cell,
+        cpv_system.pvsyst_celltemp(expected, dataset['temp_air'],
+                                   dataset['wind_speed']),
+        check_names=False)
+    pd.testing.assert_series_equal(
+        uf_global,
+        cpv_system.get_global_utilization_factor(
+            dataset['airmass_absolute'], dataset['temp_air']),
+        check_names=False)
+
+
+def test_static_flatplate_chain_numpy(flatplate_system, dataset):
+    poa_effective, temp_cell = _flatplate_chain(
+        flatplate_system, dataset, 'numpy', spillage=0.15)
+
+    kwargs = ({'dii': dataset['dii'], 'gii': dataset['gii']}
+              if 'dii' in dataset else
+              {'dni': dataset['dni'], 'ghi': dataset['ghi'],
+               'dhi': dataset['dhi']})
+    expected = flatplate_system.get_effective_irradiance(
+        dataset['solar_zenith'], dataset['solar_azimuth'], spillage=0.15,
+        **kwargs)
+
+    pd.testing.assert_series_equal(poa_effective, expected,
+                                   check_names=False)
+    pd.testing.assert_series_equal(
+        temp_cell,
+        flatplate_system.pvsyst_celltemp(expected, dataset['temp_air'],
+                                         dataset['wind_speed']),
+        check_names=False)
+
+
+def test_static_cpv_chain_numba(cpv_system, dataset):
+    pytest.importorskip('numba')
+    args = (cpv_system, dataset['solar_zenith'], dataset['solar_azimuth'],
+            dataset['dni'], dataset['temp_air'], dataset['wind_speed'],
+            dataset['airmass_absolute'])
+
+    for numba_result, numpy_result in zip(
+            kernels.static_cpv_chain(*args, backend='numba'),
+            kernels.static_cpv_chain(*args, backend='numpy')):
+        np.testing.assert_allclose(numba_result, numpy_result,
+                                   rtol=1e-10, atol=1e-10)
+
+
+def test_static_flatplate_chain_numba(flatplate_system, dataset):
+    pytest.importorskip('numba')
+    offset = dataset['dni'] * 0.5
+
+    for numba_result, numpy_result in zip(
+            _flatplate_chain(flatplate_system, dataset, 'numba',
+                             spillage=0.15, irradiance_offset=offset),
+            _flatplate_chain(flatplate_system, dataset, 'numpy',
+                             spillage=0.15, irradiance_offset=offset)):
+        np.testing.assert_allclose(numba_result, numpy_result,
+                                   rtol=1e-10, atol=1e-10)
+
+
+def test_static_cpv_chain_scalar(cpv_system):
+    dii_effective, temp_cell, uf_global = kernels.static_cpv_chain(
+        cpv_system, 30, 170, 900, 20)
+
+    np.testing.assert_allclose(
+        dii_effective, cpv_system.get_effective_irradiance(30, 170, 900))
+    assert np.isnan(uf_global).all()
+
+
+@pytest.fixture
+def hybrid_system(hybrid_parameters):
+    return cpvsystem.StaticHybridSystem(**hybrid_parameters)
+
+
+def _hybrid_irradiance(system, dataset, backend, **kwargs):
+    flatplate_sys = system.static_flatplate_sys
+    if 'dii' in dataset:
+        kwargs.update(dii=dataset['dii'])
+        poa_diffuse = dataset['gii'] - dataset['dii']
+    else:
+        poa_diffuse = flatplate_sys.get_irradiance(
+            dataset['solar_zenith'], dataset['solar_azimuth'],
+            dataset['dni'], dataset['ghi'], dataset['dhi'],
+            model='haydavies')['poa_diffuse']
+
+    return kernels.static_effective_irradiance(
+        system, dataset['solar_zenith'], dataset['solar_azimuth'],
+        poa_diffuse, dni=dataset['dni'], backend=backend, **kwargs)
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'numba'])
+def test_static_effective_irradiance_hybrid(hybrid_system, dataset, backend):
+    if backend == 'numba':
+        pytest.importorskip('numba')
+
+    dii_effective, poa_effective = _hybrid_irradiance(
+        hybrid_system, dataset, backend, spillage=0.15)
+
+    kwargs = ({'dii': dataset['dii'], 'gii': dataset['gii']}
+              if 'dii' in dataset else
+              {'ghi': dataset['ghi'], 'dhi': dataset['dhi']})
+    expected = hybrid_system.get_effective_irradiance(
+        dataset['solar_zenith'], dataset['solar_azimuth'], dataset['dni'],
+        spillage=0.15, **kwargs)
+
+    pd.testing.assert_series_equal(dii_effective, expected[0],
+                                   check_names=False, rtol=1e-10)
+    pd.testing.assert_series_equal(poa_effective, expected[1],
+                                   check_names=False, rtol=1e-10)
+
+
+def test_static_effective_irradiance_out(hybrid_system, flatplate_system,
+                                         dataset):
+    n = len(dataset)
+    out = np.empty(n), np.empty(n)
+    dii_effective, poa_effective = _hybrid_irradiance(
+        hybrid_system, dataset, 'numpy', out=out)
+    assert np.shares_memory(dii_effective, out[0])
+    assert np.shares_memory(poa_effective, out[1])
+
+    with pytest.raises(ValueError):
+        _hybrid_irradiance(hybrid_system, dataset, 'numpy',
+                           out=(np.empty(n), np.empty(n - 1)))
+
+    # a flat plate system has a single output
+    poa_diffuse = np.full(n, 100.)
+    poa_effective = kernels.static_effective_irradiance(
+        flatplate_system, dataset['solar_zenith'], dataset['solar_azimuth'],
+        poa_diffuse, dni=dataset['dni'], spillage=0.15, out=out[1])
+    assert np.shares_memory(poa_effective, out[1])
+    pd.testing.assert_series_equal(
+        poa_effective,
+        kernels.static_flatplate_chain(
+            flatplate_system, dataset['solar_zenith'],
+            dataset['solar_azimuth'], poa_diffuse, dataset['temp_air'],
+            dni=dataset['dni'], spillage=0.15, backend='numpy')[0])
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from cpvlib import batch, cpvsystem, lifetime
+
+
+@pytest.fixture
+def system(hybrid_parameters):
+    return cpvsystem.StaticHybridSystem(**hybrid_parameters)
+
+
+def _shift(weather, years):
+    weather = weather.copy()
+    weather.index = weather.index + pd.DateOffset(years=years)
+    return weather
+
+
+def test_get_degradation():
+    factors = lifetime.get_degradation({'cpv_cells': 0.5}, 10)
+    assert factors == {'cpv_optics': 1, 'cpv_cells': 0.95,
+                       'flatplate_cells': 1}
+    assert lifetime.get_degradation({'cpv_optics': 5}, 30)['cpv_optics'] == 0
+
+
+def test_LifetimeSimulation_invalid(system, location):
+    with pytest.raises(ValueError):
+        lifetime.LifetimeSimulation(system, location,
+                                    degradation_rates={'optics': 1})
+    with pytest.raises(ValueError):
+        lifetime.LifetimeSimulation(system, location, reference_year=2020)
+
+
+def test_LifetimeSimulation_simulate_year(system, location, weather):
+    simulation = lifetime.LifetimeSimulation(system, location)
+
+    # the reference geometry is the one of the weather
+    expected = batch.simulate_site(system, location, weather)
+    power = simulation.simulate_year(weather)
+    pd.testing.assert_frame_equal(power, expected, check_freq=False)
+
+    # another year reuses the geometry
+    shifted = _shift(weather, 1)
+    power = simulation.simulate_year(shifted)
+    assert len(simulation.geometry) == len(weather)
+    expected = batch.simulate_site(system, location, shifted)
+    np.testing.assert_allclose(power.sum(), expected.sum(), rtol=1e-3)
+
+
+def test_LifetimeSimulation_degradation(system, location, weather):
+    simulation = lifetime.LifetimeSimulation(
+        system, location,
+        degradation_rates={'cpv_cells': 2, 'flatplate_cells': 3})
+
+    power = simulation.simulate_year(weather, year=0)
+    degraded = simulation.simulate_year(weather, year=5)
+    pd.testing.assert_frame_equal(degraded, power * [0.9, 0.85])
+
+    # the optics reduce the irradiance, and with it the cell temperature
+    simulation.degradation_rates = {'cpv_optics': 1}
+    degraded = simulation.simulate_year(weather, year=5)
+    ratio = degraded['p_mp_cpv'].sum() / power['p_mp_cpv'].sum()
+    assert 0.9 < ratio < 0.96
+
+
+def test_LifetimeSimulation_run(system, location, weather):
+    simulation = lifetime.LifetimeSimulation(
+        system, location, degradation_rates={'flatplate_cells': 1})
+
+    def weathers():
+        for years in range(3):
+            yield _shift(weather, years)
+
+    energy = simulation.run(weathers())
+    assert list(energy.index) == [0, 1, 2]
+    assert list(energy['weather_year']) == [2019, 2020, 2021]
+    assert list(energy.columns) == ['weather_year', 'energy_cpv',
+                                    'energy_flatplate', 'energy_total']
+    assert len(simulation.geometry) == len(weather)
+
+    expected = batch.get_energy(batch.simulate_site(system, location,
+                                                    weather))[0]
+    np.testing.assert_allclose(energy.loc[0, 'energy_cpv'],
+                               expected['energy_cpv'])
+    np.testing.assert_allclose(energy.loc[0, 'energy_total'],
+                               expected['energy_total'])
+
+    # a single weather for every year
+    energy = simulation.run(weather, years=4)
+    assert len(energy) == 4
+    np.testing.assert_allclose(energy['energy_flatplate'],
+                               energy.loc[0, 'energy_flatplate'] *
+                               np.array([1, 0.99, 0.98, 0.97]))
+    np.testing.assert_allclose(energy['energy_cpv'],
+                               energy.loc[0, 'energy_cpv'])
+
+    with pytest.raises(ValueError):
+        simulation.run(weather)
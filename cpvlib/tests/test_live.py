@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cpvlib import cpvsystem, live
+from cpvlib.batch import simulate_site
+
+
+def _lines(weather):
+    for time, row in weather.iterrows():
+        sample = dict(row)
+        sample['time'] = time.isoformat()
+        yield json.dumps(sample) + '\n'
+
+
+async def _collect(records, n):
+    frames = []
+    while sum(len(frame) for frame in frames) < n:
+        frames.append(await records.get())
+    return pd.concat(frames)
+
+
+@pytest.fixture
+def system(hybrid_parameters):
+    return cpvsystem.StaticHybridSystem(**hybrid_parameters)
+
+
+def test_LivePipeline_QueueSource(system, location, weather):
+    async def main():
+        samples = asyncio.Queue()
+        for line in _lines(weather):
+            samples.put_nowait(live.parse_record(line))
+        samples.put_nowait(None)
+
+        records = asyncio.Queue()
+        pipeline = live.LivePipeline(system, location,
+                                     live.QueueSink(records), window=0.05,
+                                     max_batch=50, max_queue=20)
+        await pipeline.run(live.QueueSource(samples))
+        return pipeline, await _collect(records, len(weather))
+
+    pipeline, power = asyncio.run(main())
+
+    expected = simulate_site(system, location, weather)
+    pd.testing.assert_frame_equal(power, expected, check_freq=False)
+
+    metrics = pipeline.metrics()
+    assert metrics.samples_in == metrics.samples_out == len(weather)
+    assert metrics.batches == int(np.ceil(len(weather) / 50))
+    assert metrics.errors == 0
+    assert 0 < metrics.latency_mean <= metrics.latency_max
+    assert metrics.throughput > 0
+
+
+def test_LivePipeline_backpressure(system, location, weather):
+    async def main():
+        samples = asyncio.Queue()
+        for line in _lines(weather):
+            samples.put_nowait(live.parse_record(line))
+        samples.put_nowait(None)
+
+        queue_sizes = []
+
+        async def slow_sink(power):
+            queue_sizes.append(pipeline.metrics().queue_size)
+            await asyncio.sleep(0.01)
+
+        pipeline = live.LivePipeline(system, location, slow_sink,
+                                     window=10, max_batch=10, max_queue=5)
+        await pipeline.run(live.QueueSource(samples))
+        return pipeline, queue_sizes
+
+    pipeline, queue_sizes = asyncio.run(main())
+    # the source waits while the model catches up
+    assert max(queue_sizes) <= 5
+    assert pipeline.metrics().samples_out == len(weather)
+
+
+def test_LivePipeline_FileTailSource(system, location, weather, tmp_path):
+    path = tmp_path / 'meteo.jsonl'
+    lines = list(_lines(weather))
+    path.write_text(''.join(lines[:100]))
+
+    async def main():
+        records = asyncio.Queue()
+        pipeline = live.LivePipeline(system, location,
+                                     live.QueueSink(records), window=0.05)
+        task = asyncio.ensure_future(pipeline.run(
+            live.FileTailSource(path, poll_interval=0.01)))
+
+        power = [await _collect(records, 100)]
+        with open(path, 'a') as f:
+            # a line is only read once complete
+            f.write(lines[100][:20])
+            f.flush()
+            await asyncio.sleep(0.05)
+            f.write(''.join([lines[100][20:]] + lines[101:]))
+        power.append(await _collect(records, len(lines) - 100))
+
+        pipeline.stop()
+        await task
+        return pd.concat(power)
+
+    power = asyncio.run(main())
+    expected = simulate_site(system, location, weather)
+    pd.testing.assert_frame_equal(power, expected, check_freq=False)
+
+
+def test_LivePipeline_TCPSource(system, location, weather):
+    async def main():
+        records = asyncio.Queue()
+        source = live.TCPSource()
+        pipeline = live.LivePipeline(system, location,
+                                     live.QueueSink(records), window=0.05)
+        task = asyncio.ensure_future(pipeline.run(source))
+
+        await source.ready.wait()
+        for half in [weather.iloc[:150], weather.iloc[150:]]:
+            _, writer = await asyncio.open_connection('127.0.0.1',
+                                                      source.port)
+            writer.write(''.join(_lines(half)).encode())
+            await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+
+        power = await _collect(records, len(weather))
+        await source.close()
+        await task
+        return pipeline, power.sort_index()
+
+    pipeline, power = asyncio.run(main())
+    expected = simulate_site(system, location, weather)
+    pd.testing.assert_frame_equal(power, expected, check_freq=False)
+    assert pipeline.metrics().samples_in == len(weather)
+
+
+def test_TCPSource_outside_loop():
+    # created before the event loop that runs it
+    source = live.TCPSource()
+    assert source._ready is None
+
+    async def main():
+        samples = []
+
+        async def read():
+            async for sample in source:
+                samples.append(sample)
+
+        task = asyncio.ensure_future(read())
+        await source.ready.wait()
+        _, writer = await asyncio.open_connection('127.0.0.1', source.port)
+        writer.write(b'{"time": "2019-06-01 12:00", "dni": 800}\n')
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+        while not samples:
+            await asyncio.sleep(0.01)
+        await source.close()
+        await task
+        return samples
+
+    samples = asyncio.run(main())
+    assert len(samples) == 1
+    assert samples[0]['dni'] == 800
+
+
+def test_get_weather(location):
+    samples = [{'time': '2019-06-01 12:10', 'dni': 800, 'ghi': 900,
+                'dhi': 100, 'temp_air': 25},
+               {'time': '2019-06-01 12:00', 'dni': 700, 'ghi': 800,
+                'dhi': 100, 'temp_air': 24},
+               {'time': '2019-06-01 12:10', 'dni': 810, 'ghi': 900,
+                'dhi': 100, 'temp_air': 25}]
+    weather = live.get_weather(samples, tz=location.tz)
+
+    assert list(weather.columns) == live.WEATHER_COLUMNS
+    assert weather.index.is_monotonic_increasing
+    assert str(weather.index.tz) == 'Europe/Madrid'
+    assert weather['dni'].tolist() == [700, 810]
+    assert weather['wind_speed'].isna().all()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from cpvlib import cpvsystem, losses
+
+
+@pytest.fixture
+def power():
+    times = pd.date_range('2019-06-01', periods=6 * 24 * 10, freq='10min')
+    hours = times.hour + times.minute / 60
+    return pd.Series(np.clip(100 * np.sin(np.pi * (hours - 6) / 12), 0, None),
+                     index=times)
+
+
+def test_LossStack(power):
+    soiling = pd.Series(np.linspace(0, 5, len(power)), index=power.index)
+    stack = losses.LossStack({'soiling': soiling, 'availability': 2,
+                              'wiring': 1.5})
+
+    out = stack.apply(power)
+
+    expected = power * (1 - soiling / 100) * 0.98 * 0.985
+    pd.testing.assert_series_equal(out, expected)
+
+    energy = stack.summary()
+    assert list(energy.index) == ['input', 'soiling', 'availability',
+                                  'wiring', 'output']
+    np.testing.assert_allclose(energy['input'], power.sum() / 6)
+    np.testing.assert_allclose(energy['output'], out.sum() / 6)
+    np.testing.assert_allclose(energy['input'] - energy.iloc[1:-1].sum(),
+                               energy['output'])
+    np.testing.assert_allclose(energy['soiling'],
+                               (power * soiling / 100).sum() / 6)
+
+
+def test_LossStack_streaming(power):
+    soiling = pd.Series(np.linspace(0, 5, len(power)), index=power.index)
+    stack = losses.LossStack({'soiling': soiling, 'mismatch': 2})
+    expected = stack.apply(power)
+    energy = stack.summary()
+
+    stack.reset()
+    out = pd.concat([stack.apply(chunk, hours=1 / 6)
+                     for _, chunk in power.groupby(power.index.date)])
+
+    pd.testing.assert_series_equal(out, expected)
+    pd.testing.assert_series_equal(stack.summary(), energy)
+
+
+def test_LossStack_out(power):
+    values = power.to_numpy().copy()
+    out = losses.LossStack({'wiring': 2}).apply(values, out=values)
+    assert out is values
+    np.testing.assert_allclose(values, power * 0.98)
+
+
+def test_LossStack_invalid():
+    with pytest.raises(ValueError):
+        losses.LossStack({'soiling': 120})
+
+
+def test_run_model_apply_losses(hybrid_parameters, location, weather):
+    solar_position = location.get_solarposition(weather.index)
+    airmass_absolute = location.get_airmass(
+        weather.index, solar_position=solar_position)['airmass_absolute']
+    args = (solar_position['zenith'], solar_position['azimuth'], weather)
+
+    system = cpvsystem.StaticHybridSystem(**hybrid_parameters)
+    expected = system.run_model(*args, airmass_absolute=airmass_absolute)
+
+    availability = pd.Series(0., index=weather.index)
+    availability.iloc[:144] = 100
+    system = cpvsystem.StaticHybridSystem(
+        losses_parameters_cpv={'soiling': 3, 'availability': availability},
+        losses_parameters_flatplate={'soiling': 1},
+        **hybrid_parameters)
+    results = system.run_model(*args, airmass_absolute=airmass_absolute,
+                               apply_losses=True)
+
+    pd.testing.assert_series_equal(
+        results.p_mp_cpv,
+        expected.p_mp_cpv * 0.97 * (1 - availability / 100))
+    pd.testing.assert_series_equal(results.p_mp_flatplate,
+                                   expected.p_mp_flatplate * 0.99)
+
+    energy = results.losses_cpv.summary()
+    assert energy['availability'] > 0
+    np.testing.assert_allclose(energy['output'],
+                               results.p_mp_cpv.sum() / 6)
+    assert list(results.losses_flatplate.summary().index) == [
+        'input', 'soiling', 'output']
+
+    # not applied by default
+    assert system.run_model(*args).losses_cpv is None
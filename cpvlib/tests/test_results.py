@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from cpvlib import atmosphere, cpvsystem
+
+
+@pytest.fixture
+def run(hybrid_parameters, location, weather):
+    system = cpvsystem.StaticHybridSystem(**hybrid_parameters)
+    solar_position = location.get_solarposition(weather.index)
+    airmass_absolute = location.get_airmass(
+        weather.index, solar_position=solar_position).airmass_absolute
+
+    def run(**kwargs):
+        return system.run_model(solar_position['zenith'],
+                                solar_position['azimuth'], weather,
+                                airmass_absolute=airmass_absolute, **kwargs)
+
+    return system, run
+
+
+def test_run_model_lazy(mocker, run):
+    system, run = run
+    spy_cpv = mocker.spy(system.static_cpv_sys, 'singlediode')
+    spy_flatplate = mocker.spy(system.static_flatplate_sys, 'singlediode')
+
+    results = run(spillage=0.15)
+    assert results.computed == []
+
+    results.p_mp_cpv
+    results.p_mp_cpv
+
+    assert spy_cpv.call_count == 1
+    assert spy_flatplate.call_count == 0
+    assert 'poa_flatplate_static_effective' not in results.computed
+
+
+def test_run_model_matches_eager_chain(run, weather):
+    system, run = run
+    results = run(spillage=0.15)
+
+    dii_effective, poa_flatplate_static_effective = system.get_effective_irradiance(
+        results.solar_zenith, results.solar_azimuth, dni=weather['dni'],
+        ghi=weather['ghi'], dhi=weather['dhi'], spillage=0.15)
+    temp_cell_cpv, temp_cell_flatplate = system.pvsyst_celltemp(
+        dii_effective, poa_flatplate_static_effective + dii_effective,
+        weather['temp_air'], weather['wind_speed'])
+    diode_parameters_cpv, diode_parameters_flatplate = system.calcparams_pvsyst(
+        dii_effective, poa_flatplate_static_effective, temp_cell_cpv,
+        temp_cell_flatplate)
+    dc_cpv, dc_flatplate = system.singlediode(
+        diode_parameters_cpv, diode_parameters_flatplate)
+    uf_cpv = system.get_global_utilization_factor_cpv(
+        results.airmass_absolute, weather['temp_air'])
+
+    pd.testing.assert_series_equal(results.p_mp_cpv, dc_cpv['p_mp'] * uf_cpv)
+    pd.testing.assert_series_equal(results.p_mp_flatplate,
+                                   dc_flatplate['p_mp'])
+
+
+def test_run_model_free_intermediates(run):
+    _, run = run
+    results = run(free_intermediates=True)
+
+    p_mp_cpv = results.p_mp_cpv
+    assert results.computed == ['p_mp_cpv']
+
+    results.dii_effective
+    results.temp_cell_cpv
+    assert sorted(results.computed) == [
+        'dii_effective', 'p_mp_cpv', 'temp_cell_cpv']
+
+    results.release('p_mp_cpv')
+    np.testing.assert_array_equal(results.p_mp_cpv, p_mp_cpv)
+
+
+def test_run_model_missing_airmass(hybrid_parameters, location, weather):
+    system = cpvsystem.StaticHybridSystem(**hybrid_parameters)
+    solar_position = location.get_solarposition(weather.index)
+    results = system.run_model(solar_position['zenith'],
+                               solar_position['azimuth'], weather)
+
+    assert results.p_mp_flatplate.sum() > 0
+    with pytest.raises(ValueError):
+        results.p_mp_cpv
+
+
+def test_run_model_context(hybrid_parameters, location, weather, run):
+    system = cpvsystem.StaticHybridSystem(**hybrid_parameters)
+    solar_position = location.get_solarposition(weather.index)
+    context = atmosphere.get_atmospheric_context(
+        location, solar_position=solar_position)
+
+    results = system.run_model(solar_position['zenith'],
+                               solar_position['azimuth'], weather,
+                               context=context, model='perez')
+    expected = run[1](model='perez', dni_extra=context.dni_extra,
+                      airmass=context.airmass_relative)
+
+    pd.testing.assert_series_equal(results.p_mp_cpv, expected.p_mp_cpv)
+    pd.testing.assert_series_equal(results.p_mp_flatplate,
+                                   expected.p_mp_flatplate)
+
+
+def test_run_model_irradiance_threshold(mocker, run):
+    system, run = run
+    spy = mocker.spy(system.static_cpv_sys, 'singlediode')
+
+    results = run(irradiance_threshold=1.)
+    p_mp_cpv = results.p_mp_cpv
+
+    mask = (results.dii_effective > 1) & (results.solar_zenith < 90)
+    assert len(spy.call_args[0][0]) == mask.sum()
+
+    pd.testing.assert_series_equal(p_mp_cpv[mask], run().p_mp_cpv[mask])
+    assert (results.p_mp_cpv[~mask] == 0).all()
+    assert results.p_mp_flatplate.notna().all()
+
+
+def test_run_model_deduplicated(run):
+    _, run = run
+    results = run(irradiance_threshold=1., irradiance_resolution=1.,
+                  temperature_resolution=0.1)
+
+    np.testing.assert_allclose(results.p_mp_cpv,
+                               run(irradiance_threshold=1.).p_mp_cpv,
+                               atol=0.02)
+    assert 0 <= results.dc_cpv.attrs['hit_rate'] < 1
+    assert results.dc_flatplate.attrs['irradiance_error'] <= 0.5
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from cpvlib import cpvsystem, temperature
+
+
+def _recursive(temp_steady, seconds, tau, max_gap=None):
+    out = np.empty(len(temp_steady))
+    for k in range(len(temp_steady)):
+        dt = seconds[k] - seconds[k - 1] if k else np.nan
+        if np.isnan(dt) or (max_gap is not None and dt > max_gap):
+            out[k] = temp_steady[k]
+        else:
+            a = np.exp(-dt / tau)
+            out[k] = a * out[k - 1] + (1 - a) * temp_steady[k]
+    return out
+
+
+@pytest.fixture
+def temp_steady():
+    rng = np.random.default_rng(0)
+    times = pd.date_range('2019-06-01', periods=3000, freq='1min',
+                          tz='Europe/Madrid')
+    # irregular timestamps and a gap of one hour
+    times = times[np.sort(rng.choice(3000, 2500, replace=False))]
+    times = times[(times < '2019-06-01 20:00') | (times > '2019-06-01 21:00')]
+    return pd.Series(40 + 30 * rng.random(len(times)), index=times)
+
+
+def test_first_order(temp_steady):
+    temp_cell, state = temperature.first_order(temp_steady, tau=20,
+                                               max_gap=1800)
+
+    seconds = temp_steady.index.asi8 / 1e9
+    expected = _recursive(temp_steady.values, seconds, 20, max_gap=1800)
+
+    np.testing.assert_allclose(temp_cell, expected, rtol=1e-10)
+    assert state.time == temp_steady.index[-1]
+    assert state.temp_cell == temp_cell.iloc[-1]
+
+    after_gap = temp_steady.index > '2019-06-01 21:00'
+    assert temp_cell[after_gap].iloc[0] == temp_steady[after_gap].iloc[0]
+
+
+def test_first_order_regular_lfilter():
+    signal = pytest.importorskip('scipy.signal')
+    times = pd.date_range('2019-06-01', periods=200, freq='1min')
+    temp_steady = pd.Series(np.where(np.arange(200) < 50, 30., 60.),
+                            index=times)
+
+    temp_cell, _ = temperature.first_order(temp_steady, tau=300)
+
+    a = np.exp(-60 / 300)
+    expected, _ = signal.lfilter([1 - a], [1, -a], temp_steady.values[1:],
+                                 zi=[a * temp_steady.values[0]])
+    np.testing.assert_allclose(temp_cell.values[1:], expected)
+
+    # 63 % of the step after one time constant
+    np.testing.assert_allclose(temp_cell.iloc[54], 30 + 30 * (1 - np.exp(-1)))
+
+
+def test_first_order_chunks(temp_steady):
+    temp_cell, state = temperature.first_order(temp_steady, tau=600)
+
+    first, state_first = temperature.first_order(temp_steady.iloc[:1000],
+                                                 tau=600)
+    second, state_second = temperature.first_order(
+        temp_steady.iloc[1000:], tau=600, initial_state=state_first)
+
+    np.testing.assert_allclose(pd.concat([first, second]), temp_cell,
+                               rtol=1e-10)
+    assert state_second.time == state.time
+    assert state_second.temp_cell == pytest.approx(state.temp_cell)
+
+
+def test_first_order_long_tau_small(temp_steady):
+    # many blocks: sum of dt / tau much larger than temperature.BLOCK
+    temp_cell, _ = temperature.first_order(temp_steady, tau=1)
+    assert np.isfinite(temp_cell).all()
+    np.testing.assert_allclose(temp_cell, temp_steady, rtol=1e-10)
+
+
+def test_first_order_nan(temp_steady):
+    temp_steady.iloc[10:20] = np.nan
+    temp_cell, _ = temperature.first_order(temp_steady, tau=60)
+    assert temp_cell.iloc[10:20].isna().all()
+    assert temp_cell.drop(temp_cell.index[10:20]).notna().all()
+
+
+def test_StaticHybridSystem_pvsyst_celltemp_transient(hybrid_parameters,
+                                                      weather):
+    hybrid_parameters['temperature_model_parameters_cpv'] = {
+        'u_c': 9.5, 'u_v': 0, 'tau': 120}
+    hybrid_parameters['temperature_model_parameters_flatplate'] = {
+        'u_c': 24, 'u_v': 0.05, 'tau': 600, 'max_gap': 3600}
+    system = cpvsystem.StaticHybridSystem(**hybrid_parameters)
+
+    celltemp_cpv, celltemp_flatplate = system.pvsyst_celltemp(
+        weather['dni'], weather['ghi'], weather['temp_air'])
+    transient_cpv, transient_flatplate, state = system.pvsyst_celltemp_transient(
+        weather['dni'], weather['ghi'], weather['temp_air'])
+
+    assert state[0].temp_cell == transient_cpv.iloc[-1]
+    assert state[1].temp_cell == transient_flatplate.iloc[-1]
+
+    # the transient temperature lags behind the steady state one
+    for transient, steady in [(transient_cpv, celltemp_cpv),
+                              (transient_flatplate, celltemp_flatplate)]:
+        assert (transient != steady).any()
+        assert transient.max() <= steady.max()
+        assert transient.min() >= steady.min()
+
+    # the longer time constant lags more
+    assert ((transient_flatplate - celltemp_flatplate).abs().mean() /
+            celltemp_flatplate.diff().abs().mean() >
+            (transient_cpv - celltemp_cpv).abs().mean() /
+            celltemp_cpv.diff().abs().mean())
+
+    with pytest.raises(AttributeError):
+        cpvsystem.StaticCPVSystem().pvsyst_celltemp_transient(
+            weather['dni'], weather['temp_air'])
+
+
+def test_run_model_transient(hybrid_parameters, location, weather):
+    hybrid_parameters['temperature_model_parameters_cpv'] = {
+        'u_c': 9.5, 'u_v': 0, 'tau': 120}
+    system = cpvsystem.StaticHybridSystem(**hybrid_parameters)
+    solar_position = location.get_solarposition(weather.index)
+
+    results = system.run_model(solar_position['zenith'],
+                               solar_position['azimuth'], weather)
+
+    expected, _ = system.static_cpv_sys.pvsyst_celltemp_transient(
+        results.dii_effective, weather['temp_air'], weather['wind_speed'])
+    pd.testing.assert_series_equal(results.temp_cell_cpv, expected)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import pvlib
+from cpvlib import cpvsystem, tracking
+
+PARAMETERS_TRACKER = {'axis_tilt': 0, 'axis_azimuth': 180, 'max_angle': 60,
+                      'backtrack': False}
+
+
+@pytest.fixture(scope='module')
+def table():
+    location = pvlib.location.Location(
+        latitude=40.4, longitude=-3.7, altitude=695, tz='Europe/Madrid')
+    return tracking.TrackerTable.from_location(location, PARAMETERS_TRACKER,
+                                               freq='5min')
+
+
+@pytest.fixture(params=['2021-06-01', '2020-03-15'])
+def solar_position(request, location):
+    times = pd.date_range(request.param, periods=2 * 144, freq='10min',
+                          tz=location.tz)
+    return location.get_solarposition(times)
+
+
+def test_calc_surface_orientation(solar_position):
+    tracking_info = pvlib.tracking.singleaxis(
+        solar_position['zenith'], solar_position['azimuth'],
+        **PARAMETERS_TRACKER).dropna()
+    tracking_info = tracking_info[tracking_info['tracker_theta'] != 0]
+
+    orientation = tracking.calc_surface_orientation(
+        tracking_info['tracker_theta'], 0, 180)
+
+    np.testing.assert_allclose(orientation['surface_tilt'],
+                               tracking_info['surface_tilt'], atol=1e-4)
+    np.testing.assert_allclose(orientation['surface_azimuth'],
+                               tracking_info['surface_azimuth'], atol=1e-4)
+
+
+def test_singleaxis(table, solar_position):
+    expected = pvlib.tracking.singleaxis(
+        solar_position['zenith'], solar_position['azimuth'],
+        **PARAMETERS_TRACKER)
+    tracking_info = table.singleaxis(solar_position['zenith'],
+                                     solar_position['azimuth'])
+
+    assert list(tracking_info.columns) == list(expected.columns)
+    day = solar_position['zenith'] < 85
+    for column in ['tracker_theta', 'aoi', 'surface_tilt']:
+        np.testing.assert_allclose(tracking_info.loc[day, column],
+                                   expected.loc[day, column], atol=0.5)
+    assert tracking_info[solar_position['zenith'] > 90].isna().all().all()
+
+
+def test_save_load(table, tmp_path):
+    table.save(tmp_path / 'table.npz')
+    loaded = tracking.TrackerTable.load(tmp_path / 'table.npz')
+
+    np.testing.assert_array_equal(loaded.tracker_theta, table.tracker_theta)
+    assert loaded.parameters_tracker == PARAMETERS_TRACKER
+    assert loaded.metadata['freq'] == '5min'
+
+
+def test_from_location_leap_year(location):
+    with pytest.raises(ValueError):
+        tracking.TrackerTable.from_location(location, year=2020)
+
+
+def test_StaticHybridSystem_tracker_table(table, hybrid_parameters,
+                                          solar_position, mocker):
+    hybrid_parameters.update(in_singleaxis_tracker=True,
+                             parameters_tracker=PARAMETERS_TRACKER)
+    system = cpvsystem.StaticHybridSystem(**hybrid_parameters)
+    system_table = cpvsystem.StaticHybridSystem(tracker_table=table,
+                                                **hybrid_parameters)
+    spy = mocker.spy(pvlib.tracking, 'singleaxis')
+
+    dni = pd.Series(900., index=solar_position.index)
+    dii_effective, poa_flatplate_static_effective = system_table.get_effective_irradiance(
+        solar_position['zenith'], solar_position['azimuth'], dni=dni,
+        ghi=dni * 0.8, dhi=dni * 0.1)
+    assert spy.call_count == 0
+
+    expected, _ = system.get_effective_irradiance(
+        solar_position['zenith'], solar_position['azimuth'], dni=dni,
+        ghi=dni * 0.8, dhi=dni * 0.1)
+    np.testing.assert_allclose(dii_effective.fillna(0), expected.fillna(0),
+                               atol=5)
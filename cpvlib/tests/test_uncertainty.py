@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from cpvlib import cpvsystem, uncertainty
+
+
+def _power(year, cpv, flatplate=1., tz='Europe/Madrid'):
+    times = pd.date_range(str(year), str(year + 1), freq='1h', tz=tz)[:-1]
+    return pd.DataFrame({'p_mp_cpv': cpv, 'p_mp_flatplate': flatplate},
+                        index=times)
+
+
+def test_get_blocks():
+    power = _power(2020, 2.)
+
+    daily = uncertainty.get_blocks(power, 'D')
+    assert len(daily) == 366
+    assert daily.loc[228, 'energy_cpv'] == 2 * 24
+    assert daily.loc[uncertainty.LEAP_DAY, 'energy_cpv'] == 2 * 24
+    assert daily['energy_cpv'].sum() == 2 * 24 * 366
+
+    monthly = uncertainty.get_blocks(power, 'M')
+    assert list(monthly.index) == list(range(1, 13))
+    assert monthly.loc[2, 'energy_flatplate'] == 24 * 29
+
+    with pytest.raises(ValueError):
+        uncertainty.get_blocks(power, 'W')
+
+
+def test_YieldUncertainty_single_year():
+    yield_ = uncertainty.YieldUncertainty.from_power(
+        {2019: _power(2019, 2.)}, freq='M')
+
+    energy = yield_.sample(n_samples=100, seed=0)
+    annual = yield_.annual().loc[2019]
+    for column in energy:
+        np.testing.assert_allclose(energy[column], annual[column])
+
+
+def test_YieldUncertainty_bootstrap():
+    yield_ = uncertainty.YieldUncertainty.from_power(
+        {2018: _power(2018, 1.), 2019: _power(2019, 2.)}, freq='M')
+
+    energy = yield_.sample(n_samples=5000, seed=0, chunksize=700)
+    assert len(energy) == 5000
+    # every month comes from one of the years
+    months = (energy['energy_cpv'] - 24 * 365) / 24
+    assert ((months >= 0) & (months <= 365)).all()
+    np.testing.assert_allclose(energy['energy_flatplate'], 24 * 365)
+    np.testing.assert_allclose(energy['energy_cpv'].mean(), 1.5 * 24 * 365,
+                               rtol=0.01)
+
+    # reproducible
+    pd.testing.assert_frame_equal(energy,
+                                  yield_.sample(n_samples=5000, seed=0))
+
+    p = yield_.exceedance(n_samples=5000, seed=0)
+    assert list(p.index) == ['P50', 'P75', 'P90']
+    assert (p.loc['P50'] >= p.loc['P75']).all()
+    assert (p.loc['P75'] >= p.loc['P90']).all()
+    np.testing.assert_allclose(p.loc['P90', 'energy_cpv'],
+                               energy['energy_cpv'].quantile(0.1))
+
+
+def test_YieldUncertainty_leap_day():
+    # no daylight saving time, every day has 24 hours
+    yield_ = uncertainty.YieldUncertainty.from_power(
+        {2019: _power(2019, 2., tz='UTC'), 2020: _power(2020, 2., tz='UTC')},
+        freq='D')
+
+    # the same 365 days whichever year each block is drawn from
+    energy = yield_.sample(n_samples=200, seed=0)
+    np.testing.assert_allclose(energy['energy_cpv'], 2 * 24 * 365)
+    np.testing.assert_allclose(energy['energy_flatplate'], 24 * 365)
+
+    energy = yield_.sample(n_samples=200, seed=0, leap_year=True)
+    np.testing.assert_allclose(energy['energy_cpv'], 2 * 24 * 366)
+
+    yield_ = uncertainty.YieldUncertainty.from_power(
+        {2019: _power(2019, 2.)}, freq='D')
+    with pytest.raises(ValueError):
+        yield_.sample(n_samples=10, leap_year=True)
+
+
+def test_YieldUncertainty_missing_blocks():
+    power = _power(2019, 2.)
+    yield_ = uncertainty.YieldUncertainty.from_power(
+        {2018: _power(2018, 1.), 2019: power[power.index.month != 1]},
+        freq='M')
+
+    energy = yield_.sample(n_samples=500, seed=1)
+    # January is always taken from 2018
+    assert (energy['energy_cpv'] <= 24 * 31 + 2 * 24 * 334).all()
+
+    blocks = uncertainty.get_blocks(power, 'M')
+    blocks.loc[1] = np.nan
+    yield_ = uncertainty.YieldUncertainty({2019: blocks}, freq='M')
+    with pytest.raises(ValueError):
+        yield_.sample(n_samples=10)
+
+
+def test_YieldUncertainty_parameter_uncertainty():
+    yield_ = uncertainty.YieldUncertainty.from_power(
+        {2019: _power(2019, 2.)}, freq='M')
+
+    energy = yield_.sample(
+        n_samples=20000, seed=0,
+        parameter_uncertainty={'module_parameters_cpv': 3,
+                               'utilization_factor': 4})
+    cpv = energy['energy_cpv'] / (2 * 24 * 365)
+    np.testing.assert_allclose(cpv.mean(), 1, atol=0.002)
+    np.testing.assert_allclose(cpv.std(), 0.05, rtol=0.05)
+    np.testing.assert_allclose(energy['energy_flatplate'], 24 * 365)
+
+    with pytest.raises(ValueError):
+        yield_.sample(parameter_uncertainty={'eta_m': 1})
+
+
+def test_YieldUncertainty_from_weather(hybrid_parameters, location, weather):
+    system = cpvsystem.StaticHybridSystem(**hybrid_parameters)
+
+    shifted = weather.copy()
+    shifted.index = shifted.index + pd.DateOffset(years=1)
+    shifted['dni'] *= 0.5
+
+    yield_ = uncertainty.YieldUncertainty.from_weather(
+        system, location, [weather, shifted])
+    assert yield_.years == [2019, 2020]
+    assert list(yield_.blocks) == [601, 602]
+
+    annual = yield_.annual()
+    assert annual.loc[2019, 'energy_cpv'] > annual.loc[2020, 'energy_cpv']
+
+    energy = yield_.sample(n_samples=1000, seed=0)
+    assert energy['energy_total'].between(annual['energy_total'].min(),
+                                          annual['energy_total'].max()).all()
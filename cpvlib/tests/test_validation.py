@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import pvlib
+from cpvlib import cpvsystem, validation
+
+from .conftest import DATA_DIR
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(1)
+    n = 5000
+    measured = 100 * rng.random(n)
+    frame = pd.DataFrame({
+        'measured': measured,
+        'modeled': measured * 1.02 + rng.normal(0, 3, n),
+        'aoi': 90 * rng.random(n),
+        'airmass': 1 + 5 * rng.random(n),
+        'temp_air': 40 * rng.random(n),
+    })
+    frame.loc[::97, 'measured'] = np.nan
+    return frame
+
+
+def _expected(frame):
+    frame = frame.dropna(subset=['measured', 'modeled'])
+    error = frame['modeled'] - frame['measured']
+    mean = frame['measured'].mean()
+    return pd.Series({
+        'n': len(error), 'mbe': error.mean(),
+        'rmse': np.sqrt((error ** 2).mean()), 'mae': error.abs().mean(),
+        'nmbe': error.mean() / mean,
+        'nrmse': np.sqrt((error ** 2).mean()) / mean,
+        'nmae': error.abs().mean() / mean})
+
+
+def test_Validation_streaming(data):
+    engine = validation.Validation({'p_mp': ('modeled', 'measured')})
+    for chunk in np.array_split(data, 7):
+        engine.update(chunk, chunk, chunk)
+
+    summary = engine.summary()
+    pd.testing.assert_series_equal(summary.loc['p_mp'], _expected(data),
+                                   check_names=False)
+
+    binned = engine.binned('aoi').loc['p_mp']
+    assert len(binned) == len(validation.DEFAULT_BINS['aoi']) - 1
+    groups = pd.cut(data['aoi'], validation.DEFAULT_BINS['aoi'], right=False)
+    for interval, group in data.groupby(groups):
+        pd.testing.assert_series_equal(binned.loc[interval],
+                                       _expected(group), check_names=False)
+
+
+def test_Validation_merge(data):
+    quantities = {'p_mp': ('modeled', 'measured')}
+    engine = validation.Validation(quantities).update(data, data, data)
+
+    first = validation.Validation(quantities).update(data[:2000], data[:2000],
+                                                     data[:2000])
+    second = validation.Validation(quantities).update(data[2000:], data[2000:],
+                                                      data[2000:])
+    first.merge(second)
+
+    pd.testing.assert_frame_equal(first.summary(), engine.summary())
+    pd.testing.assert_frame_equal(first.binned('temp_air'),
+                                  engine.binned('temp_air'))
+
+
+def test_ErrorAccumulator_empty():
+    metrics = validation.ErrorAccumulator().update([np.nan], [1.]).result()
+    assert metrics['n'] == 0
+    assert np.isnan(metrics['rmse'])
+
+
+def test_Validation_StaticCPVSystem(mod_params_cpv):
+    data = pd.read_csv(DATA_DIR / 'InsolightMay2019.csv',
+                       index_col='Date Time', parse_dates=True,
+                       encoding='latin1')
+    data.index = data.index.tz_localize('Europe/Madrid')
+
+    location = pvlib.location.Location(
+        latitude=40.4, longitude=-3.7, altitude=695, tz='Europe/Madrid')
+    solar_position = location.get_solarposition(data.index)
+    airmass_absolute = location.get_airmass(
+        data.index, solar_position=solar_position)['airmass_absolute']
+
+    system = cpvsystem.StaticCPVSystem(
+        surface_tilt=30, surface_azimuth=180,
+        module_parameters=mod_params_cpv,
+        temperature_model_parameters={'u_c': 9.5, 'u_v': 0})
+
+    engine = validation.Validation(
+        {'i_sc_cpv': ('i_sc', 'ISC_measured_IIIV (A)')})
+
+    for day, chunk in data.groupby(data.index.date):
+        zenith = solar_position.loc[chunk.index, 'zenith']
+        azimuth = solar_position.loc[chunk.index, 'azimuth']
+        dii_effective = system.get_effective_irradiance(
+            zenith, azimuth, chunk['DNI (W/m2)'])
+        temp_cell = system.pvsyst_celltemp(dii_effective,
+                                           chunk['T_Amb (°C)'])
+        dc = system.singlediode(*system.calcparams_pvsyst(dii_effective,
+                                                          temp_cell))
+        conditions = validation.get_conditions(
+            system, zenith, azimuth, airmass_absolute[chunk.index],
+            chunk['T_Amb (°C)'])
+        engine.update(dc, chunk, conditions)
+
+    summary = engine.summary().loc['i_sc_cpv']
+    assert summary['n'] > 0
+    assert abs(summary['nmbe']) < 0.5
+
+    binned = engine.binned('airmass')
+    assert binned['n'].sum() <= summary['n']
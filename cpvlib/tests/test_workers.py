@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+import os
+import queue
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cpvlib import cpvsystem, workers
+
+pytest.importorskip('multiprocessing.shared_memory')
+from cpvlib.batch import simulate_site
+
+
+def _shm():
+    return {name for name in os.listdir('/dev/shm') if name.startswith('psm_')}
+
+
+@pytest.fixture(scope='module')
+def pool():
+    with workers.WorkerPool(processes=2) as pool:
+        yield pool
+
+
+def _double(system, location, weather, factor=2):
+    return weather * factor
+
+
+def _die(system, location, weather):
+    os._exit(1)
+
+
+def test_to_shared_from_shared(weather):
+    block, header = workers._to_shared(weather)
+    block.close()
+    try:
+        frame = workers._from_shared(header)
+    finally:
+        workers._unlink(header.name)
+
+    pd.testing.assert_frame_equal(frame, weather, check_freq=False)
+    with pytest.raises(FileNotFoundError):
+        workers._from_shared(header)
+
+
+def test_WorkerPool_StaticHybridSystem(pool, hybrid_parameters, location,
+                                       weather):
+    system = cpvsystem.StaticHybridSystem(**hybrid_parameters)
+
+    days = [day for _, day in weather.groupby(weather.index.date)]
+    results = list(pool.map(system, days, location))
+
+    expected = simulate_site(system, location, weather)
+    pd.testing.assert_frame_equal(pd.concat(results), expected,
+                                  check_freq=False)
+
+    # the system was sent to the workers only once
+    assert list(pool._systems.values()).count(system) == 1
+
+
+def test_WorkerPool_StaticCPVSystem(pool, mod_params_cpv, location, weather):
+    system = cpvsystem.StaticCPVSystem(
+        surface_tilt=30, surface_azimuth=180,
+        module_parameters=mod_params_cpv,
+        temperature_model_parameters={'u_c': 9.5, 'u_v': 0})
+    key = pool.register(system, 'cpv')
+
+    power = pool.submit(key, weather, location).result()
+
+    expected = workers.simulate_cpv(system, location, weather)
+    pd.testing.assert_frame_equal(power, expected, check_freq=False)
+    assert (power['p_mp'] > 0).any()
+
+
+def test_WorkerPool_func(pool, weather):
+    before = _shm() if os.path.isdir('/dev/shm') else set()
+
+    futures = [pool.submit('cpv', weather, func=_double, factor=factor)
+               for factor in range(5)]
+    for factor, future in enumerate(futures):
+        pd.testing.assert_frame_equal(future.result(), weather * factor,
+                                      check_freq=False)
+
+    if os.path.isdir('/dev/shm'):
+        assert _shm() == before
+
+
+def test_WorkerPool_error(pool, location, weather):
+    future = pool.submit('cpv', weather.drop(columns='dni'), location)
+    with pytest.raises(KeyError):
+        future.result()
+
+    with pytest.raises(KeyError):
+        pool.submit('missing', weather)
+
+    with pytest.raises(ValueError):
+        pool.submit(object(), weather).result()
+
+
+def test_WorkerPool_closed(weather):
+    pool = workers.WorkerPool(processes=1)
+    pool.close()
+    with pytest.raises(ValueError):
+        pool.submit('cpv', weather, func=_double)
+    assert not any(worker.is_alive() for worker in pool._workers)
+    np.testing.assert_equal(pool._pending, [0])
+
+
+def test_WorkerPool_dead_worker(weather):
+    with workers.WorkerPool(processes=2) as pool:
+        pool.register(object(), 'dummy')
+
+        future = pool.submit('dummy', weather, func=_die)
+        with pytest.raises(BrokenProcessPool):
+            future.result(timeout=30)
+
+        # the other worker takes the later jobs
+        pd.testing.assert_frame_equal(
+            pool.submit('dummy', weather, func=_double).result(timeout=30),
+            weather * 2, check_freq=False)
+
+        future = pool.submit('dummy', weather, func=_die)
+        with pytest.raises(BrokenProcessPool):
+            future.result(timeout=30)
+        with pytest.raises(BrokenProcessPool):
+            pool.submit('dummy', weather, func=_double)
+
+        assert pool._jobs == {}
+
+
+def test_WorkerPool_result_after_exit(weather):
+    pool = workers.WorkerPool(processes=1)
+    get = pool._outbox.get
+    held = [True]
+    waiting = threading.Event()
+
+    def slow_get(block=True, timeout=None):
+        # the listener times out while the result is on its way
+        if block and held[0]:
+            waiting.set()
+            time.sleep(workers.POLL_INTERVAL)
+            raise queue.Empty
+        return get(block, timeout)
+
+    pool._outbox.get = slow_get
+    try:
+        assert waiting.wait(timeout=30)
+        pool.register(object(), 'dummy')
+        future = pool.submit('dummy', weather, func=_double)
+        # the worker sends the result and exits before it is read
+        pool._inboxes[0].put(None)
+        pool._workers[0].join()
+
+        pd.testing.assert_frame_equal(future.result(timeout=30), weather * 2,
+                                      check_freq=False)
+        assert pool._jobs == {}
+    finally:
+        held[0] = False
+        pool.close()
+    assert not pool._listener.is_alive()
@@ -0,0 +1,242 @@
+"""
+The ``tracking`` module contains precomputed single axis tracker angle
+tables.
+
+The rotation of a single axis tracker, as given by
+:py:func:`pvlib.tracking.singleaxis`, is practically the same every year for
+a given site and ``parameters_tracker``. A TrackerTable stores it for a
+reference year and looks it up by day of year and time of day (UTC) for any
+other year, so multi-year runs compute it only once::
+
+    table = tracking.TrackerTable.from_location(location, parameters_tracker)
+    table.save('tracker_madrid.npz')
+
+    system = cpvsystem.StaticHybridSystem(
+        in_singleaxis_tracker=True, parameters_tracker=parameters_tracker,
+        tracker_table=tracking.TrackerTable.load('tracker_madrid.npz'), ...)
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+import pvlib
+from pvlib.tools import asind, cosd, sind
+
+SECONDS_PER_DAY = 86400
+SECONDS_PER_YEAR = 365 * SECONDS_PER_DAY
+
+
+def calc_surface_orientation(tracker_theta, axis_tilt=0, axis_azimuth=0):
+    """
+    Calculates the surface tilt and azimuth angles of a single axis tracker
+    from its rotation angle.
+
+    Ported from :py:func:`pvlib.tracking.calc_surface_orientation`
+    (pvlib 0.9), not available in earlier pvlib versions.
+
+    Parameters
+    ----------
+    tracker_theta : numeric or Series
+        Tracker rotation angle as a right-handed rotation around the axis
+        defined by ``axis_tilt`` and ``axis_azimuth``. [degrees]
+    axis_tilt : float, default 0
+        Tilt of the axis of rotation with respect to horizontal. [degrees]
+    axis_azimuth : float, default 0
+        A value denoting the compass direction along which the axis of
+        rotation lies. [degrees]
+
+    Returns
+    -------
+    dict or DataFrame
+        ``surface_tilt`` and ``surface_azimuth``.
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        surface_tilt = np.degrees(np.arccos(cosd(tracker_theta) *
+                                            cosd(axis_tilt)))
+
+        # clip(..., -1, 1) to prevent arcsin(1 + epsilon) issues:
+        azimuth_delta = asind(np.clip(sind(tracker_theta) / sind(surface_tilt),
+                                      a_min=-1, a_max=1))
+        azimuth_delta = np.where(abs(tracker_theta) < 90, azimuth_delta,
+                                 -azimuth_delta + np.sign(tracker_theta) * 180)
+        # surface_tilt=0 case
+        azimuth_delta = np.where(sind(surface_tilt) != 0, azimuth_delta, 90)
+        surface_azimuth = (axis_azimuth + azimuth_delta) % 360
+
+    out = {'surface_tilt': surface_tilt, 'surface_azimuth': surface_azimuth}
+    if isinstance(tracker_theta, pd.Series):
+        out = pd.DataFrame(out, index=tracker_theta.index)
+    return out
+
+
+def _seconds_of_year(times):
+    """
+    Seconds since January 1st (UTC) of a non-leap year: February 29th is
+    mapped to February 28th and the following days are shifted back.
+    """
+    times = pd.DatetimeIndex(times)
+    if times.tz is not None:
+        times = times.tz_convert('UTC')
+
+    dayofyear = times.dayofyear.values
+    dayofyear = np.where(times.is_leap_year & (dayofyear > 59),
+                         dayofyear - 1, dayofyear)
+
+    seconds_of_day = (times.hour.values * 3600 + times.minute.values * 60 +
+                      times.second.values)
+    return (dayofyear - 1) * SECONDS_PER_DAY + seconds_of_day
+
+
+class TrackerTable():
+    """
+    Single axis tracker rotation angle of a reference year, looked up by
+    day of year and time of day for any year.
+
+    Parameters
+    ----------
+    seconds : array-like
+        Seconds since January 1st (UTC) of the reference year, increasing.
+    tracker_theta : array-like
+        Tracker rotation angle, NaN with the sun below the horizon.
+    parameters_tracker : None or dict, default None
+        Keyword arguments of :py:func:`pvlib.tracking.singleaxis` used to
+        build the table.
+    metadata : None or dict, default None
+        Site and resolution of the table.
+    """
+
+    def __init__(self, seconds, tracker_theta, parameters_tracker=None,
+                 metadata=None):
+
+        self.seconds = np.asarray(seconds, dtype=float)
+        self.tracker_theta = np.asarray(tracker_theta, dtype=float)
+
+        if parameters_tracker is None:
+            self.parameters_tracker = {}
+        else:
+            self.parameters_tracker = parameters_tracker
+
+        if metadata is None:
+            self.metadata = {}
+        else:
+            self.metadata = metadata
+
+    def __repr__(self):
+        return ('TrackerTable: \n  ' + '\n  '.join(
+            '{}: {}'.format(k, v) for k, v in
+            dict(self.metadata, **self.parameters_tracker).items()))
+
+    @classmethod
+    def from_location(cls, location, parameters_tracker=None, year=2019,
+                      freq='5min'):
+        """
+        Builds the table of a site for a reference year.
+
+        Parameters
+        ----------
+        location : pvlib.location.Location
+        parameters_tracker : None or dict, default None
+            Keyword arguments of :py:func:`pvlib.tracking.singleaxis`.
+        year : int, default 2019
+            Reference year. Must not be a leap year.
+        freq : string, default '5min'
+            Resolution of the table.
+
+        Returns
+        -------
+        table : TrackerTable
+        """
+        if pd.Timestamp(year=year, month=1, day=1).is_leap_year:
+            raise ValueError('The reference year must not be a leap year')
+
+        parameters_tracker = dict(parameters_tracker or {})
+
+        times = pd.date_range(start=str(year), end=str(year + 1), freq=freq,
+                              tz='UTC')[:-1]
+        solar_position = location.get_solarposition(times)
+
+        tracker_theta = pvlib.tracking.singleaxis(
+            solar_position['apparent_zenith'], solar_position['azimuth'],
+            **parameters_tracker)['tracker_theta']
+
+        metadata = {'latitude': location.latitude,
+                    'longitude': location.longitude,
+                    'altitude': location.altitude,
+                    'year': year, 'freq': freq}
+
+        return cls(_seconds_of_year(times), tracker_theta, parameters_tracker,
+                   metadata)
+
+    def save(self, filename):
+        """Saves the table to a ``.npz`` file."""
+        np.savez(filename, seconds=self.seconds,
+                 tracker_theta=self.tracker_theta,
+                 parameters_tracker=json.dumps(self.parameters_tracker),
+                 metadata=json.dumps(self.metadata))
+
+    @classmethod
+    def load(cls, filename):
+        """Loads a table saved with :py:meth:`save`."""
+        with np.load(filename) as data:
+            return cls(data['seconds'], data['tracker_theta'],
+                       json.loads(str(data['parameters_tracker'])),
+                       json.loads(str(data['metadata'])))
+
+    def get_tracker_theta(self, times):
+        """
+        Looks up the tracker rotation angle, linearly interpolated in time.
+
+        Parameters
+        ----------
+        times : DatetimeIndex
+            Timestamps of any year.
+
+        Returns
+        -------
+        tracker_theta : Series
+        """
+        tracker_theta = np.interp(_seconds_of_year(times), self.seconds,
+                                  self.tracker_theta, period=SECONDS_PER_YEAR)
+        return pd.Series(tracker_theta, index=times)
+
+    def singleaxis(self, solar_zenith, solar_azimuth):
+        """
+        Equivalent of :py:func:`pvlib.tracking.singleaxis` that looks up the
+        tracker rotation angle in the table.
+
+        Parameters
+        ----------
+        solar_zenith : Series
+            Solar zenith angle, with a DatetimeIndex.
+        solar_azimuth : Series
+            Solar azimuth angle.
+
+        Returns
+        -------
+        tracking_info : DataFrame
+            Columns are ``tracker_theta, aoi, surface_azimuth,
+            surface_tilt``, NaN with the sun below the horizon.
+        """
+        if not isinstance(getattr(solar_zenith, 'index', None),
+                          pd.DatetimeIndex):
+            raise TypeError('solar_zenith must be a Series with a '
+                            'DatetimeIndex to look up the tracker table')
+
+        tracker_theta = self.get_tracker_theta(solar_zenith.index)
+
+        orientation = calc_surface_orientation(
+            tracker_theta, self.parameters_tracker.get('axis_tilt', 0),
+            self.parameters_tracker.get('axis_azimuth', 0))
+
+        projection = pvlib.irradiance.aoi_projection(
+            orientation['surface_tilt'], orientation['surface_azimuth'],
+            solar_zenith, solar_azimuth)
+        aoi = np.degrees(np.arccos(np.clip(np.abs(projection), None, 1)))
+
+        out = pd.DataFrame({'tracker_theta': tracker_theta, 'aoi': aoi,
+                            'surface_azimuth': orientation['surface_azimuth'],
+                            'surface_tilt': orientation['surface_tilt']})
+        out[solar_zenith > 90] = np.nan
+        return out
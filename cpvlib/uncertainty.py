@@ -0,0 +1,256 @@
+"""
+The ``uncertainty`` module estimates the exceedance probabilities (P50, P75,
+P90...) of the annual energy of a StaticHybridSystem. Each weather year is
+simulated once; synthetic years are then built by resampling daily or
+monthly energy blocks across the simulated years, and scaled by random
+multipliers for the uncertainty of the module and utilization factor
+parameters, without running the model chain again::
+
+    yield_ = YieldUncertainty.from_weather(system, location,
+                                           {2017: weather_2017,
+                                            2018: weather_2018, ...})
+    yield_.exceedance(n_samples=10000,
+                      parameter_uncertainty={'module_parameters_cpv': 3,
+                                             'utilization_factor': 2},
+                      seed=0)
+
+The parameter multipliers are a linear approximation: a relative error of
+the parameters is assumed to change the energy of the corresponding
+subsystem by the same relative amount.
+"""
+
+import numpy as np
+import pandas as pd
+
+from cpvlib import batch
+
+COLUMNS = ['energy_cpv', 'energy_flatplate']
+
+# daily block of 29 February, only drawn for leap synthetic years
+LEAP_DAY = 229
+
+# subsystem (column of COLUMNS) whose energy each parameter group scales
+PARAMETER_COLUMNS = {
+    'module_parameters_cpv': 0,
+    'module_parameters_flatplate': 1,
+    'utilization_factor': 0,
+}
+
+
+def _block_keys(index, freq):
+    if freq == 'M':
+        return index.month
+    if freq == 'D':
+        return index.month * 100 + index.day
+    raise ValueError(freq + ' is not a valid block frequency, use D or M')
+
+
+def get_blocks(power, freq='D'):
+    """
+    Integrates power into daily or monthly energy blocks.
+
+    Parameters
+    ----------
+    power : DataFrame
+        Columns are ``p_mp_cpv, p_mp_flatplate`` in W, as returned by
+        :py:func:`batch.simulate_site`.
+    freq : str, default 'D'
+        'D' for days (``month * 100 + day``, 29 February is ``LEAP_DAY``)
+        or 'M' for months.
+
+    Returns
+    -------
+    energy : DataFrame
+        Columns are ``energy_cpv, energy_flatplate`` in Wh, indexed by
+        block.
+    """
+    interval = power.index.to_series().diff().median()
+    hours = interval / pd.Timedelta('1h') if pd.notna(interval) else 1
+
+    energy = power[['p_mp_cpv', 'p_mp_flatplate']].fillna(0) * hours
+    energy.columns = COLUMNS
+    return energy.groupby(_block_keys(power.index, freq)).sum()
+
+
+class YieldUncertainty():
+    """
+    Bootstrap of the annual energy of a StaticHybridSystem over weather
+    years.
+
+    Parameters
+    ----------
+    blocks : dict
+        ``{year: energy}`` where energy is a DataFrame returned by
+        :py:func:`get_blocks`. Blocks missing in a year are resampled from
+        the other years only, e.g. 29 February from the leap years.
+    freq : str, default 'D'
+        Frequency of the blocks, 'D' or 'M'.
+    """
+
+    def __init__(self, blocks, freq='D'):
+        if len(blocks) == 0:
+            raise ValueError('At least one year is required')
+
+        self.freq = freq
+        self.years = list(blocks)
+
+        index = sorted(set().union(*[energy.index
+                                     for energy in blocks.values()]))
+        self.blocks = pd.Index(index, name='block')
+
+        # years x blocks x subsystems
+        self.energy = np.stack([
+            blocks[year].reindex(self.blocks)[COLUMNS].to_numpy(dtype=float)
+            for year in self.years])
+
+        # per block, the years with data first
+        valid = ~np.isnan(self.energy).any(axis=2)
+        self._order = np.argsort(~valid, axis=0, kind='stable')
+        self._counts = valid.sum(axis=0)
+
+    def __repr__(self):
+        return 'YieldUncertainty: \n  years: {}\n  blocks: {} ({})'.format(
+            ', '.join(str(year) for year in self.years), len(self.blocks),
+            self.freq)
+
+    @classmethod
+    def from_power(cls, powers, freq='D'):
+        """
+        Creates the bootstrap from already simulated power.
+
+        Parameters
+        ----------
+        powers : dict
+            ``{year: power}``, see :py:func:`get_blocks`.
+        freq : str, default 'D'
+        """
+        return cls({year: get_blocks(power, freq)
+                    for year, power in powers.items()}, freq)
+
+    @classmethod
+    def from_weather(cls, system, location, weathers, freq='D', spillage=0,
+                     cache=None):
+        """
+        Simulates each weather year once with :py:func:`batch.simulate_site`
+        and creates the bootstrap.
+
+        Parameters
+        ----------
+        system : StaticHybridSystem
+        location : pvlib.location.Location
+        weathers : dict or list of DataFrame
+            ``{year: weather}``. A list is labeled with the year of the
+            first timestamp of each weather.
+        freq : str, default 'D'
+        spillage : float, default 0
+        cache : None or ResultCache, default None
+        """
+        if not isinstance(weathers, dict):
+            weathers = {weather.index[0].year: weather
+                        for weather in weathers}
+        return cls.from_power(
+            {year: batch.simulate_site(system, location, weather,
+                                       spillage=spillage, cache=cache)
+             for year, weather in weathers.items()}, freq)
+
+    def annual(self):
+        """
+        Returns
+        -------
+        energy : DataFrame
+            Simulated energy of each year in Wh, with ``energy_total``.
+            Missing blocks count as 0.
+        """
+        energy = pd.DataFrame(np.nansum(self.energy, axis=1),
+                              index=self.years, columns=COLUMNS)
+        energy['energy_total'] = energy.sum(axis=1)
+        return energy
+
+    def sample(self, n_samples=10000, parameter_uncertainty=None, seed=None,
+               chunksize=1000, leap_year=False):
+        """
+        Draws synthetic years.
+
+        Parameters
+        ----------
+        n_samples : int, default 10000
+        parameter_uncertainty : None or dict, default None
+            ``{parameter group: standard deviation}`` in % of the energy of
+            the subsystem, for the keys of ``PARAMETER_COLUMNS``:
+            ``module_parameters_cpv``, ``module_parameters_flatplate`` and
+            ``utilization_factor`` (CPV only). Each group draws an
+            independent normal multiplier per synthetic year.
+        seed : None, int or numpy.random.Generator, default None
+        chunksize : int, default 1000
+            Synthetic years resampled at once, which bounds the memory to
+            ``chunksize * blocks`` indices.
+        leap_year : bool, default False
+            With daily blocks, whether the synthetic years include 29
+            February (``LEAP_DAY``), drawn from the leap years only.
+            Otherwise every synthetic year has 365 days.
+
+        Returns
+        -------
+        energy : DataFrame
+            Columns are ``energy_cpv, energy_flatplate, energy_total`` in Wh,
+            one row per synthetic year.
+        """
+        if parameter_uncertainty is None:
+            parameter_uncertainty = {}
+        for name in parameter_uncertainty:
+            if name not in PARAMETER_COLUMNS:
+                raise ValueError(
+                    '{} is not a valid parameter group, use one of {}'.format(
+                        name, ', '.join(PARAMETER_COLUMNS)))
+        columns = np.arange(len(self.blocks))
+        if self.freq == 'D' and not leap_year:
+            columns = columns[self.blocks != LEAP_DAY]
+        elif self.freq == 'D' and LEAP_DAY not in self.blocks:
+            raise ValueError('leap_year requires at least one leap year')
+
+        counts = self._counts[columns]
+        if (counts == 0).any():
+            raise ValueError('Blocks {} have no data in any year'.format(
+                list(self.blocks[columns[counts == 0]])))
+
+        rng = np.random.default_rng(seed)
+        energy = np.empty((n_samples, len(COLUMNS)))
+
+        for start in range(0, n_samples, chunksize):
+            n = min(chunksize, n_samples - start)
+            # year of every block of every synthetic year, among the years
+            # with data for that block
+            u = rng.random((n, len(columns)))
+            years = self._order[(u * counts).astype(int), columns]
+            energy[start:start + n] = self.energy[years, columns].sum(axis=1)
+
+        for name, std in parameter_uncertainty.items():
+            energy[:, PARAMETER_COLUMNS[name]] *= rng.normal(
+                1, std / 100, n_samples)
+
+        energy = pd.DataFrame(energy, columns=COLUMNS)
+        energy['energy_total'] = energy.sum(axis=1)
+        return energy
+
+    def exceedance(self, probabilities=(50, 75, 90), **kwargs):
+        """
+        Annual energy exceeded with the given probabilities.
+
+        Parameters
+        ----------
+        probabilities : sequence of float, default (50, 75, 90)
+            In %.
+        **kwargs
+            Passed to :py:meth:`sample`.
+
+        Returns
+        -------
+        energy : DataFrame
+            Index is ``P50, P75, P90...`` and columns are ``energy_cpv,
+            energy_flatplate, energy_total``, in Wh. Each column is
+            computed independently.
+        """
+        energy = self.sample(**kwargs)
+        quantiles = energy.quantile([1 - p / 100 for p in probabilities])
+        quantiles.index = ['P{:g}'.format(p) for p in probabilities]
+        return quantiles
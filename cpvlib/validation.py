@@ -0,0 +1,295 @@
+"""
+The ``validation`` module compares modeled and measured quantities (e.g.
+``p_mp`` or ``i_sc`` of a StaticCPVSystem, StaticFlatPlateSystem or
+StaticHybridSystem against ``PMP_estimated_IIIV`` or ``ISC_measured_Si``)
+with one-pass streaming accumulators, so that years of data are validated
+chunk by chunk in bounded memory::
+
+    validation = Validation({'p_mp_cpv': ('p_mp_cpv', 'PMP_estimated_IIIV')})
+    for chunk in chunks:
+        modeled = ...  # model chain on the chunk
+        conditions = get_conditions(system, solar_zenith, solar_azimuth,
+                                    airmass_absolute, chunk['temp_air'])
+        validation.update(modeled, chunk, conditions)
+
+    validation.summary()          # MBE, RMSE, nMAE... per quantity
+    validation.binned('aoi')      # the same per AOI bin
+"""
+
+import numpy as np
+import pandas as pd
+
+METRICS = ['n', 'mbe', 'rmse', 'mae', 'nmbe', 'nrmse', 'nmae']
+
+DEFAULT_BINS = {
+    'aoi': np.arange(0, 95, 5),
+    'airmass': np.append(np.arange(1, 10.5, 0.5), np.inf),
+    'temp_air': np.arange(-10, 55, 5),
+}
+
+
+def _metrics(n, sum_error, sum_squared_error, sum_absolute_error,
+             sum_measured):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        n_ = np.where(n > 0, n, np.nan)
+        mean_measured = sum_measured / n_
+        mbe = sum_error / n_
+        rmse = np.sqrt(sum_squared_error / n_)
+        mae = sum_absolute_error / n_
+        return {'n': n, 'mbe': mbe, 'rmse': rmse, 'mae': mae,
+                'nmbe': mbe / mean_measured, 'nrmse': rmse / mean_measured,
+                'nmae': mae / mean_measured}
+
+
+def _pairs(modeled, measured):
+    modeled = np.asarray(modeled, dtype=float).ravel()
+    measured = np.asarray(measured, dtype=float).ravel()
+    valid = ~(np.isnan(modeled) | np.isnan(measured))
+    return modeled, measured, valid
+
+
+class ErrorAccumulator():
+    """
+    Streaming accumulator of the error statistics of a modeled quantity
+    against its measurement. NaN pairs are skipped.
+
+    Normalized metrics (``nmbe, nrmse, nmae``) are divided by the mean of
+    the measurements.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.sum_error = 0.
+        self.sum_squared_error = 0.
+        self.sum_absolute_error = 0.
+        self.sum_measured = 0.
+
+    def __repr__(self):
+        return 'ErrorAccumulator: \n  n: {}'.format(self.n)
+
+    def update(self, modeled, measured):
+        """Adds a chunk of modeled and measured values."""
+        modeled, measured, valid = _pairs(modeled, measured)
+        error = modeled[valid] - measured[valid]
+
+        self.n += int(valid.sum())
+        self.sum_error += error.sum()
+        self.sum_squared_error += (error ** 2).sum()
+        self.sum_absolute_error += np.abs(error).sum()
+        self.sum_measured += measured[valid].sum()
+        return self
+
+    def merge(self, other):
+        """Adds the statistics of another accumulator, e.g. of a worker."""
+        for name in ['n', 'sum_error', 'sum_squared_error',
+                     'sum_absolute_error', 'sum_measured']:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        return self
+
+    def result(self):
+        """
+        Returns
+        -------
+        metrics : Series
+            ``n, mbe, rmse, mae, nmbe, nrmse, nmae``.
+        """
+        metrics = _metrics(np.asarray(self.n), self.sum_error,
+                           self.sum_squared_error, self.sum_absolute_error,
+                           self.sum_measured)
+        return pd.Series({k: float(v) for k, v in metrics.items()})[METRICS]
+
+
+class BinnedAccumulator():
+    """
+    Streaming accumulator of the error statistics by bins of an explanatory
+    variable (e.g. AOI). Samples out of the bins are skipped.
+
+    Parameters
+    ----------
+    bins : array-like
+        Increasing bin edges.
+    """
+
+    def __init__(self, bins):
+        self.bins = np.asarray(bins, dtype=float)
+        size = len(self.bins) - 1
+        self.n = np.zeros(size, dtype=int)
+        self.sum_error = np.zeros(size)
+        self.sum_squared_error = np.zeros(size)
+        self.sum_absolute_error = np.zeros(size)
+        self.sum_measured = np.zeros(size)
+
+    def __repr__(self):
+        return 'BinnedAccumulator: \n  bins: {}'.format(len(self.n))
+
+    def update(self, modeled, measured, variable):
+        """Adds a chunk of modeled and measured values and their variable."""
+        modeled, measured, valid = _pairs(modeled, measured)
+        variable = np.asarray(variable, dtype=float).ravel()
+
+        index = np.digitize(variable, self.bins) - 1
+        valid &= (index >= 0) & (index < len(self.n))
+
+        index = index[valid]
+        error = modeled[valid] - measured[valid]
+        size = len(self.n)
+
+        self.n += np.bincount(index, minlength=size)
+        self.sum_error += np.bincount(index, error, minlength=size)
+        self.sum_squared_error += np.bincount(index, error ** 2,
+                                              minlength=size)
+        self.sum_absolute_error += np.bincount(index, np.abs(error),
+                                               minlength=size)
+        self.sum_measured += np.bincount(index, measured[valid],
+                                         minlength=size)
+        return self
+
+    def merge(self, other):
+        """Adds the statistics of another accumulator with the same bins."""
+        if not np.array_equal(self.bins, other.bins):
+            raise ValueError('Accumulators with different bins')
+        for name in ['n', 'sum_error', 'sum_squared_error',
+                     'sum_absolute_error', 'sum_measured']:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        return self
+
+    def result(self):
+        """
+        Returns
+        -------
+        metrics : DataFrame
+            Index is the bin interval and columns are ``n, mbe, rmse, mae,
+            nmbe, nrmse, nmae``.
+        """
+        metrics = _metrics(self.n, self.sum_error, self.sum_squared_error,
+                           self.sum_absolute_error, self.sum_measured)
+        return pd.DataFrame(metrics, columns=METRICS,
+                            index=pd.IntervalIndex.from_breaks(
+                                self.bins, closed='left'))
+
+
+def get_conditions(system, solar_zenith, solar_azimuth, airmass_absolute,
+                   temp_air):
+    """
+    Explanatory variables of the residuals.
+
+    Parameters
+    ----------
+    system : StaticCPVSystem, StaticFlatPlateSystem or StaticHybridSystem
+        The AOI of the CPV subsystem is used for a StaticHybridSystem.
+    solar_zenith, solar_azimuth : Series
+        Solar position angles.
+    airmass_absolute : Series
+        Absolute airmass.
+    temp_air : Series
+        Ambient dry bulb temperature in degrees C.
+
+    Returns
+    -------
+    conditions : DataFrame
+        Columns are ``aoi, airmass, temp_air``.
+    """
+    if hasattr(system, 'static_cpv_sys'):
+        system = system.static_cpv_sys
+
+    return pd.DataFrame({
+        'aoi': system.get_aoi(solar_zenith, solar_azimuth),
+        'airmass': airmass_absolute,
+        'temp_air': temp_air,
+    })
+
+
+class Validation():
+    """
+    Streaming validation of several modeled quantities against their
+    measurements, overall and binned by AOI, airmass and air temperature.
+
+    Parameters
+    ----------
+    quantities : dict
+        ``{name: (modeled_column, measured_column)}``.
+    bins : None or dict, default None
+        ``{variable: bin edges}`` of the explanatory variables. If None,
+        ``DEFAULT_BINS`` (``aoi, airmass, temp_air``).
+    """
+
+    def __init__(self, quantities, bins=None):
+        self.quantities = dict(quantities)
+
+        if bins is None:
+            self.bins = dict(DEFAULT_BINS)
+        else:
+            self.bins = bins
+
+        self.accumulators = {name: ErrorAccumulator()
+                             for name in self.quantities}
+        self.binned_accumulators = {
+            (name, variable): BinnedAccumulator(edges)
+            for name in self.quantities
+            for variable, edges in self.bins.items()}
+
+    def __repr__(self):
+        return ('Validation: \n  quantities: {}\n  bins: {}'.format(
+            ', '.join(self.quantities), ', '.join(self.bins)))
+
+    def update(self, modeled, measured, conditions=None):
+        """
+        Adds a chunk of data.
+
+        Parameters
+        ----------
+        modeled : DataFrame
+            Modeled quantities.
+        measured : DataFrame
+            Measured quantities, aligned with ``modeled``.
+        conditions : None or DataFrame, default None
+            Explanatory variables aligned with ``modeled``, see
+            :py:func:`get_conditions`. Required for the binned metrics.
+        """
+        for name, (modeled_column, measured_column) in self.quantities.items():
+            x = modeled[modeled_column]
+            y = measured[measured_column]
+            self.accumulators[name].update(x, y)
+
+            if conditions is None:
+                continue
+            for variable in self.bins:
+                if variable in conditions:
+                    self.binned_accumulators[name, variable].update(
+                        x, y, conditions[variable])
+        return self
+
+    def merge(self, other):
+        """Adds the statistics of another Validation of the same setup."""
+        for key, accumulator in self.accumulators.items():
+            accumulator.merge(other.accumulators[key])
+        for key, accumulator in self.binned_accumulators.items():
+            accumulator.merge(other.binned_accumulators[key])
+        return self
+
+    def summary(self):
+        """
+        Returns
+        -------
+        metrics : DataFrame
+            Index is the quantity name and columns are ``n, mbe, rmse, mae,
+            nmbe, nrmse, nmae``.
+        """
+        return pd.DataFrame({name: accumulator.result() for name, accumulator
+                             in self.accumulators.items()}).T
+
+    def binned(self, variable):
+        """
+        Parameters
+        ----------
+        variable : string
+            Explanatory variable, e.g. 'aoi'.
+
+        Returns
+        -------
+        metrics : DataFrame
+            Index is (quantity name, bin interval) and columns are ``n, mbe,
+            rmse, mae, nmbe, nrmse, nmae``.
+        """
+        return pd.concat({name: self.binned_accumulators[name, variable].result()
+                          for name in self.quantities})
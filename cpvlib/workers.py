@@ -0,0 +1,416 @@
+"""
+The ``workers`` module keeps a pool of warm worker processes for running many
+small StaticCPVSystem and StaticHybridSystem simulations, e.g. in a job
+server::
+
+    with WorkerPool(processes=4) as pool:
+        future = pool.submit(system, weather, location)
+        power = future.result()
+
+The workers import pandas, pvlib and cpvlib once at start. Each system is
+sent (pickled) once to every worker and kept there, so later jobs only refer
+to it. Weather and results are not pickled: they are written into
+:py:mod:`multiprocessing.shared_memory` blocks, whose name and layout travel
+through the queues. If a worker dies, the futures of its jobs fail with
+:py:class:`concurrent.futures.process.BrokenProcessPool` and the other
+workers take the later jobs.
+
+Shared memory requires Python 3.8 or later.
+"""
+
+import itertools
+import multiprocessing
+import pickle
+import queue
+import threading
+import traceback
+from collections import namedtuple
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import connection
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # Python < 3.8
+    resource_tracker = shared_memory = None
+
+import numpy as np
+import pandas as pd
+
+SharedFrame = namedtuple('SharedFrame', ['name', 'length', 'columns', 'tz'])
+
+# seconds the listener waits for results before checking for dead workers
+POLL_INTERVAL = 0.1
+
+
+def _to_shared(frame):
+    """
+    Copies a float DataFrame with a DatetimeIndex into a new shared memory
+    block: the index as int64 nanoseconds followed by the values.
+    """
+    values = frame.to_numpy(dtype=float)
+    n, m = values.shape
+    block = shared_memory.SharedMemory(create=True,
+                                       size=max(8 * n * (m + 1), 1))
+    np.ndarray(n, dtype='int64', buffer=block.buf)[:] = frame.index.asi8
+    np.ndarray((n, m), dtype=float, buffer=block.buf, offset=8 * n)[:] = values
+
+    tz = None if frame.index.tz is None else str(frame.index.tz)
+    return block, SharedFrame(block.name, n, list(frame.columns), tz)
+
+
+def _from_shared(header):
+    """Copies a DataFrame out of the shared memory block of ``header``."""
+    block = shared_memory.SharedMemory(name=header.name)
+    try:
+        n, m = header.length, len(header.columns)
+        index = np.ndarray(n, dtype='int64', buffer=block.buf).copy()
+        values = np.ndarray((n, m), dtype=float, buffer=block.buf,
+                            offset=8 * n).copy()
+    finally:
+        block.close()
+
+    index = pd.DatetimeIndex(index)
+    if header.tz is not None:
+        index = index.tz_localize('UTC').tz_convert(header.tz)
+    return pd.DataFrame(values, index=index, columns=header.columns)
+
+
+def _unlink(name):
+    try:
+        block = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    block.close()
+    block.unlink()
+
+
+def simulate_cpv(system, location, weather):
+    """
+    Runs the StaticCPVSystem model chain for one site.
+
+    Parameters
+    ----------
+    system : StaticCPVSystem
+    location : pvlib.location.Location
+    weather : DataFrame
+        Columns are ``dni, temp_air, wind_speed``.
+
+    Returns
+    -------
+    power : DataFrame
+        Column is ``p_mp`` (including the global utilization factor), in W.
+    """
+    from cpvlib.atmosphere import get_atmospheric_context
+
+    solar_position = location.get_solarposition(weather.index)
+
+    context = get_atmospheric_context(location, solar_position=solar_position)
+
+    dii_effective = system.get_effective_irradiance(
+        solar_position['zenith'], solar_position['azimuth'], weather['dni'])
+
+    temp_cell = system.pvsyst_celltemp(dii_effective, weather['temp_air'],
+                                       weather['wind_speed'])
+
+    dc = system.singlediode(*system.calcparams_pvsyst(dii_effective,
+                                                      temp_cell))
+
+    uf_global = system.get_global_utilization_factor(None,
+                                                     weather['temp_air'],
+                                                     context=context)
+
+    return pd.DataFrame({'p_mp': dc['p_mp'] * uf_global})
+
+
+def _get_func(system):
+    from cpvlib import batch, cpvsystem
+
+    if isinstance(system, cpvsystem.StaticHybridSystem):
+        return batch.simulate_site
+    if isinstance(system, cpvsystem.StaticCPVSystem):
+        return simulate_cpv
+    raise ValueError('func is required for {}'.format(type(system).__name__))
+
+
+def _worker(inbox, outbox):
+    # warm interpreter: heavy imports once per worker, not once per job
+    import pvlib  # noqa: F401
+    from cpvlib import batch, cpvsystem  # noqa: F401
+
+    systems = {}
+    while True:
+        message = inbox.get()
+        if message is None:
+            return
+
+        if message[0] == 'register':
+            _, key, system = message
+            systems[key] = system
+            continue
+
+        _, job_id, key, func, header, location, kwargs = message
+        try:
+            weather = _from_shared(header)
+            system = systems[key]
+            if func is None:
+                func = _get_func(system)
+            result = func(system, location, weather, **kwargs)
+
+            block, result_header = _to_shared(result)
+            block.close()
+            outbox.put((job_id, result_header, None))
+        except Exception as e:
+            try:
+                pickle.dumps(e)
+            except Exception:
+                e = RuntimeError(repr(e))
+            outbox.put((job_id, None, (e, traceback.format_exc())))
+
+
+class WorkerPool():
+    """
+    Pool of persistent worker processes for cpvlib simulations.
+
+    Parameters
+    ----------
+    processes : None or int, default None
+        Number of workers. If None, ``os.cpu_count()``.
+    context : None or multiprocessing context, default None
+        e.g. ``multiprocessing.get_context('spawn')``. If None, the default
+        context.
+    """
+
+    def __init__(self, processes=None, context=None):
+        if shared_memory is None:
+            raise ImportError('WorkerPool requires Python 3.8 or later '
+                              '(multiprocessing.shared_memory).')
+        if context is None:
+            context = multiprocessing.get_context()
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+
+        self.processes = processes
+
+        # workers share the resource tracker of the parent, which unlinks
+        # every block
+        resource_tracker.ensure_running()
+
+        self._outbox = context.Queue()
+        self._inboxes = [context.Queue() for _ in range(processes)]
+        self._workers = [context.Process(target=_worker,
+                                         args=(inbox, self._outbox),
+                                         daemon=True)
+                         for inbox in self._inboxes]
+        for worker in self._workers:
+            worker.start()
+
+        self._pending = [0] * processes
+        self._dead = [False] * processes
+        self._jobs = {}
+        self._systems = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._listener = threading.Thread(target=self._listen, daemon=True)
+        self._listener.start()
+
+    def __repr__(self):
+        return 'WorkerPool: \n  processes: {}\n  systems: {}'.format(
+            self.processes, len(self._systems))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def register(self, system, key=None):
+        """
+        Sends a system to every worker, where it is kept for later jobs.
+        Changes made to the system afterwards are not seen by the workers
+        until it is registered again.
+
+        Parameters
+        ----------
+        system : StaticCPVSystem, StaticHybridSystem or any picklable object
+        key : None or str, default None
+            Name of the system. If None, derived from the object identity.
+
+        Returns
+        -------
+        key : str
+        """
+        if key is None:
+            key = 'system-{}'.format(id(system))
+        with self._lock:
+            if self._closed:
+                raise ValueError('WorkerPool is closed')
+            # keep a reference so that the id is not reused
+            self._systems[key] = system
+            for inbox in self._inboxes:
+                inbox.put(('register', key, system))
+        return key
+
+    def _key(self, system):
+        if isinstance(system, str):
+            if system not in self._systems:
+                raise KeyError('System "{}" is not registered'.format(system))
+            return system
+        key = 'system-{}'.format(id(system))
+        if self._systems.get(key) is not system:
+            self.register(system, key)
+        return key
+
+    def submit(self, system, weather, location=None, func=None, **kwargs):
+        """
+        Runs a simulation in a worker.
+
+        Parameters
+        ----------
+        system : StaticCPVSystem, StaticHybridSystem or str
+            System or key of a registered system. Systems are registered on
+            first use.
+        weather : DataFrame
+            Float columns with a DatetimeIndex, e.g. ``dni, ghi, dhi,
+            temp_air, wind_speed``.
+        location : None or pvlib.location.Location, default None
+        func : None or callable, default None
+            Picklable ``func(system, location, weather, **kwargs)`` that
+            returns a float DataFrame with a DatetimeIndex. If None,
+            :py:func:`batch.simulate_site` for a StaticHybridSystem and
+            :py:func:`simulate_cpv` for a StaticCPVSystem.
+        **kwargs
+            Passed to ``func``.
+
+        Returns
+        -------
+        future : concurrent.futures.Future
+            Its result is the DataFrame returned by ``func``.
+        """
+        if self._closed:
+            raise ValueError('WorkerPool is closed')
+
+        key = self._key(system)
+        block, header = _to_shared(weather)
+        block.close()
+
+        future = Future()
+        with self._lock:
+            if self._closed:
+                _unlink(header.name)
+                raise ValueError('WorkerPool is closed')
+            if all(self._dead):
+                _unlink(header.name)
+                raise BrokenProcessPool('Every worker of the pool died')
+            job_id = next(self._ids)
+            worker = int(np.argmin(np.where(self._dead, np.inf,
+                                            self._pending)))
+            self._pending[worker] += 1
+            self._jobs[job_id] = (future, header.name, worker)
+            self._inboxes[worker].put(('job', job_id, key, func, header,
+                                       location, kwargs))
+        return future
+
+    def map(self, system, weathers, location=None, func=None, **kwargs):
+        """
+        Runs a simulation per weather DataFrame and yields the results in
+        order, see :py:meth:`submit`.
+        """
+        futures = [self.submit(system, weather, location, func, **kwargs)
+                   for weather in weathers]
+        for future in futures:
+            yield future.result()
+
+    def _fail_dead_workers(self, workers):
+        """Fails the jobs left by workers that died."""
+        for worker in workers:
+            with self._lock:
+                self._dead[worker] = True
+                self._pending[worker] = 0
+                jobs = {job_id: job for job_id, job in self._jobs.items()
+                        if job[2] == worker}
+                for job_id in jobs:
+                    del self._jobs[job_id]
+            for job_id, (future, name, _) in jobs.items():
+                _unlink(name)
+                future.set_exception(BrokenProcessPool(
+                    'Worker {} died with exit code {} running job {}'.format(
+                        worker, self._workers[worker].exitcode, job_id)))
+
+    def _handle(self, message):
+        """Completes the future of a result message."""
+        job_id, header, error = message
+
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is not None:
+                self._pending[job[2]] -= 1
+        if job is None:
+            # the job was already failed, e.g. its worker died
+            if header is not None:
+                _unlink(header.name)
+            return
+        future, name, _ = job
+        _unlink(name)
+
+        if error is not None:
+            exception, trace = error
+            exception.__cause__ = RuntimeError('Worker traceback:\n' + trace)
+            future.set_exception(exception)
+            return
+
+        try:
+            result = _from_shared(header)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            _unlink(header.name)
+
+    def _listen(self):
+        sentinels = {worker.sentinel: n
+                     for n, worker in enumerate(self._workers)}
+        while True:
+            try:
+                message = self._outbox.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                dead = connection.wait(list(sentinels), timeout=0)
+                if not dead:
+                    continue
+                # a worker flushes its last results before exiting, so they
+                # are already in the outbox, but may have arrived after the
+                # timeout: read them before failing the jobs left
+                stop = False
+                while True:
+                    try:
+                        message = self._outbox.get(block=False)
+                    except queue.Empty:
+                        break
+                    if message is None:
+                        stop = True
+                        break
+                    self._handle(message)
+                self._fail_dead_workers([sentinels.pop(sentinel)
+                                         for sentinel in dead])
+                if stop:
+                    return
+                continue
+            if message is None:
+                return
+            self._handle(message)
+
+    def close(self):
+        """Waits for the submitted jobs and stops the workers."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        for inbox in self._inboxes:
+            inbox.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._outbox.put(None)
+        self._listener.join()
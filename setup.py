@@ -32,7 +32,7 @@ setup_args = dict(
         "Intended Audience :: Science/Research",
         "Topic :: Scientific/Engineering",
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.7',
     packages=['cpvlib'],
     zip_safe=False,
     package_data={'': ['*.csv', '*.txt', '*.png', '*.yaml', '*.yml']},
@@ -43,10 +43,12 @@ INSTALL_REQUIRES = [
     'numpy>=1.20',
     'pandas>=1.2',
     'pvlib==0.8',
-    'matplotlib>=3.3'
+    'matplotlib>=3.3',
+    'importlib_metadata; python_version < "3.8"',
 ]
 
 EXTRAS_REQUIRE = {
+    'optional': ['pyarrow', 'xarray', 'dask', 'numba'],
     'doc': ['ipython', 'matplotlib', 'sphinx == 3.1.2',
             'sphinx_rtd_theme==0.5.0', 'sphinx-gallery',
             'sphinxcontrib-apidoc']